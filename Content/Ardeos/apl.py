@@ -12,4 +12,5 @@ def make_apl(player, target, world, talents, movement, helpers):
     apl.count_aura = helpers["count_aura"]
     apl.next_enemy_missing_aura = helpers["next_enemy_missing_aura"]
     apl.enemies_alive = helpers["enemies_alive"]
+    apl.cooldown_abilities = helpers["cooldown_abilities"]
     return apl
\ No newline at end of file
@@ -0,0 +1,73 @@
+# sim/__main__.py
+"""
+Command-line entry point for one fight.
+
+    python -m sim --character Rime --talents 1A,1B,2C,5C --duration 10
+    python -m sim --character Ardeos --encounter 0:1,15:3,30:1 --seed 7 --json
+    python -m sim worker --connect host:7787     # run tasks for sim/tools/cluster.py
+
+Imports are kept to argparse until the arguments are parsed; the runner, the
+content loader and yaml come in on first use, so --help and bad-argument errors
+return immediately.
+"""
+from __future__ import annotations
+import argparse
+import sys
+
+def parse_encounter(text: str) -> list:
+    """'0:1,15:3' -> [(0.0, 1), (15.0, 3)]"""
+    plan = []
+    for part in text.split(","):
+        t_s, _, count = part.partition(":")
+        plan.append((float(t_s), int(count or 1)))
+    return plan
+
+def parse_talents(text: str) -> dict:
+    return {t.strip(): True for t in text.split(",") if t.strip()}
+
+def build_parser() -> argparse.ArgumentParser:
+    ap = argparse.ArgumentParser(prog="python -m sim", description=__doc__.splitlines()[1])
+    ap.add_argument("--content", default="Content", help="content packs root (default: Content)")
+    ap.add_argument("--character", default="Ardeos")
+    ap.add_argument("--talents", type=parse_talents, default={}, help="comma-separated talent ids, e.g. 1A,2C")
+    ap.add_argument("--duration", type=float, default=300.0, help="fight length in seconds")
+    ap.add_argument("--seed", type=int, default=1337)
+    ap.add_argument("--encounter", type=parse_encounter, default=None, help="t_s:count,... (default 0:1)")
+    ap.add_argument("--power", type=float, default=1.0)
+    ap.add_argument("--haste", type=float, default=1.1)
+    ap.add_argument("--crit", type=float, default=0.4, help="base crit chance")
+    ap.add_argument("--spirit-gain", type=float, default=1.1, help="base spirit gain")
+    ap.add_argument("--movement", type=float, default=0.15)
+    ap.add_argument("--timeline", default=None, help="write a columnar event timeline (.npz) here")
+    ap.add_argument("--trace", default=None, help="stream a Chrome/Perfetto trace (.json) of the fight here")
+    ap.add_argument("--long-fight", action="store_true", help="reclaim despawned enemies (flat memory for long, many-pull fights)")
+    ap.add_argument("--json", action="store_true", help="print the full result as JSON")
+    ap.add_argument("--profile", action="store_true", help="print per component / ability / talent handler timings")
+    return ap
+
+def main(argv=None) -> int:
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if argv[:1] == ["worker"]:
+        from .tools.cluster import worker_main
+        return worker_main(argv[1:])
+    args = build_parser().parse_args(argv)
+
+    from .runners.target_dummy import run_sim, SimConfig
+    cfg = SimConfig(
+        duration_s=args.duration, power=args.power, haste=args.haste, base_crit=args.crit,
+        base_spirit_gain=args.spirit_gain, talents=args.talents, seed=args.seed,
+        character=args.character, encounter=args.encounter, movement=args.movement,
+        timeline=args.timeline, trace=args.trace, profile=args.profile, long_fight=args.long_fight,
+    )
+    result = run_sim(content_dir=args.content, cfg=cfg)
+    if args.json:
+        import json
+        print(json.dumps(result, indent=2, default=str))
+        return 0
+    print("DPS:", round(result["dps"], 2))
+    print("Casts:", result["casts"])
+    print("By ability:", {k: round(v[0],1) for k,v in result["by_ability"].items()})
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,59 @@
 # sim/core/apl.py
 from __future__ import annotations
+from math import inf
+from typing import Callable, NamedTuple
 from .engine import s_to_us, us_to_s,APL
 
+class Wait(NamedTuple):
+    """APL answer for "nothing useful before until_us": the runner sleeps until then."""
+    until_us: int
+
+class WakeScheduler:
+    """
+    APL wakes for one actor, with at most one pending wake event.
+
+    request(t) asks for a wake at t; the earliest outstanding request wins and later
+    ones are dropped, because every APL run ends by requesting its own next wake
+    (or casting, which requests one). Calling the scheduler runs the APL right away
+    (cast end weaving) and supersedes the pending wake.
+    """
+    __slots__ = ("eng", "fn", "phase", "evt", "evaluations", "requests", "coalesced", "last_choice")
+
+    def __init__(self, eng, fn: Callable[[], None], phase: int = APL):
+        self.eng = eng
+        self.fn = fn
+        self.phase = phase
+        self.evt = None
+        self.evaluations = 0    # APL runs
+        self.requests = 0       # request() calls
+        self.coalesced = 0      # requests answered by an already pending wake
+        self.last_choice = None  # ability the APL last picked (names it in engine budget errors)
+
+    def request(self, t_us: int) -> None:
+        self.requests += 1
+        evt = self.evt
+        if evt is not None:
+            if evt.t_us <= t_us:
+                self.coalesced += 1
+                return
+            evt.cancelled = True
+        self.evt = self.eng.schedule_at(t_us, self._fire, phase=self.phase)
+
+    def pending_at(self):
+        return self.evt.t_us if self.evt is not None else None
+
+    def _fire(self):
+        self.evt = None
+        self.evaluations += 1
+        self.fn()
+
+    def __call__(self):
+        if self.evt is not None:
+            self.evt.cancelled = True
+            self.evt = None
+        self.evaluations += 1
+        self.fn()
+
 class SimpleAPL:
     """
     Priority:
@@ -31,14 +83,17 @@ class SimpleAPL:
         self.movement = movement
 
     def _log_decision(self, *, action: str, reason: str, now_us: int,target: str=""):
-        if self.debug == "off":
-            return
-        if self.debug == "unique" and action == self._last_action:
+        # apl_decision is published for every choice whenever someone listens (e.g. a timeline recorder);
+        # the debug mode only controls printing
+        publish = self.bus is not None and self.bus.has_subs("apl_decision")
+        if self.debug == "off" and not publish:
             return
-        self._last_action = action
+        log = self.debug != "off" and not (self.debug == "unique" and action == self._last_action)
+        if log:
+            self._last_action = action
 
         p, t = self.player, self.target
-        searing_rem = t.aura_remains_us("SearingBlaze", now_us)
+        searing_rem = t.aura_remains_us("SearingBlaze", now_us, p)
         gcd_ready = now_us >= p.gcd_ready_us
         cast_ready = now_us >= p.busy_until_us
 
@@ -52,21 +107,24 @@ class SimpleAPL:
             st = p.charges.get(aid)
             if st: charges[aid] = f"{st.cur}/{st.max}"
 
-        msg = (f"[{us_to_s(now_us):7.3f}s] APL -> {action},{target}"
-               f" | reason={reason}"
-               f" | ember={p.ember.cur}"
-               f" | spirit={p.spiritbar.cur:.1f}"
-               f" | searing_rem={us_to_s(searing_rem):.2f}s"
-               f" | wild={'Y' if ready('wildfire') else 'n'}"
-               f" | fb_chg={charges.get('fireball','-')}"
-        )
-        #       f" | gcd={'ready' if gcd_ready else f'+{us_to_s(p.gcd_ready_us-now_us):.2f}s'}"
-        #       f" | cast={'ready' if cast_ready else f'+{us_to_s(p.busy_until_us-now_us):.2f}s'}"
-        self.log(msg)
-        if self.bus:
+        if log:
+            msg = (f"[{us_to_s(now_us):7.3f}s] APL -> {action},{target}"
+                   f" | reason={reason}"
+                   f" | ember={p.ember.cur}"
+                   f" | spirit={p.spiritbar.cur:.1f}"
+                   f" | searing_rem={us_to_s(searing_rem):.2f}s"
+                   f" | wild={'Y' if ready('wildfire') else 'n'}"
+                   f" | fb_chg={charges.get('fireball','-')}"
+            )
+            #       f" | gcd={'ready' if gcd_ready else f'+{us_to_s(p.gcd_ready_us-now_us):.2f}s'}"
+            #       f" | cast={'ready' if cast_ready else f'+{us_to_s(p.busy_until_us-now_us):.2f}s'}"
+            self.log(msg)
+        if publish:
             self.bus.pub("apl_decision",
                          t_us=now_us,
+                         player=p,
                          action=action,
+                         target=target,
                          reason=reason,
                          ember=p.ember.cur,
                          searing_rem_us=searing_rem,
@@ -95,9 +153,9 @@ class SimpleAPL:
                     continue
 
                 # Controls on ability usage:
-                if aid == "wildfire" and (t.aura_remains_us("EngulfingFlames", now_us) <= 0
-                                          or (t.aura_remains_us("Fireball", now_us)<=0 and self.time_until_ready_us("fireball")<=s_to_us(3.0))
-                                          or (t.aura_remains_us("FrogDot", now_us)<=0 and self.time_until_ready_us("fire_frogs")<=s_to_us(8.0))):
+                if aid == "wildfire" and (t.aura_remains_us("EngulfingFlames", now_us, p) <= 0
+                                          or (t.aura_remains_us("Fireball", now_us, p)<=0 and self.time_until_ready_us("fireball")<=s_to_us(3.0))
+                                          or (t.aura_remains_us("FrogDot", now_us, p)<=0 and self.time_until_ready_us("fire_frogs")<=s_to_us(8.0))):
                     continue
 
                 self._log_decision(action=aid, reason=reason, now_us=now_us)
@@ -112,7 +170,30 @@ class SimpleAPL:
         )
 
 
-    def choose(self, now_us: int) -> str | None:
+    def cooldown_abilities(self):
+        """Ability ids Wait() can sleep on; make_apl wires in the actor's (loaded specs with a cooldown or charges)."""
+        return ()
+
+    def next_ready_us(self, now_us: int):
+        """Earliest time one of the actor's abilities that is on cooldown comes off it (None if none is)."""
+        waits = [self.time_until_ready_us(aid) for aid in self.cooldown_abilities()]
+        waits = [w for w in waits if 0 < w < inf]
+        return now_us + min(waits) if waits else None
+
+    def choose(self, now_us: int):
+        """
+        (ability id, target) to cast now, or Wait(t) when the pick is still on
+        cooldown, t being the next time any cooldown comes back up. A heuristic: it
+        assumes the decision only changes with cooldowns, so spirit gained, a DoT
+        running out or a spawn in between is only seen at that wake.
+        """
+        pick = self._choose(now_us)
+        if not pick or pick[0] is None or self.is_cd_ready(pick[0]):
+            return pick
+        until = self.next_ready_us(now_us)
+        return Wait(until) if until is not None else pick
+
+    def _choose(self, now_us: int):
         p, t = self.player, self.target
         # Only call choose() when both gates are clear (runner enforces this)
         n = self.count_enemies()
@@ -120,7 +201,7 @@ class SimpleAPL:
         moving = self.player.rng.roll("moving?",self.movement)
         if now_us < max(p.gcd_ready_us, p.busy_until_us):
             return None
-        if t.aura_remains_us("BaseSpiritGain", now_us)<=0:
+        if t.aura_remains_us("BaseSpiritGain", now_us, p)<=0:
             self._log_decision(action="base_spirit_gain", reason="Initializing Base Spirit Gain", now_us=now_us, target=t.name)
             return ("base_spirit_gain", t)
 
@@ -139,9 +220,9 @@ class SimpleAPL:
             est_ramp = (100 - self.player.spiritbar.cur) * 1.5
             est_ramp_us = s_to_us(est_ramp + 1.5)
 
-            delay_fireball = max(0, min(est_ramp_us - t.aura_remains_us("Fireball", now_us), tt_fireball - est_ramp_us))
-            delay_engulfing = max(0,min(est_ramp_us - t.aura_remains_us("Engulfing", now_us), tt_engulfing_eff - est_ramp_us))
-            delay_frogs = max(0, min(est_ramp_us - t.aura_remains_us("FrogDot", now_us), tt_frogs - est_ramp_us))
+            delay_fireball = max(0, min(est_ramp_us - t.aura_remains_us("Fireball", now_us, p), tt_fireball - est_ramp_us))
+            delay_engulfing = max(0,min(est_ramp_us - t.aura_remains_us("Engulfing", now_us, p), tt_engulfing_eff - est_ramp_us))
+            delay_frogs = max(0, min(est_ramp_us - t.aura_remains_us("FrogDot", now_us, p), tt_frogs - est_ramp_us))
             delay_wildfire = max(0, tt_wildfire - 9)
             true_est_ramp = us_to_s(max(est_ramp_us, delay_fireball, delay_engulfing, delay_frogs, delay_wildfire)) #compute likely incinerate time, pool cd's if approaching
 
@@ -151,22 +232,22 @@ class SimpleAPL:
                 self._log_decision(action="apocalypse", reason="Apocalypse Ready", now_us=now_us,target=t.name)
                 return ("apocalypse",t)
 
-            if t.aura_remains_us("SearingBlaze", now_us) <= s_to_us(2.5) and "3A" in self.talents:
+            if t.aura_remains_us("SearingBlaze", now_us, p) <= s_to_us(2.5) and "3A" in self.talents:
                 self._log_decision(action="searing_blaze", reason="Overlap Searing Blaze for Intensifying", now_us=now_us, target=t.name)
                 return ("searing_blaze",t)
 
             #ramp rotation:
             if true_est_ramp<=4.5:
-                if t.aura_remains_us("SearingBlaze", now_us) >= s_to_us(1) and t.aura_remains_us("FrogDot",now_us) >= s_to_us(1) and t.aura_remains_us("Fireball", now_us) >= s_to_us(1) and t.aura_remains_us("EngulfingFlames",now_us) >= s_to_us(1) and (self.player.spiritbar.cur >= 100):
+                if t.aura_remains_us("SearingBlaze", now_us, p) >= s_to_us(1) and t.aura_remains_us("FrogDot", now_us, p) >= s_to_us(1) and t.aura_remains_us("Fireball", now_us, p) >= s_to_us(1) and t.aura_remains_us("EngulfingFlames", now_us, p) >= s_to_us(1) and (self.player.spiritbar.cur >= 100):
                     self._log_decision(action="incinerate", reason="Fully Ramped Incinerate",
                                        now_us=now_us, target=t.name)
                     return ("incinerate", t)
 
-                if t.aura_remains_us("SearingBlaze", now_us) <= s_to_us(6):
+                if t.aura_remains_us("SearingBlaze", now_us, p) <= s_to_us(6):
                     self._log_decision(action="searing_blaze", reason="Refresh Searing in Ramp",now_us=now_us, target=t.name)
                     return ("searing_blaze", t)
 
-                if self.is_cd_ready("fireball") and t.aura_remains_us("Fireball", now_us) <= s_to_us(4):
+                if self.is_cd_ready("fireball") and t.aura_remains_us("Fireball", now_us, p) <= s_to_us(4):
                     self._log_decision(action="fireball", reason="Fireball in Ramp", now_us=now_us,
                                        target=t.name)
                     return ("fireball", t)
@@ -221,7 +302,7 @@ class SimpleAPL:
                 return ("pyromania",t)
 
             # Fireball when available and not already present
-            if self.is_cd_ready("fireball") and t.aura_remains_us("Fireball", now_us) == 0 and 30 <= true_est_ramp+15:
+            if self.is_cd_ready("fireball") and t.aura_remains_us("Fireball", now_us, p) == 0 and 30 <= true_est_ramp+15:
                 self._log_decision(action="fireball", reason="Fireball Ready & Not Present", now_us=now_us,target=t.name)
                 return ("fireball",t)
 
@@ -230,22 +311,22 @@ class SimpleAPL:
                 return ("fire_frogs",t)
 
             # Searing Blaze maintenance on target
-            if searing_cov<n:  #t.aura_remains_us("SearingBlaze", now_us) <= s_to_us(0.0):
+            if searing_cov<n:  #t.aura_remains_us("SearingBlaze", now_us, p) <= s_to_us(0.0):
                 tgt = self.next_enemy_missing_aura("SearingBlaze")
                 self._log_decision(action="searing_blaze", reason="Searing Blaze Not Present", now_us=now_us, target=tgt.name)
                 return ("searing_blaze",tgt)
 
 
-            if t.aura_remains_us("SearingBlaze", now_us) >= s_to_us(1) and t.aura_remains_us("FrogDot", now_us) >= s_to_us(1) and t.aura_remains_us("Fireball", now_us) >= s_to_us(1) and t.aura_remains_us("EngulfingFlames",now_us) >= s_to_us(1) and (self.player.spiritbar.cur >= 100):
+            if t.aura_remains_us("SearingBlaze", now_us, p) >= s_to_us(1) and t.aura_remains_us("FrogDot", now_us, p) >= s_to_us(1) and t.aura_remains_us("Fireball", now_us, p) >= s_to_us(1) and t.aura_remains_us("EngulfingFlames", now_us, p) >= s_to_us(1) and (self.player.spiritbar.cur >= 100):
                 self._log_decision(action="incinerate", reason="Fully Ramped Incinerate",
                                    now_us=now_us, target=t.name)
                 return ("incinerate", t)
 
-            if self.is_cd_ready("wildfire") and not p.has_buff("Wildfire") and t.aura_remains_us("EngulfingFlames", now_us) >= 3 and 45<= true_est_ramp+25:
+            if self.is_cd_ready("wildfire") and not p.has_buff("Wildfire") and t.aura_remains_us("EngulfingFlames", now_us, p) >= 3 and 45<= true_est_ramp+25:
                 self._log_decision(action="wildfire", reason="Wildfire ready & Engulfing Active", now_us=now_us,target=t.name)
                 return ("wildfire",None)
 
-            if p.ember.cur >= 100 and (t.aura_remains_us("EngulfingFlames", now_us) > 0 or t.aura_remains_us("Fireball", now_us) > 0 or t.aura_remains_us("FrogDot", now_us) > 0):
+            if p.ember.cur >= 100 and (t.aura_remains_us("EngulfingFlames", now_us, p) > 0 or t.aura_remains_us("Fireball", now_us, p) > 0 or t.aura_remains_us("FrogDot", now_us, p) > 0):
                 self._log_decision(action="detonate", reason="Embers Available & DoT(s) Present", now_us=now_us,target=t.name)
                 return ("detonate",t)
 
@@ -258,12 +339,12 @@ class SimpleAPL:
                 self._log_decision(action="infernal_wave", reason="No Other Actions Available", now_us=now_us,target=t.name)
                 return ("infernal_wave",t)
 
-            if self.is_cd_ready("fireball") and t.aura_remains_us("Fireball", now_us) <= s_to_us(4):
+            if self.is_cd_ready("fireball") and t.aura_remains_us("Fireball", now_us, p) <= s_to_us(4):
                 self._log_decision(action="fireball", reason="Clip fireball during movement", now_us=now_us,
                                    target=t.name)
                 return ("fireball", t)
 
-            if self.is_cd_ready("pyromania") and t.aura_remains_us("EngulfingFlames", now_us) <= 0:
+            if self.is_cd_ready("pyromania") and t.aura_remains_us("EngulfingFlames", now_us, p) <= 0:
                 self._log_decision(action="pyromania", reason="Pyromania during movement", now_us=now_us,
                                    target=t.name)
                 return ("pyromania", t)
@@ -1,10 +1,11 @@
 # sim/core/dot.py
 from __future__ import annotations
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Optional
 from .engine import DOT_TICK
+from .ids import NAMES
 
-@dataclass
+@dataclass(slots=True)
 class DotState:
     name: str
     owner: "Unit"
@@ -27,35 +28,54 @@ class DotState:
     stack_mult_per: float = 0.0   # e.g., 0.20 -> +20% per stack
     next_evt: Optional[object] = None
     expire_evt: Optional[object] = None
+    src_ability_id: Optional[str] = None    # ability that applied it (dot_from_last_hit)
+    force_crit_tick: bool = False           # next tick crits (set by dot_pre_tick listeners)
+    extend_check: Optional[object] = None   # pending expire check from tick-extension talents
+    name_id: int = field(default=-1, init=False)   # NAMES id of name, the damage tag of its ticks
+
+    def __post_init__(self):
+        self.name_id = NAMES.id(self.name)
 
     def _remove_now(self):
         # idempotent removal
-        if self.target.auras.get(self.name) is self:
-            self.target.auras.pop(self.name, None)
+        auras = self.target.auras_of(self.owner)
+        if auras.get(self.name) is self:
+            auras.pop(self.name, None)
         try:
             self.owner.active_dots.remove(self)
         except ValueError:
             pass
         if self.next_evt: self.next_evt.cancelled = True
         if self.expire_evt: self.expire_evt.cancelled = True
+        if self.extend_check: self.extend_check.cancelled = True
         self.next_evt = None
         self.expire_evt = None
+        self.extend_check = None
+        bus = self.owner.bus
+        if bus.has_subs("dot_remove", self.owner):
+            bus.pub("dot_remove", src=self.owner, dot=self, t_us=self.owner.eng.t_us)
 
     def schedule_expire(self):
+        eng = self.owner.eng
+        # expiry moved later: postpone the pending event instead of cancel + push
+        if self.expire_evt and eng.postpone(self.expire_evt, self.expires_at_us):
+            return
         # cancel old, schedule new at current expires_at_us
         if self.expire_evt:
             self.expire_evt.cancelled = True
-        eng = self.owner.eng
         def on_expire(dot=self):
+            if dot.expire_evt is evt:
+                dot.expire_evt = None   # fired; the next schedule_expire pushes a fresh one
             # remove only if still the same object and truly expired
-            if dot.target.auras.get(dot.name) is dot and eng.t_us >= dot.expires_at_us:
+            auras = dot.target.auras_of(dot.owner)
+            if auras.get(dot.name) is dot and eng.t_us >= dot.expires_at_us:
                 dot._remove_now()
                 if(dot.name=="SearingBlaze"):
-                    if dot.target.auras.get("SearingBlazeAmp"):
-                        amp = dot.target.auras.get("SearingBlazeAmp")
+                    if auras.get("SearingBlazeAmp"):
+                        amp = auras.get("SearingBlazeAmp")
                         amp["stacks"] = 0
-                        dot.target.buffs.pop("SearingBlazeAmp",None)
-        self.expire_evt = eng.schedule_at(self.expires_at_us, on_expire)
+                        dot.target.buff_mgr.remove("SearingBlazeAmp")
+        self.expire_evt = evt = eng.schedule_at(self.expires_at_us, on_expire)
 
     def current_tick_interval_us(self) -> int:
         # Effective haste = base factor + additive bonuses.
@@ -74,7 +94,7 @@ class DotState:
         k = max(0, (now_us - phase0 + I - 1) // I) + 1
         next_tick = max(now_us, phase0 + k * I)
         if next_tick < self.expires_at_us:
-            self.next_evt = self.owner.eng.schedule_at(next_tick, self._tick_cb, phase=DOT_TICK)
+            self.next_evt = self.owner.eng.schedule_every(next_tick, self._tick_cb, self._next_tick_in, phase=DOT_TICK)
         else:
             # let expire event handle cleanup
             self.next_evt = None
@@ -83,7 +103,20 @@ class DotState:
         eng = self.owner.eng
         self.schedule_expire()  # <-- ensure there is always an up-to-date expire event
         t = max(eng.t_us, self.anchor_us + self.first_delay_us)
-        self.next_evt = eng.schedule_at(t, self._tick_cb, phase=DOT_TICK)
+        # one periodic event for the dot's whole life; _next_tick_in re-arms it after each tick
+        self.next_evt = eng.schedule_every(t, self._tick_cb, self._next_tick_in, phase=DOT_TICK)
+        bus = self.owner.bus
+        if bus.has_subs("dot_apply", self.owner):
+            bus.pub("dot_apply", src=self.owner, dot=self, t_us=eng.t_us)
+
+    def _next_tick_in(self) -> int:
+        # next anchored tick honoring haste
+        now = self.owner.eng.t_us
+        I = self.current_tick_interval_us()
+        phase0 = self.anchor_us + self.first_delay_us
+        k = max(0, (now - phase0 + I - 1) // I) + 1
+        # if the next tick lands after expiry, that tick does the cleanup
+        return phase0 + k * I - now
 
     def _tick_cb(self):
         eng = self.owner.eng
@@ -95,17 +128,15 @@ class DotState:
             self.next_evt = None
             return
         #publish the pre-event to listeners who may modify it
-        self.owner.bus.pub("dot_pre_tick", dot=self, t_us=eng.t_us)
+        self.owner.bus.pub("dot_pre_tick", src=self.owner, dot=self, t_us=eng.t_us)
 
         mult = 1.0
         is_crit = False
 
         temp_bonus_crit = 0
-        if getattr(self, "_force_crit_tick", False):
+        if self.force_crit_tick:
             temp_bonus_crit = 1
-
-        if hasattr(self, "_force_crit_tick"):
-            delattr(self, "_force_crit_tick")
+            self.force_crit_tick = False
 
 
         if self.fixed_crit>=0:
@@ -127,16 +158,16 @@ class DotState:
         mult *= (1.0 + (self.stacks * self.stack_mult_per if self.max_stacks > 0 else 0.0))
 
         if self.name == "SearingBlaze":
-            amp = self.target.auras.get("SearingBlazeAmp")
+            amp = self.target.auras_of(self.owner).get("SearingBlazeAmp")
             if amp:
                 mult *= (1.0 + amp.get("stacks", 0) * amp.get("per", 0.0))
 
         mult *= self.owner.buff_damage_mult()
         dmg = self.coeff_per_tick * self.owner.power * mult
 
-        self.owner.add_damage(dmg, self.name)
+        self.owner.add_damage(dmg, self.name_id)
 
-        self.owner.bus.pub("dot_tick", dot=self, t_us=eng.t_us,crit=is_crit)
+        self.owner.bus.pub("dot_tick", src=self.owner, dot=self, t_us=eng.t_us,crit=is_crit,amount=dmg)
         # gain resources
         self.owner.spiritbar.gain(dmg / 1000)
         if self.ember_per_tick:
@@ -145,18 +176,6 @@ class DotState:
             self.owner.spiritbar.gain(self.spirit_per_tick)
 
 
-        # schedule next anchored tick honoring haste
-        I = self.current_tick_interval_us()
-        phase0 = self.anchor_us + self.first_delay_us
-        k = max(0, (eng.t_us - phase0 + I - 1) // I) + 1
-        next_tick = phase0 + k * I
-        # if next tick would land after expiry, let expire event do the cleanup
-        #if next_tick >= self.expires_at_us:
-            #vestigal, left for posterity
-            #print("I'm dying!")
-            #self.next_evt = None
-            #return
-        self.next_evt = eng.schedule_at(next_tick, self._tick_cb, phase=DOT_TICK)
 
     def refresh(self, now_us: int, new_base_duration_us: int):
         self.base_duration_us = new_base_duration_us
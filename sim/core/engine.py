@@ -1,8 +1,8 @@
 # sim/core/engine.py
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import Callable, List, Dict
-import heapq, itertools
+from typing import Callable, List, Dict, Optional
+import heapq, itertools, time
 
 # Event phases for same-timestamp ordering
 CAST_END, CHANNEL_TICK, DAMAGE, DOT_TICK, APL = range(5)
@@ -11,6 +11,62 @@ US = 1_000_000
 def s_to_us(s: float) -> int: return int(round(s * US))
 def us_to_s(us: int) -> float: return us / US
 
+class SimCancelled(Exception):
+    """A run stopped early because its should_stop hook returned True (see Engine.run_until)."""
+
+class SimBudgetExceeded(RuntimeError):
+    """
+    An event budget of the Engine ran out: a callback keeps rescheduling itself (at the
+    same timestamp, or microseconds ahead) or the run is over its wall-clock limit.
+    budget is "per_timestamp", "per_sim_second" or "wall_clock"; callback and ability
+    describe the event that was running when it tripped.
+    """
+    def __init__(self, msg: str, budget: str = "", t_us: int = 0, callback: str = "", ability: Optional[str] = None):
+        super().__init__(msg)
+        self.msg, self.budget, self.t_us, self.callback, self.ability = msg, budget, t_us, callback, ability
+
+    def __reduce__(self):   # keep the fields through process pools
+        return (type(self), (self.msg, self.budget, self.t_us, self.callback, self.ability))
+
+    def __str__(self): return self.msg
+
+# default budgets: orders of magnitude over any real fight (tens of events per timestamp,
+# hundreds per simulated second with 8 targets), so only runaway loops hit them
+MAX_EVENTS_PER_TS = 100_000
+MAX_EVENTS_PER_SIM_S = 2_000_000
+
+def _ability_of(obj) -> Optional[str]:
+    # ability id carried by a cast context / spec / aura, if obj is one
+    spec = getattr(obj, "spec", None)
+    if spec is not None and getattr(spec, "id", None):
+        return spec.id
+    if getattr(obj, "cast", None) is not None and getattr(obj, "id", None):
+        return obj.id
+    name = getattr(obj, "name", None)
+    if name and getattr(obj, "target", None) is not None:
+        return name
+    return None
+
+def describe_callback(fn) -> tuple:
+    """(qualified name, ability id or None) of an event callback, for diagnostics."""
+    owner = getattr(fn, "__self__", None)
+    if owner is not None:      # bound method, e.g. WakeScheduler._fire or DotState._tick_cb
+        name = f"{type(owner).__qualname__}.{fn.__name__}"
+        ability = getattr(owner, "last_choice", None) or _ability_of(owner)
+        inner = getattr(owner, "fn", None)
+        if inner is not None:
+            name += f" -> {getattr(inner, '__qualname__', repr(inner))}"
+        return name, ability
+    name = f"{getattr(fn, '__module__', '?')}.{getattr(fn, '__qualname__', repr(fn))}"
+    for cell in getattr(fn, "__closure__", None) or ():
+        try:
+            ability = _ability_of(cell.cell_contents)
+        except ValueError:      # empty cell
+            continue
+        if ability:
+            return name, ability
+    return name, None
+
 @dataclass(order=True)
 class _Evt:
     t_us: int
@@ -18,36 +74,253 @@ class _Evt:
     seq: int
     fn: Callable[[], None]
     cancelled: bool=False
+    # periodic events: called after fn, returns the delay to the next firing (None = stop)
+    interval: Optional[Callable[[], Optional[int]]] = None
+    # postponed events: (t_us, seq) to move to when this one surfaces, see Engine.postpone
+    later: Optional[tuple] = None
 
 class Engine:
-    def __init__(self):
+    """
+    Event queue and clock. Runs are guarded by event budgets (None = unlimited):
+    max_events_per_ts events at one timestamp, max_events_per_sim_s events within
+    any one simulated second (window from its first event), and wall_limit_s seconds
+    of wall clock per run_until(). Over budget, run_until() raises SimBudgetExceeded
+    naming the running callback and its ability, so a livelocked rotation (an APL
+    re-waking at `now` for an ability that is never ready) fails fast.
+    """
+    def __init__(self, max_events_per_ts: Optional[int] = MAX_EVENTS_PER_TS,
+                 max_events_per_sim_s: Optional[int] = MAX_EVENTS_PER_SIM_S, wall_limit_s: Optional[float] = None):
+        self.max_events_per_ts = max_events_per_ts
+        self.max_events_per_sim_s = max_events_per_sim_s
+        self.wall_limit_s = wall_limit_s
         self.t_us = 0
         self._q: List[_Evt] = []
         self._seq = itertools.count()
+        self.heap_pushes = 0   # schedules + periodic re-arms, for profiling
+        self._hi = (-1, -1, -1)   # largest (t_us, phase, seq) popped so far, see has_passed()
+        self.phase = APL          # phase of the event being run (trace recorders read it)
 
     def schedule_at(self, t_us: int, fn: Callable[[], None], phase: int=APL) -> _Evt:
         #phase_mod = float(phase/100000)
         evt = _Evt(t_us, phase, next(self._seq), fn, False) #
         heapq.heappush(self._q, evt)
+        self.heap_pushes += 1
         return evt
 
+    def schedule_every(self, t_us: int, fn: Callable[[], None], interval: Callable[[], Optional[int]],
+                       phase: int=APL) -> _Evt:
+        """
+        Periodic event: fn runs at t_us, then interval() gives the delay (us) to the
+        next run, or None to stop. The same _Evt is re-armed in place, so one handle
+        covers the whole series and cancel() stops it, even from inside fn.
+        """
+        evt = _Evt(t_us, phase, next(self._seq), fn, False, interval)
+        heapq.heappush(self._q, evt)
+        self.heap_pushes += 1
+        return evt
+
+    def _rearm(self, evt: _Evt) -> None:
+        dt = evt.interval()
+        if dt is None:
+            return
+        evt.t_us = self.t_us + dt
+        evt.seq = next(self._seq)
+        heapq.heappush(self._q, evt)
+        self.heap_pushes += 1
+
     def schedule_in(self, dt_us: int, fn: Callable[[], None], phase: int=APL) -> _Evt:
         return self.schedule_at(self.t_us + dt_us, fn, phase)
 
+    def postpone(self, evt: _Evt, t_us: int) -> bool:
+        """
+        Move a pending event to a later time without touching the heap now: it keeps its
+        slot and is re-pushed at t_us when it surfaces. Orders exactly like cancel() +
+        schedule_at(t_us) (the new seq is taken here). False if t_us is before the slot.
+        """
+        if t_us < evt.t_us:
+            return False
+        evt.later = (t_us, next(self._seq))
+        return True
+
+    def reserve_seq(self) -> int:
+        """A seq for a virtual event: see has_passed()."""
+        return next(self._seq)
+
+    def has_passed(self, t_us: int, seq: int, phase: int=APL) -> bool:
+        """
+        Whether an event keyed (t_us, phase, seq), queued since before now, would
+        already have run. Lets timestamp-only state (charge recharges) land in the
+        same order a real event scheduled with that seq would have: it would have
+        popped before anything with a larger key, so compare with the largest key
+        popped so far (events pushed late at lower phases or in the past run after it).
+        """
+        return (t_us, phase, seq) <= self._hi
+
     def cancel(self, evt: _Evt) -> None:
         evt.cancelled = True
 
-    def run_until(self, t_end_us: int, drain_same_time: bool=True) -> None:
+    def compact(self) -> int:
+        """
+        Drop cancelled events from the queue now instead of when they surface; returns
+        how many went. Nothing observable changes (they would be skipped, and anything
+        popped later has a larger key for has_passed()), but the closures they hold
+        (despawned targets, their DoTs) are freed right away.
+        """
+        live = [e for e in self._q if not e.cancelled]
+        n = len(self._q) - len(live)
+        if n:
+            # in place: a running loop (run_until, _run_guarded) holds on to this list
+            self._q[:] = live
+            heapq.heapify(self._q)
+        return n
+
+    def pending(self) -> int:
+        return len(self._q)
+
+    def run_until(self, t_end_us: int, drain_same_time: bool=True,
+                  should_stop: Optional[Callable[[], bool]] = None, poll_us: int = US) -> None:
+        """
+        Run every event up to and including t_end_us. With should_stop, the run goes in
+        slices of poll_us simulated time and raises SimCancelled when it returns True
+        between slices; the events run are the same as in one go.
+        """
+        guarded = bool(self.max_events_per_ts or self.max_events_per_sim_s or self.wall_limit_s)
+        if should_stop is not None:
+            # the budgets span the whole call, not each slice
+            budget = self._budget_state() if guarded else None
+            t = self.t_us
+            while t < t_end_us:
+                t = min(t_end_us, t + poll_us)
+                if budget is not None:
+                    self._run_guarded(t, budget)
+                else:
+                    self.run_until(t, drain_same_time)
+                if should_stop():
+                    raise SimCancelled(f"stopped at {us_to_s(self.t_us):.3f}s")
+            return
+        if guarded:
+            self._run_guarded(t_end_us, self._budget_state())
+            return
         while self._q and self._q[0].t_us <= t_end_us:
             t = self._q[0].t_us
             self.t_us = t
             while self._q and self._q[0].t_us == self.t_us:
                 evt = heapq.heappop(self._q)
+                key = (evt.t_us, evt.phase, evt.seq)
+                if key > self._hi: self._hi = key
+                if evt.cancelled: continue
+                if evt.later is not None:
+                    evt.t_us, evt.seq = evt.later
+                    evt.later = None
+                    heapq.heappush(self._q, evt)
+                    self.heap_pushes += 1
+                    continue
+                self.phase = evt.phase
+                evt.fn()
+                if evt.interval is not None and not evt.cancelled:
+                    self._rearm(evt)
+
+    def _budget_state(self) -> list:
+        # [wall-clock deadline, sim-second window start, events in window, timestamps run]
+        return [time.perf_counter() + self.wall_limit_s if self.wall_limit_s else 0.0, None, 0, 0]
+
+    def _run_guarded(self, t_end_us: int, budget: list) -> None:
+        # run_until's loop plus budget counters; the event order is identical. budget
+        # (from _budget_state) carries the counters from one should_stop slice to the next
+        per_ts = self.max_events_per_ts or 1 << 62
+        per_s = self.max_events_per_sim_s or 1 << 62
+        deadline, win_t, win_n, steps = budget
+        q = self._q
+        while q and q[0].t_us <= t_end_us:
+            steps += 1
+            if deadline and not (steps & 255) and time.perf_counter() > deadline:
+                self._over_budget("wall_clock", f"over the {self.wall_limit_s:g}s wall-clock limit", q[0])
+            t = q[0].t_us
+            self.t_us = t
+            if win_t is None or t - win_t >= US:
+                win_t, win_n = t, 0
+            n = 0
+            limit = min(per_ts, per_s - win_n)     # one compare per event; which budget it was is sorted out below
+            while q and q[0].t_us == t:
+                evt = heapq.heappop(q)
+                key = (evt.t_us, evt.phase, evt.seq)
+                if key > self._hi: self._hi = key
                 if evt.cancelled: continue
+                if evt.later is not None:
+                    evt.t_us, evt.seq = evt.later
+                    evt.later = None
+                    heapq.heappush(q, evt)
+                    self.heap_pushes += 1
+                    continue
+                n += 1
+                if n > limit:
+                    if n > per_ts:
+                        self._over_budget("per_timestamp", f"{n - 1} events at one timestamp", evt)
+                    self._over_budget("per_sim_second", f"{win_n + n - 1} events within 1 simulated second "
+                                      f"(from {us_to_s(win_t):.6f}s)", evt)
+                if deadline and not (n & 1023) and time.perf_counter() > deadline:
+                    self._over_budget("wall_clock", f"over the {self.wall_limit_s:g}s wall-clock limit", evt)
+                self.phase = evt.phase
                 evt.fn()
+                if evt.interval is not None and not evt.cancelled:
+                    self._rearm(evt)
+            win_n += n
+        budget[1:] = win_t, win_n, steps
+
+    def _over_budget(self, budget: str, what: str, evt: Optional[_Evt]) -> None:
+        callback, ability = describe_callback(evt.fn) if evt is not None else ("-", None)
+        same_t = {}
+        for e in self._q:
+            if e.t_us == self.t_us and not e.cancelled:
+                k = describe_callback(e.fn)[0]
+                same_t[k] = same_t.get(k, 0) + 1
+        pending = ", ".join(f"{k} x{v}" for k, v in sorted(same_t.items(), key=lambda kv: -kv[1])[:5])
+        msg = (f"event budget exceeded at t={us_to_s(self.t_us):.6f}s: {what}; "
+               f"running {callback}" + (f" (ability {ability})" if ability else "")
+               + (f"; also queued at this time: {pending}" if pending else ""))
+        raise SimBudgetExceeded(msg, budget, self.t_us, callback, ability)
 
 class Bus:
-    def __init__(self): self._subs: Dict[str, list[Callable[..., None]]] = {}
-    def sub(self, name: str, fn: Callable[..., None]): self._subs.setdefault(name, []).append(fn)
-    def pub(self, name: str, **payload):
-        for fn in tuple(self._subs.get(name, [])): fn(**payload)
+    """
+    Named events. sub(name, fn) hears every pub(name, ...); sub(name, fn, src=unit) only
+    hears events published with src=unit (that unit's casts, ticks, resources, buffs),
+    so with many actors on one bus each talent handler runs for its own actor only.
+    Global subscribers run first, then the src's, each in subscription order.
+
+    label names the subscriber (talent id) for the profiler: while a Profiler is
+    attached (bus.profiler), new subscribers are wrapped to time each call.
+
+    components, if set, replaces the pipeline component table (step type -> function)
+    for this sim's casts; None uses the registry in sim/runtime/components.py.
+    """
+    def __init__(self):
+        self._subs: Dict[str, list[Callable[..., None]]] = {}
+        self._by_src: Dict[str, Dict[object, list[Callable[..., None]]]] = {}
+        self.profiler = None
+        self.components = None
+
+    def sub(self, name: str, fn: Callable[..., None], src: object = None, label: Optional[str] = None):
+        if self.profiler is not None:
+            fn = self.profiler.wrap_handler(name, fn, label)
+        if src is None:
+            self._subs.setdefault(name, []).append(fn)
+        else:
+            self._by_src.setdefault(name, {}).setdefault(src, []).append(fn)
+
+    def has_subs(self, name: str, src: object = None) -> bool:
+        if self._subs.get(name):
+            return True
+        by_src = self._by_src.get(name)
+        if not by_src:
+            return False
+        return bool(by_src.get(src)) if src is not None else any(by_src.values())
+
+    def pub(self, name: str, src: object = None, **payload):
+        fns = self._subs.get(name)
+        if fns:
+            for fn in tuple(fns): fn(**payload)
+        if src is not None:
+            by_src = self._by_src.get(name)
+            fns = by_src.get(src) if by_src else None
+            if fns:
+                for fn in tuple(fns): fn(**payload)
@@ -0,0 +1,160 @@
+# sim/core/ids.py
+"""
+Small-integer ids for the names hot paths look up.
+
+Stats: each buff stat payload (Buff.crit_bonus, haste_bonus, ...) has a slot id. A
+unit keeps the total of every stat over its live buffs in a list (Unit.stat_totals)
+that BuffManager refreshes whenever the unit's buff set changes, so the crit, haste
+and damage queries made on every hit and tick read one slot instead of summing all
+buffs. Totals are summed in buff order with the expressions the per-call loops used,
+so they are bit-identical to them.
+
+Abilities: ability ids, ability names and damage tags get an int from NAMES the first
+time they are seen (content load, or the first cast of a name code makes up). A unit's
+per-ability state (cooldowns, charges, damage and cast counts, next-crit stacks) lives
+in SlotTables: lists indexed by those ints, which still read and write like the
+{name: value} dicts they replaced, so the APL and reports keep their string API.
+Units that never touch an ability hold no slot for it, so enemy units in a big pull
+carry empty lists.
+
+Auras, buffs and bus events stay keyed by name. Buffs are summed in insertion order
+(see above) and auras are per applying unit, so both are small dicts already; bus
+topics are looked up once per publish. Their names, like every string of a content
+pack, are interned when its YAML is parsed (intern_tree, see sim/runtime/pack.py), so
+they are the same objects as the literals in code and match by identity.
+"""
+from __future__ import annotations
+from typing import Any, Dict, Iterator, List
+from collections.abc import MutableMapping
+import sys
+import threading
+
+CRIT, HASTE, CAST_HASTE, DOT_HASTE, DOT_HASTE_MULT, DAMAGE_MULT = range(6)
+# Buff attribute per stat id
+STAT_FIELDS = ("crit_bonus", "haste_bonus", "cast_haste_bonus", "dot_haste_bonus", "dot_haste_mult", "damage_bonus")
+# totals with no buffs (sum() starts at int 0, the multiplicative stats at 1.0)
+STAT_EMPTY = (0, 0, 0, 0.0, 1.0, 1.0)
+
+def stat_totals(buffs) -> list:
+    """Totals per stat id over an iterable of Buffs, in iteration order."""
+    buffs = list(buffs)
+    if not buffs:
+        return list(STAT_EMPTY)
+    dot_haste, dot_mult, dmg_mult = 0.0, 1.0, 1.0
+    for b in buffs:
+        if b.dot_haste_bonus is not None:
+            dot_haste += b.dot_haste_bonus
+        if b.dot_haste_mult is not None:
+            dot_mult *= b.dot_haste_mult
+        if b.damage_bonus is not None:
+            dmg_mult *= b.damage_bonus
+    return [
+        sum(b.crit_bonus or 0.0 for b in buffs),
+        sum(b.haste_bonus or 0.0 for b in buffs),
+        sum(b.cast_haste_bonus or 0.0 for b in buffs),
+        dot_haste, dot_mult, dmg_mult,
+    ]
+
+def intern_tree(node):
+    """Intern every str key and value of a parsed YAML document, in place; returns it."""
+    if isinstance(node, dict):
+        items = [(sys.intern(k) if isinstance(k, str) else k, intern_tree(v)) for k, v in node.items()]
+        node.clear()
+        node.update(items)
+    elif isinstance(node, list):
+        node[:] = [intern_tree(v) for v in node]
+    elif isinstance(node, str):
+        return sys.intern(node)
+    return node
+
+class Names:
+    """Interns names to small ints, in first-seen order; an id never changes within a process."""
+    def __init__(self):
+        self.ids: Dict[str, int] = {}
+        self.names: List[str] = []
+        self._lock = threading.Lock()       # replicates on a thread pool register names concurrently
+
+    def id(self, name: str) -> int:
+        i = self.ids.get(name)
+        if i is None:
+            with self._lock:
+                i = self.ids.get(name)
+                if i is None:
+                    i = self.ids[name] = len(self.names)
+                    self.names.append(sys.intern(name))
+        return i
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+NAMES = Names()
+
+_EMPTY = object()
+
+class SlotTable(MutableMapping):
+    """
+    {name: value} for one unit, stored as a list indexed by NAMES ids. Iterates in
+    the order names were first set, like the dict it stands in for. An unused table
+    holds no lists, so most enemy units carry only the object itself.
+    """
+    __slots__ = ("slots", "order")
+
+    def __init__(self):
+        self.slots: List[Any] = ()          # a list once something is set
+        self.order: List[int] = ()          # ids holding a value, first set first
+
+    def at(self, i: int, default=None):
+        slots = self.slots
+        if i < len(slots):
+            v = slots[i]
+            if v is not _EMPTY:
+                return v
+        return default
+
+    def put(self, i: int, value) -> None:
+        slots = self.slots
+        if i >= len(slots):
+            # ids are handed out at content load, so tables stop growing early in a fight
+            slots = self.slots = [*slots, *([_EMPTY] * (i + 1 - len(slots)))]
+        if slots[i] is _EMPTY:
+            if self.order:
+                self.order.append(i)
+            else:
+                self.order = [i]
+        slots[i] = value
+
+    def get(self, name: str, default=None):
+        return self.at(NAMES.id(name), default)
+
+    def __getitem__(self, name: str):
+        v = self.at(NAMES.id(name), _EMPTY)
+        if v is _EMPTY:
+            raise KeyError(name)
+        return v
+
+    def __setitem__(self, name: str, value) -> None:
+        self.put(NAMES.id(name), value)
+
+    def __delitem__(self, name: str) -> None:
+        i = NAMES.id(name)
+        if self.at(i, _EMPTY) is _EMPTY:
+            raise KeyError(name)
+        self.slots[i] = _EMPTY
+        self.order.remove(i)
+
+    def __contains__(self, name) -> bool:
+        return isinstance(name, str) and self.at(NAMES.id(name), _EMPTY) is not _EMPTY
+
+    def __iter__(self) -> Iterator[str]:
+        names = NAMES.names
+        return iter([names[i] for i in self.order])
+
+    def __len__(self) -> int:
+        return len(self.order)
+
+    def clear(self) -> None:
+        self.slots = ()
+        self.order = ()
+
+    def __repr__(self) -> str:
+        return f"SlotTable({dict(self.items())!r})"
@@ -3,21 +3,146 @@ from __future__ import annotations
 from dataclasses import dataclass, field
 from typing import Optional, Dict, Any, List
 from .engine import s_to_us, Bus, Engine
+from .ids import (CRIT, HASTE, CAST_HASTE, DOT_HASTE, DOT_HASTE_MULT, DAMAGE_MULT, STAT_EMPTY, STAT_FIELDS, NAMES,
+                  SlotTable, stat_totals)
 from math import floor
+from bisect import insort
 
-@dataclass
+# props keys that hot paths read; Buff copies them into slots once at construction
+_STAT_PROPS = STAT_FIELDS
+
+@dataclass(slots=True)
 class Buff:
     name: str
     expires_at_us: Optional[int] = None      # None = no timeout
     expire_evt: Optional[object] = None
-    props: Dict[str, Any] = field(default_factory=dict)  # generic payload
+    props: Dict[str, Any] = field(default_factory=dict)  # generic payload (everything but stacks)
+    stacks: Optional[int] = None             # None = not a stacking buff (props["stacks"] moves here)
+    source: Optional[object] = None          # unit that applied it, for debuffs on enemies (None = the holder)
+    # stat payload, None = buff doesn't carry it
+    crit_bonus: Optional[float] = field(default=None, init=False)
+    haste_bonus: Optional[float] = field(default=None, init=False)
+    cast_haste_bonus: Optional[float] = field(default=None, init=False)
+    dot_haste_bonus: Optional[float] = field(default=None, init=False)
+    dot_haste_mult: Optional[float] = field(default=None, init=False)
+    damage_bonus: Optional[float] = field(default=None, init=False)
+    # one-shot bonus for the next cast of affected_cast (consumed in start_cast / comp_channel)
+    affected_cast: Optional[str] = field(default=None, init=False)
+    affected_crit_bonus: Optional[float] = field(default=None, init=False)
+    affected_haste_bonus: Optional[float] = field(default=None, init=False)
+
+    def __post_init__(self):
+        props = self.props
+        if "stacks" in props:
+            self.stacks = props.pop("stacks")
+        for key in _STAT_PROPS:
+            v = props.get(key)
+            if v is not None:
+                setattr(self, key, float(v))
+        if props:
+            self.affected_cast = props.get("affected_cast")
+            self.affected_crit_bonus = props.get("affected_crit_bonus")
+            self.affected_haste_bonus = props.get("affected_haste_bonus")
 
-@dataclass
 class ChargeState:
-    cur: int
-    max: int
-    recharge_s: float
-    pending: list = field(default_factory=list)  # scheduled recharge events
+    """
+    Charges kept as timestamps, no engine events. Every spent charge recharges on
+    its own timer; recharge_at holds those (t_us, seq) ready keys, sorted, and a
+    timer that comes due while the ability is already full is simply lost.
+    A timer counts once the engine is past its (t_us, seq) key (Engine.has_passed),
+    i.e. exactly when a recharge event with that key would have fired.
+
+    Reads (cur, charges_at, ready_in_us, next_charge_in_us) are pure arithmetic on
+    the clock; writes (consume/grant/reduce) first fold due timers into `base`.
+    """
+    __slots__ = ("base", "max", "recharge_s", "recharge_at", "eng")
+
+    def __init__(self, cur: int, max: int, recharge_s: float, eng: Optional[Engine] = None):
+        self.base = int(cur)            # charges as of the last write
+        self.max = int(max)
+        self.recharge_s = float(recharge_s)
+        self.recharge_at: List[tuple] = []
+        self.eng = eng
+
+    def _now(self) -> int:
+        return self.eng.t_us if self.eng is not None else 0
+
+    def _due(self, now_us: int) -> int:
+        # at the engine's clock a timer is due once its virtual event has "run"
+        eng = self.eng
+        live = eng is not None and now_us == eng.t_us
+        n = 0
+        for t, seq in self.recharge_at:
+            if not (eng.has_passed(t, seq) if live else t <= now_us):
+                break
+            n += 1
+        return n
+
+    def charges_at(self, now_us: int) -> int:
+        return min(self.max, self.base + self._due(now_us))
+
+    @property
+    def cur(self) -> int:
+        return self.charges_at(self._now())
+
+    @cur.setter
+    def cur(self, v: int):
+        self.settle(self._now())
+        self.base = int(v)
+
+    def ready_in_us(self, now_us: int) -> int:
+        """0 if a charge is available at now_us, else time until the next one lands."""
+        if self.charges_at(now_us) > 0 or not self.recharge_at:
+            return 0
+        return self.recharge_at[0][0] - now_us
+
+    def next_charge_in_us(self, now_us: int) -> int:
+        """Time until the next charge lands; 0 when full or nothing is recharging."""
+        if self.charges_at(now_us) >= self.max:
+            return 0
+        due = self._due(now_us)
+        if due < len(self.recharge_at):
+            return self.recharge_at[due][0] - now_us
+        return 0
+
+    # ---- writes ----
+    def _timer(self, t_us: int) -> tuple:
+        return (t_us, self.eng.reserve_seq() if self.eng is not None else 0)
+
+    def settle(self, now_us: int):
+        due = self._due(now_us)
+        if due:
+            del self.recharge_at[:due]
+            self.base = min(self.max, self.base + due)
+
+    def consume(self, now_us: int) -> bool:
+        self.settle(now_us)
+        if self.base <= 0:
+            return False
+        self.base -= 1
+        if self.base < self.max:
+            insort(self.recharge_at, self._timer(now_us + s_to_us(self.recharge_s)))
+        return True
+
+    def grant(self, now_us: int, amount: int = 1) -> int:
+        self.settle(now_us)
+        added = 0
+        while amount > 0 and self.base < self.max:
+            self.base += 1
+            added += 1
+            amount -= 1
+        if added and self.base >= self.max:
+            self.recharge_at.clear()    # just filled up: running timers would only overfill
+        return added
+
+    def reduce(self, now_us: int, delta_us: int):
+        """Pull the soonest recharge earlier (or start one, shortened, if none is running)."""
+        self.settle(now_us)
+        if self.recharge_at:
+            t0 = self.recharge_at.pop(0)[0]
+            insort(self.recharge_at, self._timer(max(now_us, t0 - delta_us)))
+        elif self.base < self.max:
+            self.recharge_at.append(self._timer(max(now_us, now_us + s_to_us(self.recharge_s) - delta_us)))
 
 class EmberPool:
     def __init__(self,owner: "Unit", maximum: float=500, starting: float=200, bus: Bus=None, eng: Engine=None):
@@ -34,7 +159,7 @@ class EmberPool:
         self.phased_generate += v
         if self.phased_generate >= 100:
             amount = floor(self.phased_generate / 100)
-            self.bus.pub("generate_ember", t_us=self.eng.t_us,amount=amount)
+            self.bus.pub("generate_ember", src=self.owner, t_us=self.eng.t_us,amount=amount)
             self.phased_generate = self.phased_generate % 100
         self.cur = min(self.max, self.cur + v)
     def spend(self, v: int) -> bool:
@@ -45,7 +170,7 @@ class EmberPool:
         if self.cur >= v:
             self.cur -= v
             self.spent += v
-            self.bus.pub("spend_ember",t_us=self.eng.t_us, amount=amount)
+            self.bus.pub("spend_ember", src=self.owner, t_us=self.eng.t_us, amount=amount)
             return True
         return False
 
@@ -65,57 +190,136 @@ class SpiritPool:
             self.cur -= v; self.spent += v; return True
         return False
 
+class BuffManager:
+    """
+    Owns the buff dict of one unit and keeps exactly one live expiry event per buff
+    (buff.expire_evt): replacing or removing a buff cancels its event, extending it
+    postpones the event instead of scheduling another one. Every change to the set of
+    buffs refreshes the owner's stat totals (Unit.restat), so all buff adds and
+    removals go through here.
+
+    Publishes buff_apply (new buff object), buff_refresh (same name re-applied, stacks
+    added, or extended), buff_expire (timed out) and buff_remove (taken off before
+    expiry: consumed procs etc.), all with buff=, target=, t_us=. buff_remove only goes
+    out while someone listens (trace exporters); talents don't. Events go out with
+    src=buff.source (debuffs) or the holder, see Bus.
+    """
+    def __init__(self, owner: "Unit"):
+        self.owner = owner
+        self.buffs: Dict[str, Buff] = owner.buffs
+        self.live: Dict[str, object] = {}     # buff name -> pending expiry event
+
+    def live_events(self) -> int:
+        return len(self.live)
+
+    def _pub(self, name: str, buff: Buff):
+        bus = self.owner.bus
+        src = buff.source or self.owner
+        if bus.has_subs(name, src):
+            bus.pub(name, src=src, buff=buff, target=self.owner, t_us=self.owner.eng.t_us)
+
+    def _disarm(self, buff: Buff):
+        evt = buff.expire_evt
+        if evt is not None:
+            evt.cancelled = True
+            buff.expire_evt = None
+            if self.live.get(buff.name) is evt:
+                del self.live[buff.name]
+
+    def arm(self, buff: Buff):
+        """(Re)key the buff's expiry event to buff.expires_at_us."""
+        if buff.expires_at_us is None:
+            self._disarm(buff)
+            return
+        eng = self.owner.eng
+        evt = buff.expire_evt
+        if evt is not None and eng.postpone(evt, buff.expires_at_us):
+            return
+        self._disarm(buff)
+        def expire():
+            if buff.expire_evt is not evt:
+                return
+            if eng.t_us < buff.expires_at_us:     # expires_at_us moved without arm()
+                buff.expire_evt = None
+                self.live.pop(buff.name, None)
+                self.arm(buff)
+                return
+            self.expire(buff)
+        evt = buff.expire_evt = self.live[buff.name] = eng.schedule_at(buff.expires_at_us, expire)
+
+    def apply(self, buff: Buff):
+        old = self.buffs.get(buff.name)
+        if old is not None:
+            self._disarm(old)
+        self.buffs[buff.name] = buff
+        self.owner.restat()
+        self.arm(buff)
+        self._pub("buff_refresh" if old is not None else "buff_apply", buff)
+
+    def apply_stacks(self, buff: Buff):
+        """Add buff.stacks to the live buff of that name (keeping its timer), or apply it."""
+        cur = self.buffs.get(buff.name)
+        if cur:
+            cur.stacks += buff.stacks or 0
+            cur.stacks = min(cur.stacks, buff.props.get("max_stacks", 1000))
+            self._pub("buff_refresh", cur)
+        else:
+            buff.stacks = min(buff.stacks, buff.props.get("max_stacks", 1000))
+            self.buffs[buff.name] = buff
+            self.owner.restat()
+            self.arm(buff)
+            self._pub("buff_apply", buff)
+
+    def extend(self, name: str, dur_us: float):
+        buff = self.buffs.get(name)
+        if not buff or buff.expires_at_us is None:
+            return
+        buff.expires_at_us += dur_us
+        self.arm(buff)
+        self._pub("buff_refresh", buff)
+
+    def remove(self, name: str) -> Optional[Buff]:
+        buff = self.buffs.pop(name, None)
+        if buff is not None:
+            self.owner.restat()
+            self._disarm(buff)
+            self._pub("buff_remove", buff)
+        return buff
+
+    def expire(self, buff: Buff):
+        buff.expire_evt = None
+        self.live.pop(buff.name, None)
+        if self.buffs.get(buff.name) is not buff:
+            return
+        self.owner.bus.pub("buff_expire", src=buff.source or self.owner, buff=buff, target=self.owner, t_us=self.owner.eng.t_us)
+        if buff.stacks is not None:
+            buff.stacks = 0
+        self.buffs.pop(buff.name, None)
+        self.owner.restat()
+        # On removal, also retime if it affected DoT haste
+        if buff.dot_haste_mult is not None:
+            self.owner.recalc_dot_timers()
+
 def reduce_cooldown_us(player, eng, ability_id: str, delta_us: int):
     now = eng.t_us
 
     # Charges path
     st = player.charges.get(ability_id) if hasattr(player, "charges") else None
     if st:
-        # Pull the *soonest* pending recharge earlier
-        if st.pending:
-            # cancel & reschedule earlier
-            evt = min(st.pending, key=lambda e: e.t_us)
-            new_t = max(now, evt.t_us - delta_us)
-            evt.cancelled = True
-            st.pending.remove(evt)
-
-            def on_recharge():
-                st.cur = min(st.max, st.cur + 1)
-                # if still not full, schedule next (whatever your existing logic is)
-                # (optional) try ensure_charges again here
-            new_evt = eng.schedule_at(new_t, on_recharge)
-            st.pending.append(new_evt)
-            return
-
-        # No pending but not full? schedule one now minus delta
-        if st.cur < st.max:
-            new_t = max(now, now + s_to_us(st.recharge_s) - delta_us)
-            def on_recharge():
-                st.cur = min(st.max, st.cur + 1)
-            st.pending = [eng.schedule_at(new_t, on_recharge)]
+        st.reduce(now, delta_us)
         return
 
     # Simple cooldown path
-    ready_at = player.cooldown_ready_us.get(ability_id, 0)
+    i = NAMES.id(ability_id)
+    ready_at = player.cooldown_ready_us.at(i, 0)
     if now < ready_at:
-        player.cooldown_ready_us[ability_id] = max(now, ready_at - delta_us)
+        player.cooldown_ready_us.put(i, max(now, ready_at - delta_us))
 
 def grant_charge(player, eng, ability_id: str, amount: int = 1):
     st = getattr(player, "charges", {}).get(ability_id)
     if not st or amount <= 0:
         return 0
-    added = 0
-    while amount > 0 and st.cur < st.max:
-        st.cur += 1
-        added += 1
-        amount -= 1
-        # if we just became full, cancel the soonest pending recharge
-        if st.cur >= st.max and getattr(st, "pending", None):
-            # cancel all pending to avoid overfill
-            for e in st.pending:
-                e.cancelled = True
-            st.pending.clear()
-    return added
+    return st.grant(eng.t_us, amount)
 
 class Unit:
     def __init__(self, name, eng, bus, rng: RNG, haste: float = 1.0, power: float = 100.0, base_crit: float = 0.05, base_spirit_gain: float = 1.0, critical_strike_multiplier: float = 2.0):
@@ -133,68 +337,90 @@ class Unit:
         self.spiritbar = SpiritPool(self,100, 0)
         self.gcd_ready_us = 0
         self.busy_until_us = 0
+        self.channel_evt = None     # periodic tick event of the channel in progress (comp_channel)
 
-        self.charges: Dict[str, ChargeState] = {}  # ability_id -> ChargeState
+        # Per-ability tables are SlotTables: {name: value} over slots indexed by NAMES ids (sim/core/ids.py)
+        self.charges: SlotTable = SlotTable()  # ability_id -> ChargeState
 
-        # Debuffs/DoTs on this unit (e.g., Burn)
-        self.auras: Dict[str, object] = {}
+        # Debuffs/DoTs on this unit (e.g., Burn), indexed by the unit that applied them:
+        # auras_by[owner][name]. Casters read and write their own via auras_of(owner).
+        self.auras_by: Dict[object, Dict[str, object]] = {}
         # Self-buffs (e.g., Pyromania)
         self.buffs: Dict[str, Buff] = {}
+        self.stat_totals: List[float] = list(STAT_EMPTY)   # per stat id over self.buffs, see sim/core/ids.py
+        self.buff_mgr = BuffManager(self)
 
         # Cooldowns (by ability id)
-        self.cooldown_ready_us: Dict[str, int] = {}
+        self.cooldown_ready_us: SlotTable = SlotTable()
 
         # accounting
-        self.damage_by_ability: Dict[str, float] = {}
-        self.cast_counts: Dict[str, int] = {}
+        self.damage_by_ability: SlotTable = SlotTable()   # damage tag -> total
+        self.cast_counts: SlotTable = SlotTable()         # ability name -> casts
         self.total_damage = 0.0
 
         self.active_dots: List[object] = []   # <-- track DotState instances
-        self.next_crit_for: dict[str, int] = {}  # ability_id -> stacks
-        self.next_crit_bonus_for: dict[str, int] = {}  # ability_id -> stacks
-        self.next_crit_bonus_is: dict[str, float] = {}  # ability_id -> bonus
+        self.next_crit_for: SlotTable = SlotTable()  # ability_id -> stacks
+        self.next_crit_bonus_for: SlotTable = SlotTable()  # ability_id -> stacks
+        self.next_crit_bonus_is: SlotTable = SlotTable()  # ability_id -> bonus
+
+    def restat(self) -> None:
+        """Recompute stat_totals from the live buffs (BuffManager calls this on every change)."""
+        self.stat_totals = stat_totals(self.buffs.values())
 
     def current_crit(self)->float:
-        bonus=sum(float(b.props.get("crit_bonus",0.0)) for b in self.buffs.values())
-        return max(0.0, min(1.0,self.base_crit+bonus))
+        return max(0.0, min(1.0,self.base_crit+self.stat_totals[CRIT]))
 
     def dot_haste_multiplier(self) -> float:
         """Multiply caster haste for DoT tick rate by any buff-provided multipliers."""
-        mult = 1.0
-        for b in self.buffs.values():
-            m = b.props.get("dot_haste_mult")
-            if m is not None:
-                mult *= float(m)
-        return mult
+        return self.stat_totals[DOT_HASTE_MULT]
 
     def dot_haste_bonus(self) -> float:
         """Add caster haste for DoT tick rate by any buff-provided multipliers."""
-        add = 0.0
-        for b in self.buffs.values():
-            m = b.props.get("dot_haste_bonus")
-            if m is not None:
-                add += float(m)
-        return add
+        return self.stat_totals[DOT_HASTE]
 
     def haste_bonus(self) -> float:
         """Generic additive haste from buffs (e.g., +0.10 = +10%)."""
-        return sum(float(b.props.get("haste_bonus", 0.0)) for b in self.buffs.values())
+        return self.stat_totals[HASTE]
 
     def cast_haste_bonus(self) -> float:
         """Additive haste that applies specifically to CAST TIMES."""
-        return sum(float(b.props.get("cast_haste_bonus", 0.0)) for b in self.buffs.values())
+        return self.stat_totals[CAST_HASTE]
 
     # -------- damage/accounting --------
-    def add_damage(self, amount: float, tag: str):
+    def add_damage(self, amount: float, tag):
+        # tag: a damage tag, or its NAMES id (what the per-hit callers pass)
         self.total_damage += amount
-        self.damage_by_ability[tag] = self.damage_by_ability.get(tag, 0.0) + amount
+        i = tag if tag.__class__ is int else NAMES.id(tag)
+        self.damage_by_ability.put(i, self.damage_by_ability.at(i, 0.0) + amount)
 
     # -------- auras on this unit --------
-    def has_aura(self, name: str) -> bool:
-        return name in self.auras
-
-    def aura_remains_us(self, name: str, now_us: int) -> int:
-        dot = self.auras.get(name)
+    def auras_of(self, owner) -> Dict[str, object]:
+        """The auras `owner` has on this unit, by name (the live dict)."""
+        auras = self.auras_by.get(owner)
+        if auras is None:
+            auras = self.auras_by[owner] = {}
+        return auras
+
+    def aura(self, name: str, owner=None):
+        """owner's aura `name`; with owner=None, the first one anybody has applied."""
+        if owner is not None:
+            auras = self.auras_by.get(owner)
+            return auras.get(name) if auras else None
+        for auras in self.auras_by.values():
+            a = auras.get(name)
+            if a is not None:
+                return a
+        return None
+
+    def all_auras(self):
+        for auras in self.auras_by.values():
+            yield from auras.values()
+
+    def has_aura(self, name: str, owner=None) -> bool:
+        return self.aura(name, owner) is not None
+
+    def aura_remains_us(self, name: str, now_us: int, owner=None) -> int:
+        dot = self.aura(name, owner)
         if not dot: return 0
         return max(0, getattr(dot, "expires_at_us", now_us) - now_us)
 
@@ -214,48 +440,24 @@ class Unit:
                     pass
 
     def add_buff(self, buff: Buff):
-        self.buffs[buff.name] = buff
+        self.buff_mgr.apply(buff)
 
         # If this buff affects DoT haste, retime immediately
-        if "dot_haste_mult" in buff.props:
+        if buff.dot_haste_mult is not None:
             self.recalc_dot_timers()
 
-        if buff.expires_at_us is not None:
-            def expire():
-                if self.buffs.get(buff.name) is buff and self.eng.t_us >= buff.expires_at_us:
-                    self.buffs.pop(buff.name, None)
-                    # On removal, also retime if it affected DoT haste
-                    if "dot_haste_mult" in buff.props:
-                        self.recalc_dot_timers()
-            self.eng.schedule_at(buff.expires_at_us, expire)
-
     def add_stacking_buff(self, buff: Buff):
-        if self.buffs.get(buff.name):
-            self.buffs[buff.name].props["stacks"] += buff.props.get("stacks", 0)
-        else:
-            self.buffs[buff.name] = buff
+        self.buff_mgr.apply_stacks(buff)
 
-        self.buffs[buff.name].props["stacks"] = min(self.buffs[buff.name].props["stacks"], buff.props.get("max_stacks", 1000))
         # If this buff affects DoT haste, retime immediately
-        if "dot_haste_mult" in buff.props:
+        if buff.dot_haste_mult is not None:
             self.recalc_dot_timers()
 
-        if buff.expires_at_us is not None:
-            def expire():
-                if self.buffs.get(buff.name) is buff and self.eng.t_us >= buff.expires_at_us:
-                    self.bus.pub("buff_expire",buff=buff,target=self)
-                    self.buffs[buff.name].props["stacks"] = 0
-                    self.buffs.pop(buff.name, None)
-                    # On removal, also retime if it affected DoT haste
-                    if "dot_haste_mult" in buff.props:
-                        self.recalc_dot_timers()
-            self.eng.schedule_at(buff.expires_at_us, expire)
-
     def remove_buff(self, buff: Buff):
-        self.buffs.pop(buff.name, None)
+        self.buff_mgr.remove(buff.name)
 
     def remove_buff_by_name(self, buff: str):
-        self.buffs.pop(buff, None)
+        self.buff_mgr.remove(buff)
 
     def has_buff(self, name: str) -> bool:
         return name in self.buffs
@@ -263,7 +465,7 @@ class Unit:
     def ensure_charges(self, ability_id: str, max_charges: int, recharge_s: float):
         st = self.charges.get(ability_id)
         if st is None:
-            self.charges[ability_id] = ChargeState(cur=max_charges, max=max_charges, recharge_s=float(recharge_s))
+            self.charges[ability_id] = ChargeState(cur=max_charges, max=max_charges, recharge_s=float(recharge_s), eng=self.eng)
         else:
             st.max = int(max_charges)
             st.recharge_s = float(recharge_s)
@@ -271,38 +473,44 @@ class Unit:
 
     def has_charge(self, ability_id: str) -> bool:
         st = self.charges.get(ability_id)
-        return bool(st and st.cur > 0)
+        return bool(st and st.charges_at(self.eng.t_us) > 0)
+
+    def is_ready(self, ability_id) -> bool:
+        """Charge available (charged abilities) or cooldown elapsed; ability_id may be a NAMES id. Pure, O(1)."""
+        i = ability_id if ability_id.__class__ is int else NAMES.id(ability_id)
+        st = self.charges.at(i)
+        if st is not None:
+            return st.charges_at(self.eng.t_us) > 0
+        return self.eng.t_us >= self.cooldown_ready_us.at(i, 0)
+
+    def ready_in_us(self, ability_id) -> int:
+        """0 if castable now (cooldown-wise), else microseconds until it is; ability_id may be a NAMES id. Pure, O(1)."""
+        now = self.eng.t_us
+        i = ability_id if ability_id.__class__ is int else NAMES.id(ability_id)
+        st = self.charges.at(i)
+        if st is not None:
+            return st.ready_in_us(now)
+        ready_at = self.cooldown_ready_us.at(i, 0)
+        return 0 if now >= ready_at else (ready_at - now)
 
     def time_until_next_charge_us(self, ability_id: str) -> int:
         # optional helper if you later want smarter APL scheduling
         st = self.charges.get(ability_id)
-        if not st or st.cur >= st.max or not st.pending:
+        if not st:
             return 0
-        # pending holds events scheduled at specific times; pull earliest
-        next_evt = min(st.pending, key=lambda e: e.t_us)
-        return max(0, next_evt.t_us - self.eng.t_us)
+        return st.next_charge_in_us(self.eng.t_us)
 
-    def consume_charge(self, ability_id: str):
-        st = self.charges[ability_id]
-        if st.cur <= 0:
+    def interrupt_channel(self) -> bool:
+        """Stop the channel in progress, if any: its remaining ticks don't run."""
+        evt, self.channel_evt = self.channel_evt, None
+        if evt is None or evt.cancelled:
             return False
-        st.cur -= 1
-
-        # schedule a recharge only if we are below max
-        if st.cur < st.max:
-            def on_recharge(st_ref=st):
-                # remove this evt from pending, then increment if still below max
-                try:
-                    st_ref.pending.remove(evt)
-                except ValueError:
-                    pass
-                if st_ref.cur < st_ref.max:
-                    st_ref.cur += 1
-
-            evt = self.eng.schedule_in(s_to_us(st.recharge_s), on_recharge)
-            st.pending.append(evt)
+        self.eng.cancel(evt)
         return True
 
+    def consume_charge(self, ability_id: str):
+        return self.charges[ability_id].consume(self.eng.t_us)
+
     def grant_next_crit(self, ability_id: str, stacks: int = 1):
         self.next_crit_for[ability_id] = self.next_crit_for.get(ability_id, 0) + stacks
 
@@ -311,6 +519,8 @@ class Unit:
         self.next_crit_bonus_is[ability_id] = bonus
 
     def consume_next_crit(self, ability_id: str) -> bool:
+        if not self.next_crit_for.order:
+            return False
         n = self.next_crit_for.get(ability_id, 0)
         if n > 0:
             if n == 1:
@@ -331,6 +541,8 @@ class Unit:
         return False
 
     def consume_next_crit_bonus(self, ability_id: str) -> float:
+        if not self.next_crit_bonus_for.order:
+            return 0
         n = self.next_crit_bonus_for.get(ability_id, 0)
         bonus = self.next_crit_bonus_is.get(ability_id, 0)
         if n > 0:
@@ -343,38 +555,57 @@ class Unit:
         return 0
 
     def buff_damage_mult(self) -> float:
-        mult = 1.0
-        for b in self.buffs.values():
-            #print("checking for damage mult in:",b)
-            if "damage_bonus" in b.props:
-                mult *= float(b.props["damage_bonus"])
-        return mult
+        return self.stat_totals[DAMAGE_MULT]
 
     def schedule_buff_expire(self,buff_id: str) -> bool:
-        # cancel old, schedule new at current expires_at_us
+        # re-key the buff's single expiry event to its current expires_at_us
         buff = self.buffs.get(buff_id)
-        if buff.expires_at_us is not None:
-            def expire():
-                if self.buffs.get(buff.name) is buff and self.eng.t_us >= buff.expires_at_us:
-                    #print("actually expiring",buff)
-                    self.bus.pub("buff_expire",buff=buff,target=self)
-                    self.buffs[buff.name].props["stacks"] = 0
-                    self.buffs.pop(buff.name, None)
-                    # On removal, also retime if it affected DoT haste
-                    if "dot_haste_mult" in buff.props:
-                        self.recalc_dot_timers()
-            self.eng.schedule_at(buff.expires_at_us, expire)
+        if not buff or buff.expires_at_us is None:
+            return False
+        self.buff_mgr.arm(buff)
+        return True
 
     def extend_buff(self,buff_id: str,dur_us: float = 0) -> bool:
         buff = self.buffs.get(buff_id)
-        if not buff:
-            return
-        if buff.expires_at_us is not None:
-            buff.expires_at_us += dur_us
-            self.schedule_buff_expire(buff_id)
+        if not buff or buff.expires_at_us is None:
+            return False
+        self.buff_mgr.extend(buff_id, dur_us)
+        return True
 
 
 class TargetDummy(Unit):
     def __init__(self, eng, bus, rng, name:str = "Target"):
         super().__init__(name, eng, bus, rng, haste=1.0, power=0.0, base_crit=0.0)
-        self.is_dead = False
\ No newline at end of file
+        self.is_dead = False
+
+    def reclaim(self):
+        """
+        Cancel everything still scheduled against this unit: other units' DoTs on it
+        (also dropped from their owners' active_dots) and its buff/debuff expiries.
+        The events stay in the queue, cancelled, until Engine.compact() or they surface.
+        """
+        for auras in list(self.auras_by.values()):
+            for aura in list(auras.values()):
+                if hasattr(aura, "_remove_now"):
+                    aura._remove_now()
+        self.auras_by.clear()
+        for name in list(self.buffs):
+            self.buff_mgr.remove(name)
+
+    def reset(self):
+        """Back to a fresh, alive dummy with the same name (World's long-fight pool)."""
+        self.reclaim()
+        self.is_dead = False
+        self.gcd_ready_us = 0
+        self.busy_until_us = 0
+        self.ember.cur, self.ember.generated, self.ember.spent, self.ember.phased_generate = 200, 0, 0, 0
+        self.spiritbar.cur, self.spiritbar.generated, self.spiritbar.spent = 0, 0.0, 0.0
+        self.charges.clear()
+        self.cooldown_ready_us.clear()
+        self.damage_by_ability.clear()
+        self.cast_counts.clear()
+        self.total_damage = 0.0
+        self.active_dots.clear()
+        self.next_crit_for.clear()
+        self.next_crit_bonus_for.clear()
+        self.next_crit_bonus_is.clear()
@@ -4,29 +4,46 @@ from typing import List, Tuple
 from .engine import s_to_us
 from .unit import TargetDummy
 
+# long-fight mode: a despawned dummy is only reused this long after it died, so casts
+# and missiles already aimed at it land on a dead unit, not on its next incarnation
+REUSE_AFTER_US = s_to_us(10.0)
+
 class World:
-    def __init__(self, eng, bus, rng):
+    """
+    Enemies of one fight. By default every spawned dummy stays in `enemies` and its
+    pending DoT / buff events run out on their own.
+
+    long_fight=True keeps memory flat over fight length for many-pull encounters:
+    despawn reclaims the dummy (cancels its DoTs' and buffs' events, drops it from
+    `enemies`, compacts the event queue) and parks it in a pool; spawn reuses a parked
+    dummy, name included, once REUSE_AFTER_US has passed. Target names are then
+    bounded by the largest number of enemies up (or recently dead) at once.
+    """
+    def __init__(self, eng, bus, rng, long_fight: bool = False):
         self.eng, self.bus, self.rng = eng, bus, rng
         self.enemies: List[TargetDummy] = []
+        self.alive: List[TargetDummy] = []     # alive enemies in spawn order; alive[0] is the primary (read-only for callers)
         self._seq = 0
+        self.long_fight = long_fight
+        self.pool: List[Tuple[int, TargetDummy]] = []   # (despawned at, dummy), oldest first
         self.sample_names = ["AA","BB","CC","DD","EE","FF","GG","HH"]
 
     # ---- queries ----
     def enemies_alive(self) -> List[TargetDummy]:
-        return [u for u in self.enemies if not getattr(u, "is_dead", False)]
+        return list(self.alive)
 
     def primary(self):
-        for u in self.enemies:
-            if not u.is_dead:
-                return u
-        return None
+        return self.alive[0] if self.alive else None
 
     # ---- mutations ----
     def spawn_one(self):
-        self._seq += 1
-        u = TargetDummy(self.eng, self.bus, self.rng)
-        u.name = f"Target#{self._seq}"
+        u = self._from_pool() if self.long_fight else None
+        if u is None:
+            self._seq += 1
+            u = TargetDummy(self.eng, self.bus, self.rng)
+            u.name = f"Target#{self._seq}"
         self.enemies.append(u)
+        self.alive.append(u)
         self.bus.pub("enemy_spawn", unit=u, t_us=self.eng.t_us)
         return u
 
@@ -34,9 +51,23 @@ class World:
         if getattr(u, "is_dead", False):
             return
         u.is_dead = True
+        self.alive.remove(u)
+        if self.long_fight:
+            u.reclaim()     # cancel its DoTs and buffs now, not when they next surface
         # Optional: proactively clear auras to stop further ticks
-        u.auras.clear()
+        u.auras_by.clear()
         self.bus.pub("enemy_despawn", unit=u, t_us=self.eng.t_us)
+        if self.long_fight:
+            self.enemies.remove(u)
+            self.pool.append((self.eng.t_us, u))
+
+    def _from_pool(self):
+        pool = self.pool
+        if not pool or self.eng.t_us - pool[0][0] < REUSE_AFTER_US:
+            return None
+        _, u = pool.pop(0)
+        u.reset()   # also reclaims anything that landed on it while dead
+        return u
 
     # bring alive count to exactly n
     def set_enemy_count(self, n: int):
@@ -44,8 +75,11 @@ class World:
         while len(alive) < n:
             self.spawn_one()
             alive = self.enemies_alive()
-        while len(alive) > n:
-            self.despawn_one(alive.pop())
+        if len(alive) > n:
+            while len(alive) > n:
+                self.despawn_one(alive.pop())
+            if self.long_fight:
+                self.eng.compact()
 
 def schedule_encounter(world: World, plan: list[tuple[float, int]]):
     """plan = [(t_s, count), ...] — at each t_s set alive enemies to count."""
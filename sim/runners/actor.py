@@ -0,0 +1,210 @@
+# sim/runners/actor.py
+"""
+One player on a (possibly shared) Engine / Bus / World: its Unit, content pack,
+talents, charges, character listeners, APL and APL wake loop.
+
+run_sim builds one of these; run_raid builds several on the same world. Each
+actor's talent and character listeners subscribe with src=player, so they only
+run for that actor's events, and its DoTs live in target.auras_of(player).
+"""
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Dict
+from math import inf
+from ..runtime.pack import load_character_spec, load_apl_factory, load_enabled_talents
+from ..runtime.talents import attach_talent_listeners, apply_talent_stat_mods
+from ..runtime.loader import (AbilityBook, apl_reachable_abilities, index_abilities, patched_specs, start_cast,
+                              Ctx)
+from ..core.unit import Unit, TargetDummy
+from ..core.apl import Wait, WakeScheduler
+from ..runtime.char_listeners import attach_swallow_listener, attach_wrath_listener
+import sys
+
+def _apl_sources(apl_path: str, apl) -> list:
+    """The pack's apl.py plus the module defining the APL's class (e.g. SimpleAPL)."""
+    paths = [apl_path]
+    mod = sys.modules.get(type(apl).__module__)
+    path = getattr(mod, "__file__", None)
+    if path and path.endswith(".py") and path not in paths:
+        paths.append(path)
+    return paths
+
+@dataclass
+class ActorConfig:
+    character: str = "Ardeos"
+    talents: Dict[str, bool] = None          # e.g., {"2A": True}
+    power: float = 100.0
+    haste: float = 1.0
+    base_crit: float = 0.05
+    base_spirit_gain: float = 1.0
+    movement: float = 0
+    name: str | None = None                  # unit name; run_raid defaults to "<character>#<n>"
+
+class Actor:
+    def __init__(self, eng, bus, world, rng, content_dir: str, cfg: ActorConfig, name: str = "Player"):
+        self.cfg = cfg
+        self.eng, self.bus, self.world = eng, bus, world
+        pack = load_character_spec(content_dir, cfg.character)
+        make_apl = load_apl_factory(pack.paths["apl"],talents=cfg.talents)
+
+        player = self.player = Unit(name, eng, bus, rng, haste=cfg.haste, power=cfg.power, base_crit=cfg.base_crit,base_spirit_gain=cfg.base_spirit_gain)
+        target = TargetDummy(eng, bus, rng)
+        ctx_cfg = {
+            "talents": cfg.talents or {},
+            "resource_aliases": pack.resource_aliases,
+            "world": world,
+        }
+
+        # Abilities load on demand (AbilityBook); the ones the APL and talents can reach are preloaded below
+        def init_charges(s):
+            #ensure charged abilities are initialized
+            if s.charges is not None:
+                player.ensure_charges(s.id,s.charges["max"],s.charges["recharge_s"])#we start each fight at max charges, could be configured?
+        index = index_abilities(pack.paths["abilities"])
+        specs = self.specs = AbilityBook(index, on_load=init_charges)
+        talent_dicts = load_enabled_talents(pack.paths["talents"], cfg.talents)
+
+        # Helper: cooldown readiness (charges are set up when an ability loads; these never mutate state)
+        def is_cd_ready(ability_id) -> bool:
+            return player.is_ready(specs[ability_id].id_slot)
+
+        # APL
+        def is_off_gcd(ability_id: str) -> bool:
+            spec = specs.get(ability_id)
+            return bool(spec and spec.off_gcd)
+
+        def time_until_ready_us(ability_id: str) -> int:
+            """Returns 0 if ready now; positive microseconds until ready; inf if unknown/not coming soon."""
+            spec = specs.get(ability_id)
+            if not spec:
+                return inf
+            return player.ready_in_us(spec.id_slot)
+
+        cooldown_ids = [-1, ()]   # (book size it was built for, ids)
+
+        def cooldown_abilities():
+            """Loaded abilities with a cooldown or charges; rebuilt when another one loads."""
+            if cooldown_ids[0] != len(specs):
+                cooldown_ids[:] = len(specs), tuple(aid for aid, s in specs.items() if s.cooldown_s or s.charges)
+            return cooldown_ids[1]
+
+        def enemies_alive():
+            return world.enemies_alive()
+
+        def count_enemies() -> int:
+            return len(world.alive)
+
+        def count_aura(aura_name: str, owner_only: bool = True) -> int:
+            owner = player if owner_only else None
+            return sum(1 for u in world.alive if u.aura(aura_name, owner))
+
+        def next_enemy_missing_aura(aura_name: str):
+            for u in world.alive:
+                if not u.aura(aura_name, player):
+                    return u
+            return world.primary()  # fallback
+
+        apl = self.apl = make_apl(player, target, world, cfg.talents, cfg.movement, helpers={
+            "is_cd_ready": is_cd_ready,
+            "is_off_gcd": is_off_gcd,
+            "time_until_ready_us": time_until_ready_us,
+            "count_enemies": count_enemies,
+            "count_aura": count_aura,
+            "next_enemy_missing_aura": next_enemy_missing_aura,
+            "enemies_alive": enemies_alive,
+            "cooldown_abilities": cooldown_abilities,
+        })
+
+        # reachable set, patched and frozen specs: once per process, then shared by every replicate with these talents
+        reachable = apl_reachable_abilities(pack.paths["abilities"], index, _apl_sources(pack.paths["apl"], apl),
+                                            talent_dicts)
+        specs.share(patched_specs(pack.paths["abilities"], index, reachable, talent_dicts)).preload(reachable)
+        apply_talent_stat_mods(player, talent_dicts)
+        _ = attach_talent_listeners(specs,world,talent_dicts, player, bus)
+
+        if cfg.character == "Rime":
+            attach_swallow_listener(
+                player, bus, world,
+                triggers=("torrent", "cold_snap"),  # ability ids that should proc
+                coeff=63.0,
+                fanout_chance=0.35,
+            )
+            attach_wrath_listener(
+                player, bus, world,
+                triggers=("glacial_blast"),
+                buff_name="WrathOfWinter"
+            )
+
+        def _apl():
+            now = eng.t_us
+
+            # If casting, wake at cast end (CAST_END already does this), so just bail
+            if now < player.busy_until_us:
+                wake_apl.request(player.busy_until_us)
+                return
+
+            # If GCD is still running: try an off-GCD weave now; otherwise, wait for ready
+            if now < player.gcd_ready_us:
+                choice = apl.choose_offgcd(now)
+                if isinstance(choice, Wait):   # nothing to weave before then (on-GCD choices still wake at GCD end)
+                    wake_apl.request(max(now, min(choice.until_us, player.gcd_ready_us)))
+                    return
+                if not choice:
+                    wake_apl.request(player.gcd_ready_us)
+                    return
+                wake_apl.last_choice = choice
+                spec = specs[choice]
+                # Resource/readiness guard (redundant)
+                if spec.cost.get("ember", 0) > player.ember.cur or not is_cd_ready(choice):
+                    wake_apl.request(player.gcd_ready_us)
+                    return
+                if spec.cost.get("spirit_bar", 0) > player.spiritbar.cur or not is_cd_ready(choice):
+                    wake_apl.request(player.gcd_ready_us)
+                    return
+                # Start off-GCD cast; its on_cast_end will call wake_apl() again
+
+                ctx = Ctx(eng, bus, ctx_cfg, player, target, spec, wake_apl)
+
+
+                start_cast(ctx)
+                return
+
+            # Gates are clear: pick an on-GCD action
+
+            pick = apl.choose(now) # consult the APL
+            if isinstance(pick, Wait):
+                wake_apl.request(max(pick.until_us, now))
+                return
+            choice, target_for_cast = pick
+            wake_apl.last_choice = choice
+            spec = specs.get(choice)
+            if not is_cd_ready(choice) or spec.cost.get("ember", 0) > player.ember.cur:
+                # Should be rare; try again at the next "ready" moment (not `now`: the same pick would spin)
+                ready_at = max(player.gcd_ready_us, player.busy_until_us, now + player.ready_in_us(spec.id_slot))
+                wake_apl.request(ready_at)
+                return
+
+            ctx = Ctx(eng, bus, ctx_cfg, player, target_for_cast or world.primary(), spec, wake_apl)
+            start_cast(ctx)  # also schedules ready-at wake + cast-end wake
+
+        # one pending APL wake at a time (see WakeScheduler); start_cast and cast ends go through it too
+        wake_apl = self.wake_apl = WakeScheduler(eng, _apl)
+
+    def start(self, t_us: int = 0):
+        """Queue the first APL wake."""
+        self.wake_apl.request(t_us)
+
+    def report(self, duration_s: float) -> dict:
+        player = self.player
+        total = player.total_damage
+        by_ability = {k: (v, v/total*100 if total>0 else 0) for k,v in player.damage_by_ability.items()}
+        return {
+            "total_damage": total,
+            "dps": total / duration_s,
+            "by_ability": by_ability,
+            "casts": dict(player.cast_counts),
+            "ember_generated": player.ember.generated,
+            "ember_spent": player.ember.spent,
+            "ember_end": player.ember.cur,
+            "apl_evaluations": self.wake_apl.evaluations,
+        }
@@ -1,19 +1,12 @@
 # sim/runners/target_dummy.py
 from __future__ import annotations
 from dataclasses import dataclass
-from ..runtime.pack import load_character_spec, load_apl_factory, load_enabled_talents
-from ..runtime.talents import apply_talent_patches, attach_talent_listeners, apply_talent_stat_mods
-from ..runtime.loader import load_abilities_from_dir, AbilitySpec, start_cast, Ctx
-#from ..runtime.effects import load_effect_specs, EffectInstance
-from typing import Dict
-import os
-from ..core.engine import Engine, Bus, s_to_us, APL
-from ..core.unit import Unit, TargetDummy
+from contextlib import nullcontext
+from typing import Callable, Dict
+from ..core.engine import Engine, Bus, s_to_us, MAX_EVENTS_PER_TS, MAX_EVENTS_PER_SIM_S
 from ..core.rng import RNG
 from ..core.world import World, schedule_encounter
-from ..runtime.loader import load_abilities_from_dir, start_cast, AbilitySpec, Ctx
-from ..core.apl import SimpleAPL
-from sim.runtime.char_listeners import attach_swallow_listener, attach_wrath_listener
+from .actor import Actor, ActorConfig
 
 
 
@@ -29,198 +22,67 @@ class SimConfig:
     character: str = "Ardeos"
     encounter: list[tuple[float,int]] | None = None   # e.g. [(0,1),(15,3),(30,1)]
     movement: float = 0
+    timeline: str | None = None     # write a columnar event timeline (.npz) here, see sim/tools/timeline.py
+    trace: str | None = None        # stream a Chrome/Perfetto trace (.json) here, see sim/tools/chrome_trace.py
+    profile: bool | str = False     # True: print a ranked profile (sim/tools/profiler.py); "collect": only result["profile"]
+    long_fight: bool = False        # reclaim and pool despawned enemies so memory stays flat (see World)
+    # event budgets, None = unlimited; over them the run raises SimBudgetExceeded (see Engine)
+    max_events_per_ts: int | None = MAX_EVENTS_PER_TS
+    max_events_per_sim_s: int | None = MAX_EVENTS_PER_SIM_S
+    wall_limit_s: float | None = None
+    should_stop: Callable[[], bool] | None = None   # polled every simulated second; True raises SimCancelled
+    quiet: bool = False             # skip the talents echo on stdout
 
 
 
 def run_sim(content_dir: str, cfg: SimConfig):
-    eng, bus = Engine(), Bus()
+    eng, bus = Engine(cfg.max_events_per_ts, cfg.max_events_per_sim_s, cfg.wall_limit_s), Bus()
     rng = RNG(cfg.seed)
-    pack = load_character_spec(content_dir, cfg.character)
-    make_apl = load_apl_factory(pack.paths["apl"],talents=cfg.talents)
-    movement = cfg.movement
-
-    world = World(eng, bus, rng)
-    schedule_encounter(world, cfg.encounter or [(0, 1)])  # default: 1 target full sim
-
-    player = Unit("Player", eng, bus, rng, haste=cfg.haste, power=cfg.power, base_crit=cfg.base_crit,base_spirit_gain=cfg.base_spirit_gain)
-    target = TargetDummy(eng, bus, rng)
-    print(cfg.talents)
-    ctx_cfg = {
-        "talents": cfg.talents or {},
-        "resource_aliases": pack.resource_aliases,
-        "world": world,  # <-- add this
-    }
-
-
-    # Load abilities
-    specs = load_abilities_from_dir(pack.paths["abilities"])
-    talent_dicts = load_enabled_talents(pack.paths["talents"], cfg.talents)
-    apply_talent_patches(specs, talent_dicts)
-    apply_talent_stat_mods(player, talent_dicts)
-    _ = attach_talent_listeners(specs,world,talent_dicts, player, bus)
-
-    #ensure charged abilities are initialized
-    for spec in specs:
-        s = specs[spec]
-        if s.charges is not None:
-            player.ensure_charges(s.id,s.charges["max"],s.charges["recharge_s"])#we start each fight at max charges, could be configured?
-
-    if cfg.character == "Rime":
-        attach_swallow_listener(
-            player, bus, world,
-            triggers=("torrent", "cold_snap"),  # ability ids that should proc
-            coeff=63.0,
-            fanout_chance=0.35,
-        )
-        attach_wrath_listener(
-            player, bus, world,
-            triggers=("glacial_blast"),
-            buff_name="WrathOfWinter"
-        )
-
-    # Helper: cooldown readiness
-    def is_cd_ready(ability_id) -> bool:
-        spec = specs[ability_id]
-        # charges take precedence if present
-        if spec.charges and int(spec.charges.get("max", 0)) > 0:
-            max_ch = int(spec.charges["max"])
-            recharge_s = float(spec.charges.get("recharge_s", spec.cooldown_s or 0.0))
-            player.ensure_charges(spec.id, max_ch, recharge_s)
-            return player.has_charge(spec.id)
-            # classic cooldown path
-        ready_at = player.cooldown_ready_us.get(spec.id, 0)
-        return eng.t_us >= ready_at
-
-    # APL
-    def is_off_gcd(ability_id: str) -> bool:
-        spec = specs.get(ability_id)
-        return bool(spec and spec.off_gcd)
-
-    def time_until_ready_us(ability_id: str) -> int:
-        """Returns 0 if ready now; positive microseconds until ready; inf if unknown/not coming soon."""
-        spec = specs.get(ability_id)
-        if not spec:
-            return inf
-        now = eng.t_us
-
-        # Charges path
-        if spec.charges and int(spec.charges.get("max", 0)) > 0:
-            max_ch = int(spec.charges["max"])
-            recharge_s = float(spec.charges.get("recharge_s", spec.cooldown_s or 0.0))
-            player.ensure_charges(spec.id, max_ch, recharge_s)
-            st = player.charges.get(spec.id)
-            if not st:
-                return 0  # should not happen, but be permissive
-            if st.cur > 0:
-                return 0
-            if st.pending:
-                next_evt = min(st.pending, key=lambda e: e.t_us)
-                return max(0, next_evt.t_us - now)
-            # No pending event yet (e.g., never consumed) → treat as ready
-            return 0
-
-        # Classic cooldown path
-        ready_at = player.cooldown_ready_us.get(spec.id, 0)
-        return 0 if now >= ready_at else (ready_at - now)
-
-    def enemies_alive():
-        return world.enemies_alive()
-
-    def count_enemies() -> int:
-        return len(world.enemies_alive())
-
-    def count_aura(aura_name: str, owner_only: bool = True) -> int:
-        c = 0
-        for u in world.enemies_alive():
-            dot = u.auras.get(aura_name)
-            if not dot:
-                continue
-            if owner_only and dot.owner is not player:
-                continue
-            c += 1
-        return c
-
-    def next_enemy_missing_aura(aura_name: str):
-        for u in world.enemies_alive():
-            dot = u.auras.get(aura_name)
-            if not dot or dot.owner is not player:
-                return u
-        return world.primary()  # fallback
-
-    apl = make_apl(player, target, world, cfg.talents, movement, helpers={
-        "is_cd_ready": is_cd_ready,
-        "is_off_gcd": is_off_gcd,
-        "time_until_ready_us": time_until_ready_us,
-        "count_enemies": count_enemies,
-        "count_aura": count_aura,
-        "next_enemy_missing_aura": next_enemy_missing_aura,
-        "enemies_alive": enemies_alive,
-    })
-
-    def _split_choice(choice):
-        if isinstance(choice, tuple) and len(choice) == 2:
-            return choice[0], choice[1]
-        return choice, world.primary()
-
-    def wake_apl():
-        now = eng.t_us
-
-        # If casting, wake at cast end (CAST_END already does this), so just bail
-        if now < player.busy_until_us:
-            eng.schedule_at(player.busy_until_us, wake_apl, phase=APL)
-            return
-
-        # If GCD is still running: try an off-GCD weave now; otherwise, wait for ready
-        if now < player.gcd_ready_us:
-            choice = apl.choose_offgcd(now)
-            if not choice:
-                eng.schedule_at(player.gcd_ready_us, wake_apl, phase=APL)
-                return
-            spec = specs[choice]
-            # Resource/readiness guard (redundant)
-            if spec.cost.get("ember", 0) > player.ember.cur or not is_cd_ready(choice):
-                eng.schedule_at(player.gcd_ready_us, wake_apl, phase=APL)
-                return
-            if spec.cost.get("spirit_bar", 0) > player.spiritbar.cur or not is_cd_ready(choice):
-                eng.schedule_at(player.gcd_ready_us, wake_apl, phase=APL)
-                return
-            # Start off-GCD cast; its on_cast_end will call wake_apl() again
-
-            ctx = Ctx(eng, bus, ctx_cfg, player, target, spec, wake_apl)
-
-
-            start_cast(ctx)
-            return
-
-        # Gates are clear: pick an on-GCD action
-
-        choice, target_for_cast = apl.choose(now) # consult the APL
-        #choice, target_for_cast = _split_choice(pre_choice) #pick a target
-        spec = specs.get(choice)
-        if not is_cd_ready(choice) or spec.cost.get("ember", 0) > player.ember.cur:
-            # Should be rare; try again at the next "ready" moment
-            ready_at = max(player.gcd_ready_us, player.busy_until_us)
-            eng.schedule_at(ready_at, wake_apl, phase=APL)
-            return
-
-        ctx = Ctx(eng, bus, ctx_cfg, player, target_for_cast or world.primary(), spec, wake_apl)
-        start_cast(ctx)  # also schedules ready-at wake + cast-end wake
-
-    # Kick off and run
-    eng.schedule_at(0, wake_apl, phase=APL)
-    eng.run_until(s_to_us(cfg.duration_s))
+    recorder = None
+    if cfg.timeline:
+        from ..tools.timeline import TimelineRecorder
+        recorder = TimelineRecorder().attach(bus, eng)
+    tracer = None
+    if cfg.trace:
+        from ..tools.chrome_trace import ChromeTraceWriter
+        tracer = ChromeTraceWriter(cfg.trace).attach(bus, eng)
+
+    if cfg.profile:
+        from ..tools.profiler import profiling
+        profiled = profiling(bus)
+    else:
+        profiled = nullcontext()
+
+    end_us = None     # stays None if the run raises (budget, cancel): the files end where it stopped
+    try:
+        with profiled as prof:
+            world = World(eng, bus, rng, long_fight=cfg.long_fight)
+            schedule_encounter(world, cfg.encounter or [(0, 1)])  # default: 1 target full sim
+
+            if not cfg.quiet:
+                print(cfg.talents)
+            actor = Actor(eng, bus, world, rng, content_dir, ActorConfig(
+                character=cfg.character, talents=cfg.talents, power=cfg.power, haste=cfg.haste,
+                base_crit=cfg.base_crit, base_spirit_gain=cfg.base_spirit_gain, movement=cfg.movement,
+            ))
+
+            # Kick off and run
+            actor.start(0)
+            eng.run_until(s_to_us(cfg.duration_s), should_stop=cfg.should_stop)
+            end_us = s_to_us(cfg.duration_s)
+    finally:
+        try:
+            if recorder is not None:
+                recorder.save_npz(cfg.timeline)
+        finally:
+            if tracer is not None:
+                tracer.close(end_us)
 
     # Report
-    total = player.total_damage
-    dps = total / cfg.duration_s
-    by_ability = {k: (v, v/total*100 if total>0 else 0) for k,v in player.damage_by_ability.items()}
-    return {
-        "duration_s": cfg.duration_s,
-        "total_damage": total,
-        "dps": dps,
-        "by_ability": by_ability,
-        "casts": dict(player.cast_counts),
-        "ember_generated": player.ember.generated,
-        "ember_spent": player.ember.spent,
-        "ember_end": player.ember.cur,
-    }
+    result = {"duration_s": cfg.duration_s, **actor.report(cfg.duration_s),
+              "engine_events": eng.heap_pushes, "timeline": cfg.timeline, "trace": cfg.trace}
+    if prof is not None:
+        result["profile"] = prof.to_dict()
+        if cfg.profile != "collect":
+            print(prof.report())
+    return result
@@ -1,4 +1,6 @@
 # sim/runtime/char_listeners.py (new helper module, or tuck into talents.py if you prefer)
+from .targeting import ALL_ENEMIES
+
 def attach_swallow_listener(player, bus, world,
                                  triggers=("freezing_torrent", "cold_snap"),
                                  buff_name="swallows",
@@ -17,9 +19,9 @@ def attach_swallow_listener(player, bus, world,
             return
         if not player.buffs[buff_name]:
             return
-        if player.buffs[buff_name].props["stacks"] <= 0:
+        if player.buffs[buff_name].stacks <= 0:
             return
-        hits = player.buffs[buff_name].props["stacks"]
+        hits = player.buffs[buff_name].stacks
 
         # pick your damage calc the same way your 'damage' component does
         def one_hit(target, i,ratio:float=1.0):
@@ -30,7 +32,7 @@ def attach_swallow_listener(player, bus, world,
                 dmg *= 2.0
             # apply damage + publish for any subscribers
             player.add_damage(dmg, "Swallow")
-            bus.pub("damage_done",
+            bus.pub("damage_done", src=player,
                     t_us=eng.t_us,
                     ability_id="swallow_proc",
                     step_type="damage",
@@ -42,7 +44,7 @@ def attach_swallow_listener(player, bus, world,
         for i in range(hits):
             fanout = player.rng.roll(f"{rng_prefix}:{i}", fanout_chance)
             if fanout and world:
-                for u in (world.enemies_alive() or []):
+                for u in ALL_ENEMIES.select(world.alive, player):
                     one_hit(u, i,ratio=0.7)
             else:
                 one_hit(tgt0, i)
@@ -57,7 +59,7 @@ def attach_swallow_listener(player, bus, world,
             return
         do_bursting_hits(target)
 
-    bus.sub("cast_end", on_cast_end)
+    bus.sub("cast_end", on_cast_end, src=player, label="swallow_listener")
 
 # sim/runtime/char_listeners.py (new helper module, or tuck into talents.py if you prefer)
 def attach_wrath_listener(player, bus, world,
@@ -69,7 +71,7 @@ def attach_wrath_listener(player, bus, world,
     """
 
     def make_cast_instant(ctx):
-        ctx.spec.cast["modified_cast_time_s"] = 0
+        ctx.cast_time_s = 0
 
     # main hook: whenever a cast ends, if buff is up and ability is in triggers, proc
     def on_cast_start(ability_id=None, caster=None, target=None, ctx=None, **_):
@@ -81,5 +83,5 @@ def attach_wrath_listener(player, bus, world,
             return
         make_cast_instant(ctx)
 
-    bus.sub("cast_start", on_cast_start)
+    bus.sub("cast_start", on_cast_start, src=player, label="wrath_listener")
 
@@ -1,22 +1,58 @@
 # sim/runtime/components.py
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import Callable, Dict, Any, List, Optional, Union
+from types import MappingProxyType
+from typing import Callable, Dict, Any, List, Mapping, Optional, Union
 from ..core.engine import s_to_us, CAST_END, DAMAGE, APL, CHANNEL_TICK
 from ..core.dot import DotState
+from ..core.ids import NAMES
 from ..core.unit import Buff, grant_charge, reduce_cooldown_us
+from .targeting import ALL_ENEMIES, selector_for
 from math import floor
 
 ComponentExec = Callable[['Ctx', Dict[str, Any]], None]
-COMPONENTS: Dict[str, ComponentExec] = {}
+_REGISTRY: Dict[str, ComponentExec] = {}
+# step type -> component; filled by @component as this module is imported, read-only after.
+# A sim that needs other implementations (the profiler's timing wrappers) puts its own
+# table on its Bus (bus.components), which its Ctxs pick up.
+COMPONENTS: Mapping[str, ComponentExec] = MappingProxyType(_REGISTRY)
 
 def component(name: str):
     def reg(fn: ComponentExec):
-        COMPONENTS[name] = fn; return fn
+        _REGISTRY[name] = fn; return fn
     return reg
 
+class FrozenDict(dict):
+    """A dict that refuses writes: the mappings of a frozen AbilitySpec (see freeze_tree)."""
+    __slots__ = ()
+
+    def _readonly(self, *_, **__):
+        raise TypeError("frozen ability data is read-only; override per cast on Ctx instead")
+    __setitem__ = __delitem__ = update = setdefault = pop = popitem = clear = _readonly
+    __ior__ = _readonly
+
+    def __reduce__(self):
+        return (FrozenDict, (dict(self),))
+    def __copy__(self): return self
+    def __deepcopy__(self, memo): return self
+
+def freeze_tree(node):
+    """Read-only copy of a parsed YAML tree: dicts -> FrozenDict, lists -> tuples, sets -> frozensets."""
+    if isinstance(node, dict):
+        return node if type(node) is FrozenDict else FrozenDict((k, freeze_tree(v)) for k, v in node.items())
+    if isinstance(node, (list, tuple)):
+        return tuple(freeze_tree(v) for v in node)
+    if isinstance(node, set):
+        return frozenset(node)
+    return node
+
 @dataclass
 class AbilitySpec:
+    """
+    An ability as loaded and talent-patched. freeze() makes it read-only, after
+    which one spec object can be shared by every actor and replicate in a process
+    (loader.patched_specs); per-cast changes go on the Ctx (cast_time_s, gcd_s, cost).
+    """
     id: str
     name: str
     cast: dict                  # {gcd_s, cast_time_s}
@@ -29,14 +65,56 @@ class AbilitySpec:
     on_cast_start: bool = False
     is_hasted: bool = True
 
+    def __setattr__(self, name, value):
+        if self.__dict__.get("frozen"):
+            raise TypeError(f"ability spec {self.id!r} is frozen")
+        object.__setattr__(self, name, value)
+
+    def freeze(self) -> "AbilitySpec":
+        """Make the spec and everything under it read-only; returns self."""
+        if self.__dict__.get("frozen"):
+            return self
+        for step in _walk_steps(self.pipeline):
+            if step.get("type") == "fanout":
+                selector_for(step)      # compile the target selector while the step can still cache it
+        for f in ("cast", "cost", "pipeline", "tags", "charges"):
+            object.__setattr__(self, f, freeze_tree(getattr(self, f)))
+        if "meta" in self.__dict__:
+            object.__setattr__(self, "meta", freeze_tree(self.meta))
+        # NAMES ids for the per-unit SlotTables (cooldowns, charges, cast and damage counts)
+        object.__setattr__(self, "id_slot", NAMES.id(self.id))
+        object.__setattr__(self, "name_slot", NAMES.id(self.name))
+        object.__setattr__(self, "frozen", True)
+        return self
+
+def _walk_steps(node):
+    """Every dict anywhere under a pipeline (steps, nested pipelines, their options)."""
+    if isinstance(node, dict):
+        yield node
+        node = node.values()
+    elif not isinstance(node, (list, tuple)):
+        return
+    for v in node:
+        yield from _walk_steps(v)
+
 class Ctx:
-    """Context passed through pipeline and casts."""
+    """
+    Context passed through pipeline and casts.
+
+    cast_time_s / gcd_s / cost override the spec's for this cast only; cast_start
+    listeners set them (e.g. a proc that makes the cast instant) and start_cast reads
+    them after publishing cast_start. None means "use the spec's".
+    """
     def __init__(self, eng, bus, cfg, caster, target, spec: AbilitySpec, wake_apl: Callable[[], None]):
         self.eng, self.bus, self.cfg = eng, bus, cfg
         self.caster, self.target, self.spec = caster, target, spec
         self.vars: Dict[str, Any] = {}
-        self.wake_apl = wake_apl
+        self.wake_apl = wake_apl     # the caster's WakeScheduler: call to run the APL now, .request(t_us) to wake later
         self.outer_step_type = 'default'
+        self.cast_time_s: Optional[float] = None
+        self.gcd_s: Optional[float] = None
+        self.cost: Optional[dict] = None
+        self.components = bus.components or COMPONENTS
 
     @property
     def power(self) -> float: return self.caster.power
@@ -56,7 +134,7 @@ def run_pipeline(ctx: Ctx, pipeline: List[dict]) -> None:
     i = 0
     while i < len(pipeline):
         step = pipeline[i]
-        fn = COMPONENTS[step["type"]]
+        fn = ctx.components[step["type"]]
         fn(ctx, step)
         i += 1
 
@@ -92,8 +170,8 @@ def comp_damage(ctx: Ctx, step: dict):
 
     dmg = base * (ctx.caster.critical_strike_multiplier if is_crit else 1.0)
     ctx.caster.spiritbar.gain(dmg/1000) #gain spirit for damage dealt, approx 1% per 1000% of primary stat dealt
-    ctx.caster.add_damage(dmg, ctx.spec.name)
-    ctx.bus.pub("damage_done",
+    ctx.caster.add_damage(dmg, ctx.spec.name_slot)
+    ctx.bus.pub("damage_done", src=ctx.caster,
                 t_us=ctx.eng.t_us,
                 ability_id=ctx.spec.id,
                 step_type="damage",
@@ -136,7 +214,7 @@ def comp_stack_dot(ctx: Ctx, step: dict):
         fixed_crit = -1
     first_delay_us = int(round(base_tick_us / max(1e-9, ctx.caster.haste + ctx.caster.dot_haste_bonus()))) if first == "interval" else 0
 
-    dot = ctx.target.auras.get(name)
+    dot = ctx.target.auras_of(ctx.caster).get(name)
     now = ctx.eng.t_us
     if dot is None:
         dot = DotState(
@@ -148,15 +226,10 @@ def comp_stack_dot(ctx: Ctx, step: dict):
             stacks=0, max_stacks=max_stacks, stack_mult_per=stack_mult_per,
             bonus_crit=bonus_crit, fixed_crit=fixed_crit,
         )
-        ctx.target.auras[name] = dot
+        ctx.target.auras_of(ctx.caster)[name] = dot
         ctx.caster.active_dots.append(dot)
         dot.add_stacks(now, add_stacks, new_duration_us=dur_us)
         dot.schedule_first_tick()
-        def on_expire():
-            if ctx.target.auras.get(name) is dot and ctx.eng.t_us >= dot.expires_at_us:
-                ctx.target.auras.pop(name, None)
-                if dot in ctx.caster.active_dots: ctx.caster.active_dots.remove(dot)
-        ctx.eng.schedule_at(dot.expires_at_us, on_expire)
     else:
         dot.add_stacks(now, add_stacks, new_duration_us=dur_us)
 
@@ -164,8 +237,12 @@ def comp_stack_dot(ctx: Ctx, step: dict):
 def comp_channel(ctx: Ctx, step: dict):
     """
     Schedule repeated 'on_tick' actions evenly across the (hasted) cast/channel duration.
-    Requires 'ticks: int' and 'on_tick: [components...]' in the step.
+    Requires 'ticks: int' (or 'tick_dur: seconds') and 'on_tick: [components...]' in the step.
     Assumes start_cast() set ctx.vars['cast_us'] and ctx.vars['cast_start_us'].
+    The ticks are one periodic engine event, left in ctx.vars['channel_evt'] and on the
+    caster (Unit.channel_evt): a new channel, or Unit.interrupt_channel(), stops the old
+    one's remaining ticks.
+    The spacing is recomputed from the caster's haste before every tick.
     """
     ticks = step.get("ticks")
     tick_dur = step.get("tick_dur")
@@ -179,43 +256,54 @@ def comp_channel(ctx: Ctx, step: dict):
 
     for k in list(ctx.caster.buffs.keys()):
         b = ctx.caster.buffs[k]
-        if b.props.get("affected_haste_bonus") is not None:
-            affected_id = b.props["affected_cast"]
+        if b.affected_haste_bonus is not None:
+            affected_id = b.affected_cast
             if affected_id == ctx.spec.id:
-                amount = b.props["affected_haste_bonus"]
+                amount = b.affected_haste_bonus
                 temp_haste_bonus += amount
                 ctx.caster.remove_buff(b)
-        if b.props.get("affected_crit_bonus") is not None:
-            affected_id = b.props["affected_cast"]
+        if b.affected_crit_bonus is not None:
+            affected_id = b.affected_cast
             if affected_id == ctx.spec.id:
-                amount = b.props["affected_crit_bonus"]
+                amount = b.affected_crit_bonus
                 temp_crit_bonus += amount
                 ctx.caster.remove_buff(b)
 
     if (ticks is None and on_tick is None) or cast_us <= 0: return
+    caster = ctx.caster
+    caster.interrupt_channel()      # replaces a channel that is still ticking
     if ticks is not None and ticks > 0:
-        spacing = cast_us // ticks  # integer microseconds; last tick may land before cast end
+        spacing0 = cast_us // ticks  # integer microseconds; last tick may land before cast end
+        haste0 = caster.haste + caster.haste_bonus() + caster.cast_haste_bonus()
+        def spacing():
+            # cast_us was hasted at cast start: scale by how much haste changed since
+            if not ctx.spec.is_hasted:
+                return spacing0
+            return spacing0 * (haste0 / (caster.haste + caster.haste_bonus() + caster.cast_haste_bonus()))
     else: #we specify a tick duration, not a count
-        eff_haste = max(1e-9, ctx.caster.haste + ctx.caster.haste_bonus()+temp_haste_bonus)
         tick_dur_us = s_to_us(tick_dur)
-        tick_dur_us = tick_dur_us/eff_haste
-        ticks = floor(cast_us/tick_dur_us)
-        spacing = start_us // ticks
-
-    def make_cb(i: int):
-        def _cb():
-            # run the on_tick pipeline in-place
-            run_pipeline(ctx, on_tick)
-        return _cb
+        def spacing():
+            return tick_dur_us / max(1e-9, caster.haste + caster.haste_bonus() + temp_haste_bonus)
+        ticks = floor(cast_us/spacing())
 
     if temp_crit_bonus>0: #actually give credit for the temporary crit, in a durable way across pipeline steps
-        ctx.caster.grant_next_crit_bonus(ctx.spec.id, ticks, temp_crit_bonus)
-
-    for i in range(1, ticks):
-        t = start_us + i * spacing
-        ctx.eng.schedule_at(t, make_cb(i), phase=CHANNEL_TICK)
-
-
+        caster.grant_next_crit_bonus(ctx.spec.id, ticks, temp_crit_bonus)
+
+    if ticks <= 1: return
+    # ticks 1..ticks-1 as a single periodic event; Unit.interrupt_channel() stops it
+    left = [ticks - 1]
+    def _tick():
+        # run the on_tick pipeline in-place
+        left[0] -= 1
+        run_pipeline(ctx, on_tick)
+    def _next():
+        if left[0] > 0:
+            return spacing()
+        if caster.channel_evt is evt:
+            caster.channel_evt = None
+        return None
+    evt = ctx.vars["channel_evt"] = caster.channel_evt = ctx.eng.schedule_every(
+        start_us + spacing(), _tick, _next, phase=CHANNEL_TICK)
 
 @component("dot")
 def comp_dot(ctx: Ctx, step: dict):
@@ -233,7 +321,7 @@ def comp_dot(ctx: Ctx, step: dict):
     fixed_crit = float(step.get("fixed_crit", -1))
     is_hasted = bool(step.get("is_hasted", True))
 
-    dot = ctx.target.auras.get(name)
+    dot = ctx.target.auras_of(ctx.caster).get(name)
     now = ctx.eng.t_us
     if dot is None:
         dot = DotState(
@@ -248,17 +336,9 @@ def comp_dot(ctx: Ctx, step: dict):
             fixed_crit = fixed_crit,
             is_hasted = is_hasted,
         )
-        ctx.target.auras[name] = dot
+        ctx.target.auras_of(ctx.caster)[name] = dot
         ctx.caster.active_dots.append(dot)        # <-- track ownership
         dot.schedule_first_tick()
-
-        def on_expire():
-            if ctx.target.auras.get(name) is dot and ctx.eng.t_us >= dot.expires_at_us:
-                ctx.target.auras.pop(name, None)
-                # remove from owner's active list
-                if dot in ctx.caster.active_dots:
-                    ctx.caster.active_dots.remove(dot)
-        ctx.eng.schedule_at(dot.expires_at_us, on_expire)
     else:
         overlap_dur = 0
         if dot.refresh_overlap > 0:
@@ -296,7 +376,7 @@ def comp_applystacking_debuff(ctx: Ctx, step: dict):
     if "stacks_on_crit" in props and ctx.vars["last_hit_crit"] and ctx.caster.rng.roll("apply extra stacks",props["stacks_on_crit_chance"]):
         props["stacks"] = props["stacks_on_crit"]
     #print("Buff:",name,expires,props)
-    ctx.target.add_stacking_buff(Buff(name=name, expires_at_us=expires, props=props))
+    ctx.target.add_stacking_buff(Buff(name=name, expires_at_us=expires, props=props, source=ctx.caster))
 
 # sim/runtime/components.py
 def _world(ctx):
@@ -311,10 +391,13 @@ def comp_fanout(ctx: Ctx, step: dict):
         count: int                     # how many to hit (try to get this many)
         include_primary: bool = True   # prioritize current primary first
         owner: "enemies" | "allies" = "enemies"
+        exclude_primary: bool = False  # never hit the primary
         prefer_missing_aura: str | None
+        require_aura: str | None       # only targets carrying this aura
         owner_only_for_aura: bool = True
         distinct: bool = True          # don't hit same target twice
       pipeline: [ ... ]                # components to run per target
+    The selection is compiled once per step, see sim/runtime/targeting.py.
     """
     world = _world(ctx)
     assert world is not None, "fanout requires world in ctx.cfg"
@@ -324,78 +407,13 @@ def comp_fanout(ctx: Ctx, step: dict):
         if not ctx.caster.rng.roll("fanout chance",chance):
             return
 
-    sel = step.get("select", {})
-    want = int(step.get("count", 1))
-    include_primary = bool(step.get("include_primary", True))
-    exclude_primary = bool(step.get("exclude_primary", False))
-    prefer_aura = step.get("prefer_missing_aura")
-    require_aura = step.get("require_aura")
-    owner_only_for_aura = bool(step.get("owner_only_for_aura", True))
-    distinct = bool(step.get("distinct", True))
-    side = step.get("owner", "enemies")
     stack_buff = step.get("stack_buff", None)
 
     if stack_buff:
-        ctx.vars["stacks"] = ctx.target.buffs.get(stack_buff, {}).props.get("stacks",0)
-
-    # candidate pool
-    if side == "enemies":
-        pool = world.enemies_alive()
-    else:
-        # Add allies() helper later if needed; for now stick to enemies.
-        pool = world.enemies_alive()
-
-    if not pool:
-        return
+        ctx.vars["stacks"] = ctx.target.buffs.get(stack_buff, {}).stacks or 0
 
-    # Build priority lists
-    primary = world.primary() if include_primary else None
-    chosen = []
-    def add(u):
-        if not u: return
-        if distinct and u in chosen: return
-        chosen.append(u)
-
-    if primary:
-        add(primary)
-
-    if prefer_aura:
-        missing = []
-        haveit = []
-        for u in pool:
-            dot = u.auras.get(prefer_aura)
-            ok = False
-            if not dot:
-                ok = True
-            elif not owner_only_for_aura:
-                ok = False  # it's present (by anyone)
-            else:
-                ok = (dot.owner is not ctx.caster)  # treat as "missing *yours*"
-            (missing if ok else haveit).append(u)
-        for u in missing: add(u)
-        for u in haveit: add(u)
-    if require_aura:
-        missing = []
-        haveit = []
-        for u in pool:
-            dot = u.auras.get(require_aura)
-            ok = False
-            if dot and (dot.owner or not owner_only_for_aura):
-                ok = True
-            else:
-                ok = False  # treat as "missing *yours*"
-            (haveit if ok else missing).append(u)
-        for u in haveit: add(u)
-    else:
-        for u in pool: add(u)
-
-    primary = world.primary() if exclude_primary else None
-    if exclude_primary:
-        for u in chosen:
-            if u == primary:
-                chosen.remove(u)
-
-    targets = chosen[:want] if distinct else (chosen * want)[:want]
+    # candidate pool: alive enemies (allies() helper later if needed; owner: allies uses enemies for now)
+    targets = selector_for(step).select(world.alive, ctx.caster)
     if not targets:
         return
 
@@ -472,7 +490,7 @@ def comp_dot_from_last_hit(ctx: Ctx, step: dict):
     dot.src_ability_id = ctx.vars.get("last_hit_ability", ctx.spec.id)
 
     # register & schedule
-    ctx.target.auras[name] = dot
+    ctx.target.auras_of(ctx.caster)[name] = dot
     ctx.caster.active_dots.append(dot)
     dot.schedule_first_tick()
 
@@ -495,11 +513,9 @@ def comp_scale_by_my_dot_count(ctx: Ctx, step: dict):
     exclude = set(step.get("exclude", []))
     owner_only = bool(step.get("owner_only", True))
     n = 0
-    for aura in ctx.target.auras.values():
+    for aura in (ctx.target.auras_of(ctx.caster).values() if owner_only else ctx.target.all_auras()):
         if not isinstance(aura, DotState):
             continue
-        if owner_only and aura.owner is not ctx.caster:
-            continue
         name = aura.name
         if include is not None and name not in include:
             continue
@@ -539,11 +555,9 @@ def comp_burst_dots(ctx: Ctx, step: dict):
 
     total = 0.0
 
-    for dot in list(ctx.target.auras.values()):
+    for dot in list(ctx.target.auras_of(ctx.caster).values() if owner_only else ctx.target.all_auras()):
         if not isinstance(dot, DotState):
             continue
-        if owner_only and dot.owner is not ctx.caster:
-            continue
 
         # respect expiry within window
         stop = min(end, dot.expires_at_us)
@@ -559,7 +573,7 @@ def comp_burst_dots(ctx: Ctx, step: dict):
         mult = 1.0
 
         if dot.name == "SearingBlaze":
-            amp = dot.target.auras.get("SearingBlazeAmp")
+            amp = dot.target.auras_of(dot.owner).get("SearingBlazeAmp")
             if amp:
                 mult *= (1.0 + amp.get("stacks", 0) * amp.get("per", 0.0))
 
@@ -574,14 +588,14 @@ def comp_burst_dots(ctx: Ctx, step: dict):
             if ctx.caster.rng.roll("detonate_crit", ctx.caster.current_crit()):
                 total *= 2.0
 
-        ctx.caster.add_damage(total, ctx.spec.name)
+        ctx.caster.add_damage(total, ctx.spec.name_slot)
         ctx.caster.spiritbar.gain(total / 400)
 
 @component("extend_dots")
 def comp_extend_dots(ctx: Ctx, step: dict):
     extend_us = s_to_us(float(step.get("extend_s", 1.0)))
     excludes = set(step.get("exclude", []))
-    for dot in list(ctx.target.auras.values()):
+    for dot in list(ctx.target.auras_of(ctx.caster).values()):
         if not isinstance(dot, DotState):
             continue
         if dot.name in excludes:
@@ -617,7 +631,7 @@ def comp_extra_hit(ctx: Ctx, step: dict):
 
         if fanout and world:
             # hit ALL alive enemies (includes primary); adapt if you later add a range system
-            for u in (world.enemies_alive() or []):
+            for u in ALL_ENEMIES.select(world.alive, ctx.caster):
                 prev = ctx.target
                 try:
                     ctx.target = u
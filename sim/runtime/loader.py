@@ -1,31 +1,190 @@
 # sim/runtime/loader.py
 from __future__ import annotations
-from typing import Dict
-import os, yaml
-from ..core.engine import s_to_us, CAST_END, APL
+from typing import Callable, Dict, Iterable, List, Optional, Set
+import os
+from ..core.engine import s_to_us, CAST_END
 from .components import AbilitySpec, Ctx, run_pipeline
+from .pack import _load_yaml
+from .talents import apply_talent_patches
+
+# abilities dir -> (mtime, {ability id: yaml path}), see index_abilities
+_INDEX_CACHE: Dict[str, tuple] = {}
+
+def index_abilities(path: str) -> Dict[str, str]:
+    """ability id -> YAML path for a pack's abilities dir, read from the `id:` lines only (no YAML parse)."""
+    mtime = os.path.getmtime(path)
+    hit = _INDEX_CACHE.get(path)
+    if hit is not None and hit[0] == mtime:
+        return hit[1]
+    index: Dict[str, str] = {}
+    for fn in sorted(os.listdir(path)):
+        if not fn.endswith(".yaml"): continue
+        fpath = os.path.join(path, fn)
+        with open(fpath, "r") as f:
+            for line in f:
+                if line.startswith("id:"):
+                    index[line[3:].split("#", 1)[0].strip().strip("'\"")] = fpath
+                    break
+    _INDEX_CACHE[path] = (mtime, index)
+    return index
+
+def load_ability(fpath: str) -> AbilitySpec:
+    d = _load_yaml(fpath)
+    return AbilitySpec(
+        id=d["id"], name=d["name"],
+        cast=d.get("cast", {"gcd_s":1.0, "cast_time_s":0.0}),
+        cost=d.get("cost", {}),
+        cooldown_s=float(d.get("cooldown_s", 0.0)),
+        pipeline=d.get("pipeline", []),
+        tags=d.get("tags", []),
+        charges=d.get("charges"),
+        off_gcd=bool(d.get("off_gcd", False)),
+        on_cast_start=bool(d.get("on_cast_start", False)),
+        is_hasted=bool(d.get("is_hasted", True)),
+    )
 
 def load_abilities_from_dir(path: str) -> Dict[str, AbilitySpec]:
     out: Dict[str, AbilitySpec] = {}
     for fn in os.listdir(path):
         if not fn.endswith(".yaml"): continue
-        with open(os.path.join(path, fn), "r") as f:
-            d = yaml.safe_load(f)
-        spec = AbilitySpec(
-            id=d["id"], name=d["name"],
-            cast=d.get("cast", {"gcd_s":1.0, "cast_time_s":0.0}),
-            cost=d.get("cost", {}),
-            cooldown_s=float(d.get("cooldown_s", 0.0)),
-            pipeline=d.get("pipeline", []),
-            tags=d.get("tags", []),
-            charges=d.get("charges"),
-            off_gcd=bool(d.get("off_gcd", False)),
-            on_cast_start=bool(d.get("on_cast_start", False)),
-            is_hasted=bool(d.get("is_hasted", True)),
-        )
+        spec = load_ability(os.path.join(path, fn))
         out[spec.id] = spec
     return out
 
+class AbilityBook(dict):
+    """
+    id -> AbilitySpec for one actor, loaded on demand: preload() the abilities the
+    APL and talents can reach, anything else is parsed the first time it is looked
+    up (book[id] / book.get(id)). on_load(spec) runs once per loaded ability.
+    Iterating gives the loaded abilities only.
+
+    With a shared set (share(), see patched_specs) abilities are taken from it
+    instead of parsed, and the ones it lacks are frozen and added to it.
+    """
+    def __init__(self, index: Dict[str, str], on_load: Optional[Callable[[AbilitySpec], None]] = None):
+        super().__init__()
+        self.index = index
+        self.on_load = on_load
+        self.shared: Optional[Dict[str, AbilitySpec]] = None
+
+    def __missing__(self, ability_id):
+        shared = self.shared
+        spec = shared.get(ability_id) if shared is not None else None
+        if spec is None:
+            fpath = self.index.get(ability_id)
+            if fpath is None:
+                raise KeyError(ability_id)
+            spec = load_ability(fpath)
+            if shared is not None:
+                spec = shared.setdefault(ability_id, spec.freeze())
+        self[ability_id] = spec
+        if self.on_load is not None:
+            self.on_load(spec)
+        return spec
+
+    def share(self, shared: Dict[str, AbilitySpec]) -> "AbilityBook":
+        """Use the frozen specs in `shared` from now on, including for abilities already loaded."""
+        self.shared = shared
+        for aid, spec in list(self.items()):
+            self[aid] = shared.setdefault(aid, spec.freeze())
+        return self
+
+    def get(self, ability_id, default=None):
+        if ability_id in self or ability_id in self.index:
+            return self[ability_id]
+        return default
+
+    def preload(self, ability_ids: Iterable[str]) -> "AbilityBook":
+        for aid in sorted(ability_ids):
+            if aid in self.index:
+                self[aid]
+        return self
+
+def ability_refs(obj, ids) -> Set[str]:
+    """Ability ids mentioned anywhere in a parsed YAML document (string values and keys)."""
+    found: Set[str] = set()
+    stack = [obj]
+    while stack:
+        o = stack.pop()
+        if isinstance(o, str):
+            if o in ids:
+                found.add(o)
+        elif isinstance(o, dict):
+            stack.extend(o.keys())
+            stack.extend(o.values())
+        elif isinstance(o, (list, tuple)):
+            stack.extend(o)
+    return found
+
+def source_ability_refs(text: str, ids) -> Set[str]:
+    """Ability ids that appear as quoted string literals in Python source (APL modules)."""
+    return {aid for aid in ids if f'"{aid}"' in text or f"'{aid}'" in text}
+
+def reachable_abilities(index: Dict[str, str], roots: Iterable[str], talents: List[dict]) -> Set[str]:
+    """
+    Abilities reachable from the APL's ability ids (roots) and the enabled talents:
+    everything they mention, then everything those abilities' YAML mentions
+    (procs, follow-up casts), transitively. A wildcard talent patch reaches all.
+    """
+    ids = set(index)
+    for t in talents:
+        for p in (t.get("patches") or []):
+            if p.get("ability") == "*":
+                return ids
+    seen = set(roots) & ids
+    for t in talents:
+        seen |= ability_refs(t, ids)
+    todo = list(seen)
+    while todo:
+        for aid in ability_refs(_load_yaml(index[todo.pop()], shared=True), ids):
+            if aid not in seen:
+                seen.add(aid)
+                todo.append(aid)
+    return seen
+
+# (abilities dir, APL sources, talent ids) -> (index, reachable ids), see apl_reachable_abilities
+_REACHABLE_CACHE: Dict[tuple, tuple] = {}
+
+def apl_reachable_abilities(path: str, index: Dict[str, str], apl_paths: Iterable[str],
+                            talents: List[dict]) -> Set[str]:
+    """
+    reachable_abilities() from the ability ids quoted in the APL sources `apl_paths`,
+    for the abilities dir at `path`; worked out once per process for each (APL,
+    enabled talents) rather than by every actor.
+    """
+    apl_paths = tuple(apl_paths)
+    key = (path, apl_paths, tuple(t.get("id") for t in talents))
+    hit = _REACHABLE_CACHE.get(key)
+    if hit is not None and hit[0] is index:
+        return hit[1]
+    roots: Set[str] = set()
+    for src in apl_paths:
+        with open(src, "r") as f:
+            roots |= source_ability_refs(f.read(), index)
+    reachable = frozenset(reachable_abilities(index, roots, talents))
+    _REACHABLE_CACHE[key] = (index, reachable)
+    return reachable
+
+# (abilities dir, preloaded ids, talent ids) -> (index, {ability id: frozen AbilitySpec}), see patched_specs
+_PATCHED_CACHE: Dict[tuple, tuple] = {}
+
+def patched_specs(path: str, index: Dict[str, str], ability_ids: Iterable[str], talents: List[dict]) -> Dict[str, AbilitySpec]:
+    """
+    The abilities `ability_ids` of the pack at `path`, talent-patched and frozen;
+    built once per process for each (abilities, enabled talents) and then shared by
+    every actor that asks for the same set (AbilityBook.share).
+    """
+    ability_ids = tuple(sorted(ability_ids))
+    key = (path, ability_ids, tuple(t.get("id") for t in talents))
+    hit = _PATCHED_CACHE.get(key)
+    if hit is not None and hit[0] is index:
+        return hit[1]
+    book = AbilityBook(index).preload(ability_ids)
+    apply_talent_patches(book, talents)
+    specs = {aid: spec.freeze() for aid, spec in book.items()}
+    _PATCHED_CACHE[key] = (index, specs)
+    return specs
+
 def start_cast(ctx: Ctx) -> None:
     """Schedules cast end (or immediate), applies GCD/lockouts, then runs pipeline."""
     caster = ctx.caster
@@ -35,10 +194,10 @@ def start_cast(ctx: Ctx) -> None:
     if not ctx.spec.on_cast_start:
         for k in list(ctx.caster.buffs.keys()):
             b = ctx.caster.buffs[k]
-            if b.props.get("affected_haste_bonus") is not None:
-                affected_id = b.props["affected_cast"]
+            if b.affected_haste_bonus is not None:
+                affected_id = b.affected_cast
                 if affected_id == ctx.spec.id:
-                    amount = b.props["affected_haste_bonus"]
+                    amount = b.affected_haste_bonus
                     temp_haste_bonus += amount
                     ctx.caster.remove_buff(b)
 
@@ -46,11 +205,13 @@ def start_cast(ctx: Ctx) -> None:
     base_gcd_us  = s_to_us(float(ctx.spec.cast.get("gcd_s", 1.0)))/eff_gcd_haste if not ctx.spec.off_gcd else 0
 
 
-    ctx.bus.pub("cast_start", t_us=ctx.eng.t_us, ability_id=ctx.spec.id, caster=ctx.caster,ctx=ctx)
+    ctx.bus.pub("cast_start", src=ctx.caster, t_us=ctx.eng.t_us, ability_id=ctx.spec.id, caster=ctx.caster,ctx=ctx)
 
-    if "modified_cast_time_s" in ctx.spec.cast:
-        base_cast_us = s_to_us(float(ctx.spec.cast["modified_cast_time_s"]))
-        ctx.spec.cast.pop("modified_cast_time_s")
+    # per-cast overrides set by cast_start listeners (instant-cast procs, ...)
+    if ctx.gcd_s is not None and not ctx.spec.off_gcd:
+        base_gcd_us = s_to_us(float(ctx.gcd_s))/eff_gcd_haste
+    if ctx.cast_time_s is not None:
+        base_cast_us = s_to_us(float(ctx.cast_time_s))
     else:
         base_cast_us = s_to_us(float(ctx.spec.cast.get("cast_time_s", 0.0)))
 
@@ -66,7 +227,7 @@ def start_cast(ctx: Ctx) -> None:
 
     now = eng.t_us
 
-    spirit_cost = int(ctx.spec.cost.get("spirit_bar", 0))
+    spirit_cost = int((ctx.cost if ctx.cost is not None else ctx.spec.cost).get("spirit_bar", 0))
     if spirit_cost > 0 and not caster.spiritbar.spend(spirit_cost):
         return  # can't start
 
@@ -75,7 +236,8 @@ def start_cast(ctx: Ctx) -> None:
     caster.busy_until_us  = max(caster.busy_until_us,  now + cast_us)
 
     # Book-keep casts
-    caster.cast_counts[ctx.spec.name] = caster.cast_counts.get(ctx.spec.name, 0) + 1
+    i = ctx.spec.name_slot
+    caster.cast_counts.put(i, caster.cast_counts.at(i, 0) + 1)
 
 
 
@@ -86,13 +248,13 @@ def start_cast(ctx: Ctx) -> None:
         caster.ensure_charges(ctx.spec.id, max_ch, recharge_s)
         caster.consume_charge(ctx.spec.id)
     elif ctx.spec.cooldown_s and ctx.spec.cooldown_s > 0:
-        caster.cooldown_ready_us[ctx.spec.id] = now + s_to_us(ctx.spec.cooldown_s)
+        caster.cooldown_ready_us.put(ctx.spec.id_slot, now + s_to_us(ctx.spec.cooldown_s))
 
     # expose channel timing to components
     ctx.vars["cast_us"] = cast_us
     ctx.vars["cast_start_us"] = now
     ready_at = max(caster.gcd_ready_us, caster.busy_until_us)
-    eng.schedule_at(ready_at, ctx.wake_apl, phase=APL)
+    ctx.wake_apl.request(ready_at)
 
     if ctx.spec.on_cast_start:
         run_pipeline(ctx, ctx.spec.pipeline)
@@ -101,6 +263,6 @@ def start_cast(ctx: Ctx) -> None:
     def on_cast_end():
         if not ctx.spec.on_cast_start:
             run_pipeline(ctx, ctx.spec.pipeline)
-        ctx.bus.pub("cast_end", t_us=ctx.eng.t_us, ability_id=ctx.spec.id, caster=ctx.caster)
+        ctx.bus.pub("cast_end", src=ctx.caster, t_us=ctx.eng.t_us, ability_id=ctx.spec.id, caster=ctx.caster)
         ctx.wake_apl()  # <- this wake is what lets us weave off-GCD immediately after casts
     eng.schedule_at(now + cast_us, on_cast_end, phase=CAST_END)
@@ -2,8 +2,19 @@
 from __future__ import annotations
 from dataclasses import dataclass
 from typing import Callable, Dict, Any, Optional
-import os, importlib.util, yaml
+import os
+import copy
 import glob
+import threading
+
+from ..core.ids import intern_tree
+# yaml and importlib.util are imported on first use: `python -m sim --help` and
+# importing the runners shouldn't pay for them
+
+# Parsed content, shared by every sim in this process: path -> (mtime, document / module)
+_YAML_CACHE: Dict[str, Any] = {}
+_APL_CACHE: Dict[str, Any] = {}
+_APL_LOCK = threading.Lock()     # one exec per APL file even when sims start in several threads
 
 @dataclass
 class CharacterSpec:
@@ -14,9 +25,18 @@ class CharacterSpec:
     gcd_s: float                          # default GCD
     paths: Dict[str, str]                 # {"abilities": ..., "talents": ..., "apl": ...}
 
-def _load_yaml(path: str) -> Dict[str, Any]:
-    with open(path, "r") as f:
-        return yaml.safe_load(f)
+def _load_yaml(path: str, shared: bool = False) -> Dict[str, Any]:
+    """
+    Parse once per process; callers get a deep copy since specs/talents are patched in
+    place. shared=True returns the cached tree itself, for callers that only read it.
+    """
+    mtime = os.path.getmtime(path)
+    hit = _YAML_CACHE.get(path)
+    if hit is None or hit[0] != mtime:
+        import yaml
+        with open(path, "r") as f:
+            hit = _YAML_CACHE[path] = (mtime, intern_tree(yaml.safe_load(f)))
+    return hit[1] if shared else copy.deepcopy(hit[1])
 
 def load_character_spec(content_root: str, char_id: str) -> CharacterSpec:
     root = os.path.join(content_root, char_id)
@@ -35,12 +55,29 @@ def load_character_spec(content_root: str, char_id: str) -> CharacterSpec:
         },
     )
 
+def _apl_module_name(apl_path: str) -> str:
+    # one name per file (not a shared "char_apl"), so two packs' APLs never pass for each other
+    import hashlib
+    pack = os.path.basename(os.path.dirname(os.path.abspath(apl_path)))
+    digest = hashlib.blake2b(os.path.abspath(apl_path).encode(), digest_size=4).hexdigest()
+    return f"char_apl_{pack}_{digest}"
+
 def load_apl_factory(apl_path: str,talents) -> Callable[..., Any]:
-    spec = importlib.util.spec_from_file_location("char_apl", apl_path)
-    mod = importlib.util.module_from_spec(spec)
-    assert spec and spec.loader, f"Cannot load APL at {apl_path}"
-    spec.loader.exec_module(mod)  # type: ignore
-    assert hasattr(mod, "make_apl"), "apl.py must define make_apl(player, target, world, helpers) -> APL"
+    mtime = os.path.getmtime(apl_path)
+    hit = _APL_CACHE.get(apl_path)
+    if hit is not None and hit[0] == mtime:
+        return hit[1].make_apl
+    with _APL_LOCK:
+        hit = _APL_CACHE.get(apl_path)
+        if hit is not None and hit[0] == mtime:
+            return hit[1].make_apl
+        import importlib.util
+        spec = importlib.util.spec_from_file_location(_apl_module_name(apl_path), apl_path)
+        mod = importlib.util.module_from_spec(spec)
+        assert spec and spec.loader, f"Cannot load APL at {apl_path}"
+        spec.loader.exec_module(mod)  # type: ignore
+        assert hasattr(mod, "make_apl"), "apl.py must define make_apl(player, target, world, helpers) -> APL"
+        _APL_CACHE[apl_path] = (mtime, mod)
     return mod.make_apl
 
 def load_enabled_talents(talents_dir: str, enabled: Optional[dict]) -> list[dict]:
@@ -1,7 +1,6 @@
 # sim/runtime/talents.py
 from __future__ import annotations
 
-from pkgutil import extend_path
 from typing import Dict, List, Any, Callable
 from ..core.engine import s_to_us
 from typing import Dict, List, Any, Iterable, Tuple
@@ -229,26 +228,31 @@ def attach_talent_listeners(specs: Dict[str, Any], world: World, talents: List[d
             for spec in ext_list:
                 name = spec["dot"]
                 extra_s = float(spec.get("seconds", 0.0))
-                d = target.auras.get(name)
+                d = target.aura(name, player if owner_only else None)
                 if not d:
                     continue
-                if owner_only and d.owner is not player:
-                    continue
                 # extend expiry safely
                 d.expires_at_us += s_to_us(extra_s)
 
-                # schedule/refresh an expire check at the new time
-                def expire_check(dt=d, tgt=target):
+                # schedule/refresh an expire check at the new time (one pending check per dot)
+                chk = d.extend_check
+                if chk is not None and not chk.cancelled and eng.postpone(chk, d.expires_at_us):
+                    continue
+                chk_box = [None]
+                def expire_check(dt=d, tgt=target, box=chk_box):
+                    if dt.extend_check is box[0]:
+                        dt.extend_check = None
                     # remove only if still the same object and actually expired
-                    if tgt.auras.get(dt.name) is dt and eng.t_us >= dt.expires_at_us:
-                        tgt.auras.pop(dt.name, None)
+                    auras = tgt.auras_of(dt.owner)
+                    if auras.get(dt.name) is dt and eng.t_us >= dt.expires_at_us:
+                        auras.pop(dt.name, None)
                         try:
                             player.active_dots.remove(dt)
                         except ValueError:
                             pass
-                eng.schedule_at(d.expires_at_us, expire_check)
+                d.extend_check = chk_box[0] = eng.schedule_at(d.expires_at_us, expire_check)
 
-        bus.sub("dot_tick", handler)
+        bus.sub("dot_tick", handler, src=player, label=t.get("id"))
         detachers.append(lambda: None)  # fill if you add unsubscribe later
 
     for t in talents:
@@ -275,7 +279,7 @@ def attach_talent_listeners(specs: Dict[str, Any], world: World, talents: List[d
                 reduce_cooldown_us(player, player.eng, cd, delta_us)
 
 
-        bus.sub("dot_tick", handler)
+        bus.sub("dot_tick", handler, src=player, label=t.get("id"))
         detachers.append(lambda: None)  # fill if you add unsubscribe later
 
 
@@ -339,11 +343,11 @@ def attach_talent_listeners(specs: Dict[str, Any], world: World, talents: List[d
             #new_dot.src_ability_id = ctx.vars.get("last_hit_ability", ctx.spec.id)
 
             # register & schedule
-            dot.target.auras[dst_name] = new_dot
+            dot.target.auras_of(player)[dst_name] = new_dot
             player.active_dots.append(new_dot)
             new_dot.schedule_first_tick()
 
-        bus.sub("dot_tick", handler)
+        bus.sub("dot_tick", handler, src=player, label=t.get("id"))
         detachers.append(lambda: None)
 
 
@@ -380,7 +384,7 @@ def attach_talent_listeners(specs: Dict[str, Any], world: World, talents: List[d
 
                     player.add_buff(buff)
 
-        bus.sub("cast_end", on_cast_end)
+        bus.sub("cast_end", on_cast_end, src=player, label=t.get("id"))
         detachers.append(lambda: None)
 
     for t in talents:
@@ -394,13 +398,11 @@ def attach_talent_listeners(specs: Dict[str, Any], world: World, talents: List[d
         owner_only = bool(t.get("owner_only", True))
 
         def _bump(target, now_us, owner):
-            # store stacks on the TARGET as a light “aura” dict
-            a = target.auras.get(aura_name)
+            # store stacks on the TARGET as a light “aura” dict (one per owner, like DoTs)
+            auras = target.auras_of(owner)
+            a = auras.get(aura_name)
             if not a:
-                a = target.auras[aura_name] = {"stacks": 0, "per": per_stack, "max": max_stacks, "owner": owner}
-            if owner_only and a.get("owner") is not owner:
-                # if some other player's aura exists, either ignore or replace; we’ll ignore
-                return
+                a = auras[aura_name] = {"stacks": 0, "per": per_stack, "max": max_stacks, "owner": owner}
             a["stacks"] = min(a["max"], a["stacks"] + 1)
 
         # react to DoT ticks
@@ -411,11 +413,11 @@ def attach_talent_listeners(specs: Dict[str, Any], world: World, talents: List[d
             wants_name = source.get("dot_name")
             wants_ability = source.get("ability")
             if wants_name and dot.name != wants_name: return
-            if wants_ability and getattr(dot, "src_ability_id", None) != wants_ability: return
+            if wants_ability and dot.src_ability_id != wants_ability: return
             _bump(dot.target, t_us, dot.owner)
 
 
-        bus.sub("dot_tick", on_tick)
+        bus.sub("dot_tick", on_tick, src=player, label=t.get("id"))
 
     for t in talents:
         if t.get("type") != "on_dot_pre_tick_force_crit":
@@ -435,9 +437,9 @@ def attach_talent_listeners(specs: Dict[str, Any], world: World, talents: List[d
             p = base_chance + scale_factor * float(getattr(player, "base_crit", 0.0))
             p = max(0.0, min(1.0, p))
             if player.rng.roll(f"precrit:{t.get('id', '?')}", p):
-                setattr(dot, "_force_crit_tick", True)
+                dot.force_crit_tick = True
 
-        bus.sub("dot_pre_tick", on_pre_tick)
+        bus.sub("dot_pre_tick", on_pre_tick, src=player, label=t.get("id"))
         detachers.append(lambda: None)
 
 
@@ -453,34 +455,34 @@ def attach_talent_listeners(specs: Dict[str, Any], world: World, talents: List[d
         def on_cast_start(ability_id=None, t_us=None, caster=None, ctx=None,**_):
             if caster is not player or (ability_id != ability_source and ability_id not in modify_list):
                 return
-            if not player.buffs.get(buff_name) or not "stacks" in player.buffs[buff_name].props or player.buffs[buff_name].props["stacks"] < required_stacks:
+            if not player.buffs.get(buff_name) or player.buffs[buff_name].stacks is None or player.buffs[buff_name].stacks < required_stacks:
                 return
             # proc! apply effects
             for eff in effects:
                 et = eff.get("type")
                 if et == "make_cast_instant":
                     if required_stacks > 0 and not eff.get("waterfall",False):
-                        player.buffs[buff_name].props["stacks"] = player.buffs[buff_name].props["stacks"] - required_stacks
-                    if player.buffs[buff_name].props["stacks"] == 0:
+                        player.buffs[buff_name].stacks = player.buffs[buff_name].stacks - required_stacks
+                    if player.buffs[buff_name].stacks == 0:
                         player.remove_buff(player.buffs.get(buff_name))
-                    ctx.spec.cast["modified_cast_time_s"]=0
+                    ctx.cast_time_s = 0
                 if et == "reduce_cast_time":
                     if required_stacks > 0 and not eff.get("waterfall",False):
-                        player.buffs[buff_name].props["stacks"] = player.buffs[buff_name].props["stacks"] - required_stacks
-                    if  player.buffs[buff_name].props["stacks"] == 0:
+                        player.buffs[buff_name].stacks = player.buffs[buff_name].stacks - required_stacks
+                    if  player.buffs[buff_name].stacks == 0:
                         player.remove_buff(player.buffs.get(buff_name))
-                    ctx.spec.cast["modified_cast_time_s"] = min(0,ctx.spec.cast["cast_time_s"]-eff.get("amount",0))
+                    ctx.cast_time_s = min(0,ctx.spec.cast["cast_time_s"]-eff.get("amount",0))
                 if et == "grant_crit_chance":
                     if required_stacks > 0 and not eff.get("waterfall",False):
-                        player.buffs[buff_name].props["stacks"] = player.buffs[buff_name].props["stacks"] - required_stacks
-                    if  player.buffs[buff_name].props["stacks"] == 0:
+                        player.buffs[buff_name].stacks = player.buffs[buff_name].stacks - required_stacks
+                    if  player.buffs[buff_name].stacks == 0:
                         player.remove_buff(player.buffs.get(buff_name))
                     bonus = eff.get("amount",0)
                     caster.grant_next_crit_bonus(ability_id,1,bonus)
 
                 # extend here with other effect types as needed
 
-        bus.sub("cast_start", on_cast_start)
+        bus.sub("cast_start", on_cast_start, src=player, label=t.get("id"))
         detachers.append(lambda: None)
 
     for t in talents:
@@ -505,7 +507,7 @@ def attach_talent_listeners(specs: Dict[str, Any], world: World, talents: List[d
 
                 # extend here with other effect types as needed
 
-        bus.sub("cast_start", on_cast_start)
+        bus.sub("cast_start", on_cast_start, src=player, label=t.get("id"))
         detachers.append(lambda: None)
 
     for t in talents:
@@ -534,7 +536,7 @@ def attach_talent_listeners(specs: Dict[str, Any], world: World, talents: List[d
 
                 # extend here with other effect types as needed
 
-        bus.sub("buff_expire", on_debuff_expire)
+        bus.sub("buff_expire", on_debuff_expire, src=player, label=t.get("id"))
         detachers.append(lambda: None)
 
     for t in talents:
@@ -555,7 +557,7 @@ def attach_talent_listeners(specs: Dict[str, Any], world: World, talents: List[d
 
                 # extend here with other effect types as needed
 
-        bus.sub("spend_ember", on_spend_ember)
+        bus.sub("spend_ember", on_spend_ember, src=player, label=t.get("id"))
         detachers.append(lambda: None)
 
     for t in talents:
@@ -593,7 +595,7 @@ def attach_talent_listeners(specs: Dict[str, Any], world: World, talents: List[d
                         generate_ctx = Ctx( eng=eng, bus=bus, cfg=cfg, caster=player, target=target, spec=spec, wake_apl=None)
                         run_pipeline(generate_ctx, pipe)
 
-            bus.sub("generate_ember", on_generate_ember)
+            bus.sub("generate_ember", on_generate_ember, src=player, label=t.get("id"))
             detachers.append(lambda: None)
 
         if t.get("type") == "on_hit_mod":
@@ -609,7 +611,7 @@ def attach_talent_listeners(specs: Dict[str, Any], world: World, talents: List[d
                         extension = s_to_us(eff.get("amount_s"))
                         buff = eff.get("buff")
                         player.extend_buff(buff, extension)
-            bus.sub("damage_done", on_hit)
+            bus.sub("damage_done", on_hit, src=player, label=t.get("id"))
             detachers.append(lambda: None)
 
     return detachers
@@ -0,0 +1,140 @@
+# sim/runtime/targeting.py
+"""
+Compiled target selection for fanout-style components.
+
+A TargetSelector is built once per fanout step (cached on the step dict under
+SELECTOR_KEY) and then picks targets from world.alive in O(n): identity-set
+membership instead of `u in chosen`. It keeps no state between calls, so one
+selector serves every sim sharing the (frozen) step, in any thread.
+
+Selection order (same as the original comp_fanout):
+  1. the primary (first alive enemy), if include_primary
+  2. prefer_missing_aura: enemies missing the aura (or missing *yours* if
+     owner_only_for_aura), then the ones that have it
+  3. require_aura: only enemies carrying the aura; otherwise every alive enemy
+  4. exclude_primary drops the primary
+  5. first `count` targets; distinct: false repeats the list to fill `count`
+"""
+from __future__ import annotations
+from typing import List, Optional
+
+SELECTOR_KEY = "__selector__"
+
+class TargetSelector:
+    __slots__ = ("count", "include_primary", "exclude_primary", "prefer_aura", "require_aura",
+                 "owner_only_for_aura", "distinct")
+
+    def __init__(self, count: int = 1, include_primary: bool = True, exclude_primary: bool = False,
+                 prefer_aura: Optional[str] = None, require_aura: Optional[str] = None,
+                 owner_only_for_aura: bool = True, distinct: bool = True):
+        self.count = int(count)
+        self.include_primary = bool(include_primary)
+        self.exclude_primary = bool(exclude_primary)
+        self.prefer_aura = prefer_aura
+        self.require_aura = require_aura
+        self.owner_only_for_aura = bool(owner_only_for_aura)
+        self.distinct = bool(distinct)
+
+    @classmethod
+    def from_step(cls, step: dict) -> "TargetSelector":
+        return cls(
+            count=int(step.get("count", 1)),
+            include_primary=bool(step.get("include_primary", True)),
+            exclude_primary=bool(step.get("exclude_primary", False)),
+            prefer_aura=step.get("prefer_missing_aura"),
+            require_aura=step.get("require_aura"),
+            owner_only_for_aura=bool(step.get("owner_only_for_aura", True)),
+            distinct=bool(step.get("distinct", True)),
+        )
+
+    def select(self, pool: List, caster) -> List:
+        """Targets from `pool` (alive enemies, spawn order; pool[0] is the primary)."""
+        if not pool:
+            return []
+        primary = pool[0]
+        if self.distinct:
+            return self._select_distinct(pool, primary, caster)
+        return self._select_repeating(pool, primary, caster)
+
+    # ---- helpers ----
+    def _split_prefer(self, pool, caster):
+        missing, have = [], []
+        aura, owner_only = self.prefer_aura, self.owner_only_for_aura
+        for u in pool:
+            # owner_only: somebody else's copy still counts as missing *yours*
+            if u.aura(aura, caster if owner_only else None) is None:
+                missing.append(u)
+            else:
+                have.append(u)
+        return missing, have
+
+    def _has_required(self, u) -> bool:
+        dot = u.aura(self.require_aura)
+        return bool(dot and (dot.owner or not self.owner_only_for_aura))
+
+    def _select_distinct(self, pool, primary, caster) -> List:
+        want = self.count
+        out: List = []
+        seen = set()
+        skip = primary if self.exclude_primary else None
+
+        def take(u) -> bool:
+            # returns True once we have enough
+            key = id(u)
+            if key in seen:
+                return False
+            seen.add(key)
+            if u is not skip:
+                out.append(u)
+            return len(out) >= want
+
+        if want <= 0:
+            return out
+        if self.include_primary and take(primary):
+            return out
+        if self.prefer_aura:
+            missing, have = self._split_prefer(pool, caster)
+            for u in missing:
+                if take(u): return out
+            for u in have:
+                if take(u): return out
+        elif self.require_aura:
+            for u in pool:
+                if self._has_required(u) and take(u): return out
+        else:
+            for u in pool:
+                if take(u): return out
+        return out
+
+    def _select_repeating(self, pool, primary, caster) -> List:
+        # duplicates allowed: keep the original list shape, then cycle it to `count`
+        chosen: List = [primary] if self.include_primary else []
+        if self.prefer_aura:
+            missing, have = self._split_prefer(pool, caster)
+            chosen.extend(missing)
+            chosen.extend(have)
+        if self.require_aura:
+            chosen.extend(u for u in pool if self._has_required(u))
+        else:
+            chosen.extend(pool)
+        if self.exclude_primary:
+            # historical behaviour: list.remove() while iterating drops the *first* primary
+            # and skips the entry after it
+            i = 0
+            while i < len(chosen):
+                if chosen[i] is primary:
+                    chosen.remove(primary)
+                i += 1
+        if not chosen or self.count <= 0:
+            return []
+        reps = -(-self.count // len(chosen))
+        return (chosen * reps)[:self.count]
+
+# every alive enemy, primary first (swallow / extra_hit "hit all enemies" procs)
+ALL_ENEMIES = TargetSelector(count=1 << 30, include_primary=True)
+
+def selector_for(step: dict) -> TargetSelector:
+    sel = step.get(SELECTOR_KEY)
+    if sel is None:
+        sel = step[SELECTOR_KEY] = TargetSelector.from_step(step)
+    return sel
@@ -0,0 +1,205 @@
+# sim/tools/aio.py
+"""
+asyncio front end for services that run sims on behalf of many users.
+
+    async with SimService(workers=8) as svc:
+        result = await svc.run_sim(cfg)                  # one fight, run_sim's result dict
+        async for row in svc.run_batch_stream(req):      # harness rows, in table order
+            ...
+
+    result = await run_sim_async(cfg)                    # on a shared default service
+    async for row in run_batch_stream(req): ...
+
+Sims run in a process pool, so the event loop never blocks. A service is safe to
+share between any number of concurrent requests:
+
+- bounded concurrency: at most max_inflight jobs (one fight, or one chunk of a
+  batch) are handed to the pool at a time, fairly in request order; the rest wait
+  on a semaphore, not in the pool's unbounded queue.
+- backpressure: run_batch_stream only keeps `window` cells (talents x schedule) in
+  flight ahead of the consumer, so a slow reader stops new work being queued.
+- cancellation: cancelling the awaiting task, or closing the stream (aclose(), or
+  leaving the `async for` early), drops queued jobs and stops running ones. Each job
+  gets a flag byte in a shared memory block; the worker's fight polls it once per
+  simulated second (SimConfig.should_stop) and ends with SimCancelled. A job's
+  slot is only given back once its worker has actually let go of it.
+
+Results are the same as run_sim / run_batch with the same seeds.
+"""
+from __future__ import annotations
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import replace
+from multiprocessing import shared_memory
+from typing import AsyncIterator, Dict, List, Optional
+import asyncio
+import atexit
+import contextlib
+import os
+import sys
+
+from sim.runners.target_dummy import run_sim, SimConfig
+from sim.tools.harness import (BatchRequest, _cells, _chunked, _chunks_row, _make_cfg, _replicate_seeds,
+                               _summarize)
+
+# ---------- worker side ----------
+_flags: Dict[str, tuple] = {}      # per worker process: flag block name -> (SharedMemory, its buffer)
+
+def _stop_flag(name: str, slot: int):
+    got = _flags.get(name)
+    if got is None:
+        # pool workers share the parent's resource tracker, so attaching doesn't make them owners
+        shm = shared_memory.SharedMemory(name=name)
+        got = _flags[name] = (shm, shm.buf)
+    buf = got[1]
+    return lambda: buf[slot] != 0
+
+def _run_one(content_dir: str, cfg: SimConfig, flags: str, slot: int) -> dict:
+    with contextlib.redirect_stdout(sys.stderr):
+        return run_sim(content_dir, replace(cfg, should_stop=_stop_flag(flags, slot)))
+
+def _run_chunk(content_dir: str, cfgs: List[SimConfig], bin_width: Optional[float], flags: str, slot: int):
+    stop = _stop_flag(flags, slot)
+    with contextlib.redirect_stdout(sys.stderr):
+        return _summarize(content_dir, [replace(c, should_stop=stop) for c in cfgs], bin_width)
+
+# ---------- service ----------
+class SimService:
+    def __init__(self, workers: int = 0, max_inflight: Optional[int] = None, content_dir: str = "Content"):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_inflight = max_inflight or 2 * self.workers     # keeps every worker fed between handoffs
+        self.content_dir = content_dir
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._flags: Optional[shared_memory.SharedMemory] = None
+        self._free: List[int] = []
+        self._slots: Optional[asyncio.Semaphore] = None
+        self.stats = {"submitted": 0, "completed": 0, "cancelled": 0}
+
+    def _start(self) -> None:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+            self._flags = shared_memory.SharedMemory(create=True, size=self.max_inflight)
+            self._flags.buf[:self.max_inflight] = bytes(self.max_inflight)
+            self._free = list(range(self.max_inflight - 1, -1, -1))
+            self._slots = asyncio.Semaphore(self.max_inflight)
+
+    async def _submit(self, fn, *args):
+        """Run fn(*args, flags, slot) in the pool once a slot is free; cancellable at any point."""
+        self._start()
+        await self._slots.acquire()
+        slot = self._free.pop()
+        loop = asyncio.get_running_loop()
+        try:
+            fut = self._pool.submit(fn, *args, self._flags.name, slot)
+        except BaseException:
+            self._free.append(slot)
+            self._slots.release()
+            raise
+        self.stats["submitted"] += 1
+
+        flags = self._flags
+
+        def give_back():
+            # the worker is done with the slot (finished, stopped, or never started)
+            if self._flags is not flags:    # service closed meanwhile
+                return
+            flags.buf[slot] = 0
+            self._free.append(slot)
+            self._slots.release()
+
+        def _release(_f):
+            with contextlib.suppress(RuntimeError):      # loop already closed: nobody is waiting
+                loop.call_soon_threadsafe(give_back)
+        fut.add_done_callback(_release)
+        try:
+            result = await asyncio.wrap_future(fut)
+        except asyncio.CancelledError:
+            if not fut.cancel():
+                self._flags.buf[slot] = 1     # already running: the fight stops at its next poll
+            self.stats["cancelled"] += 1
+            raise
+        self.stats["completed"] += 1
+        return result
+
+    async def run_sim(self, cfg: SimConfig, content_dir: Optional[str] = None) -> dict:
+        """run_sim(content_dir, cfg) in the pool."""
+        return await self._submit(_run_one, content_dir or self.content_dir, cfg)
+
+    async def _run_cell(self, req: BatchRequest, tal, enc, chunk_size: int):
+        cfgs = [_make_cfg(req, tal, enc, seed) for seed in _replicate_seeds(req, tal, enc)]
+        chunks = [asyncio.ensure_future(self._submit(_run_chunk, req.content_dir, chunk, req.hist_bin_width))
+                  for chunk in _chunked(cfgs, chunk_size)]
+        try:
+            return _chunks_row(req, tal, enc, await asyncio.gather(*chunks))
+        except BaseException:
+            for c in chunks:
+                c.cancel()
+            await asyncio.gather(*chunks, return_exceptions=True)
+            raise
+
+    async def run_batch_stream(self, req: BatchRequest, chunk_size: int = 8, window: int = 2) -> AsyncIterator[dict]:
+        """
+        Yield run_batch's rows one by one in table order as their replicates finish,
+        with at most `window` cells queued or running ahead of the consumer.
+        """
+        cells = iter(_cells(req))
+        ahead: deque = deque()
+
+        def fill():
+            while len(ahead) < max(1, window):
+                cell = next(cells, None)
+                if cell is None:
+                    return
+                ahead.append((cell, asyncio.ensure_future(self._run_cell(req, *cell, chunk_size))))
+        try:
+            fill()
+            while ahead:
+                (tal, enc), task = ahead[0]
+                row = await task
+                ahead.popleft()
+                fill()
+                yield row
+        finally:
+            for _, task in ahead:
+                task.cancel()
+            await asyncio.gather(*(t for _, t in ahead), return_exceptions=True)
+
+    async def aclose(self) -> None:
+        if self._pool is not None:
+            pool, self._pool = self._pool, None
+            await asyncio.get_running_loop().run_in_executor(None, pool.shutdown)
+            self._release_flags()
+
+    def close(self) -> None:
+        if self._pool is not None:
+            pool, self._pool = self._pool, None
+            pool.shutdown()
+            self._release_flags()
+
+    def _release_flags(self) -> None:
+        self._flags.close()
+        with contextlib.suppress(FileNotFoundError):
+            self._flags.unlink()
+        self._flags = None
+
+    async def __aenter__(self): return self
+    async def __aexit__(self, *exc): await self.aclose()
+
+# ---------- module-level API on one shared service ----------
+_default: Optional[SimService] = None
+
+def default_service() -> SimService:
+    """The process-wide SimService behind run_sim_async / run_batch_stream (cpu_count workers)."""
+    global _default
+    if _default is None:
+        _default = SimService()
+        atexit.register(_default.close)
+    return _default
+
+async def run_sim_async(cfg: SimConfig, content_dir: str = "Content", service: Optional[SimService] = None) -> dict:
+    return await (service or default_service()).run_sim(cfg, content_dir)
+
+async def run_batch_stream(req: BatchRequest, service: Optional[SimService] = None, chunk_size: int = 8,
+                           window: int = 2) -> AsyncIterator[dict]:
+    async for row in (service or default_service()).run_batch_stream(req, chunk_size, window):
+        yield row
@@ -0,0 +1,194 @@
+# sim/tools/batch.py
+"""
+JSONL batch runner: one job spec per input line, one result line per job.
+
+    python -m sim.tools.batch jobs.jsonl -o results.jsonl --workers 8
+    cat jobs.jsonl | python -m sim.tools.batch - > results.jsonl
+
+Job spec (everything but talent_sets/schedules is optional):
+    {"id": "rime-st", "content_dir": "Content", "character": "Rime",
+     "attrs": {"power": 1.0, "haste": 1.1, "base_crit": 0.1, "base_spirit_gain": 1.1},
+     "talent_sets": [{"2A": true, "3B": true}], "schedules": [[[0, 1]], [[0, 3]]],
+     "run_count": 25, "duration_s": 300, "base_seed": 1337, "seeds": null,
+     "movement": 0.15, "long_fight": false, "wall_limit_s": null, "dist": false, "mode": "batch"}
+
+mode: "batch" (default) reports average_dps per (talents, schedule) row,
+      "replicates" also lists every replicate's dps in seed order.
+dist: rows also carry the mergeable DPS distribution (see harness.merge_rows).
+
+All jobs share one process pool, and each worker keeps its parsed content
+(sim/runtime/pack.py caches), so YAML is read once per worker, not once per sim.
+Jobs start as their lines are read and result lines are written as soon as a
+job's last replicate lands, so they can come out of input order; match them up by
+"id" (defaults to "line-<n>"). At most --max-inflight jobs run at once; reading
+waits for a free slot, so a long-running stdin feed streams through.
+"""
+from __future__ import annotations
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, IO, Iterator, List, Tuple
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+
+from sim.tools.harness import Attrs, BatchRequest, submit_batch
+
+MODES = ("batch", "replicates")
+
+def parse_job(spec: Dict[str, Any], default_content_dir: str = "Content") -> Tuple[BatchRequest, str]:
+    """Job spec dict -> (BatchRequest, mode). Raises ValueError on malformed specs."""
+    attrs = dict(spec.get("attrs") or {})
+    character = spec.get("character") or attrs.pop("name", None)
+    attrs.pop("name", None)
+    if not character:
+        raise ValueError("job needs 'character' (or attrs.name)")
+    if not spec.get("talent_sets") or not spec.get("schedules"):
+        raise ValueError("job needs non-empty 'talent_sets' and 'schedules'")
+    mode = spec.get("mode", "batch")
+    if mode not in MODES:
+        raise ValueError(f"unknown mode {mode!r} (expected one of {MODES})")
+    req = BatchRequest(
+        content_dir=spec.get("content_dir", default_content_dir),
+        attrs=Attrs(
+            name=character,
+            power=float(attrs.get("power", 100.0)),
+            haste=float(attrs.get("haste", 1.0)),
+            base_crit=float(attrs.get("base_crit", 0.05)),
+            base_spirit_gain=float(attrs.get("base_spirit_gain", 1.0)),
+        ),
+        talent_sets=[dict(t) for t in spec["talent_sets"]],
+        schedules=[[(t, int(n)) for t, n in enc] for enc in spec["schedules"]],
+        run_count=int(spec.get("run_count", 100)),
+        duration_s=float(spec.get("duration_s", 300.0)),
+        base_seed=int(spec.get("base_seed", 1337)),
+        movement=float(spec.get("movement", 0)),
+        seeds=[int(s) for s in spec["seeds"]] if spec.get("seeds") else None,
+        long_fight=bool(spec.get("long_fight", False)),
+        wall_limit_s=float(spec["wall_limit_s"]) if spec.get("wall_limit_s") else None,
+        dist=bool(spec.get("dist", False)),
+    )
+    return req, mode
+
+def _read_jobs(stream: IO[str]) -> Iterator[Tuple[int, str]]:
+    for n, line in enumerate(stream, start=1):
+        line = line.strip()
+        if line and not line.startswith("#"):
+            yield n, line
+
+def _emit(out: IO[str], record: dict) -> None:
+    out.write(json.dumps(record) + "\n")
+    out.flush()
+
+def _finish(job: dict) -> dict:
+    handle = job["handle"]
+    record = {"id": job["id"], "line": job["line"]}
+    try:
+        rows = handle.rows()
+        if job["mode"] == "replicates":
+            for row, dps in zip(rows, handle.replicate_dps()):
+                row["replicate_dps"] = dps
+        record.update(ok=True, rows=rows)
+    except Exception as e:  # a bad talent/ability in one job must not take down the queue
+        record.update(ok=False, error=f"{type(e).__name__}: {e}")
+    record["elapsed_s"] = round(time.perf_counter() - job["t0"], 3)
+    return record
+
+def run_jobs(stream: IO[str], out: IO[str], executor, *, default_content_dir: str = "Content", chunk_size: int = 8,
+             max_inflight: int = 16) -> int:
+    """
+    Submit the jobs on `stream` to `executor` as they are read, write each result to `out`
+    as soon as its job finishes. Returns #failed jobs.
+
+    At most `max_inflight` jobs are queued or running at once: the next line is only read
+    once a slot is free, so an endless stdin feed is worked through as it arrives.
+    Results are written from the executor's completion callbacks, so this thread can sit
+    in a blocking read meanwhile (and stdin is never read off the main thread, which
+    forked workers would deadlock on).
+    """
+    window = max(1, int(max_inflight))
+    slots = threading.Semaphore(window)
+    lock = threading.Lock()             # guards `out`, `failed`, `errors` and each job's "left"
+    failed = 0
+    errors: List[BaseException] = []
+
+    def emit(record: dict) -> None:
+        nonlocal failed
+        with lock:
+            failed += not record["ok"]
+            _emit(out, record)
+
+    def finish(job: dict) -> None:
+        try:
+            emit(_finish(job))
+        except BaseException as e:      # e.g. a closed pipe; re-raised once the queue drains
+            errors.append(e)
+        finally:
+            slots.release()
+
+    def chunk_done(job: dict) -> None:
+        with lock:
+            job["left"] -= 1
+            last = job["left"] == 0
+        if last:
+            finish(job)
+
+    jobs = _read_jobs(stream)
+    while True:
+        slots.acquire()
+        item = next(jobs, None)
+        if item is None:
+            break
+        n, line = item
+        job_id = f"line-{n}"
+        try:
+            spec = json.loads(line)
+            job_id = str(spec.get("id", job_id))
+            req, mode = parse_job(spec, default_content_dir)
+        except (ValueError, TypeError, KeyError) as e:
+            emit({"id": job_id, "line": n, "ok": False, "error": f"{type(e).__name__}: {e}"})
+            slots.release()
+            continue
+        handle = submit_batch(req, executor, chunk_size)
+        futures = handle.all_futures()
+        job = {"id": job_id, "line": n, "mode": mode, "handle": handle, "left": len(futures),
+               "t0": time.perf_counter()}
+        if not futures:
+            finish(job)
+        for f in futures:
+            f.add_done_callback(lambda _f, job=job: chunk_done(job))
+
+    for _ in range(window - 1):         # drain: every slot back = every job written
+        slots.acquire()
+    if errors:
+        raise errors[0]
+    return failed
+
+def main(argv: List[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m sim.tools.batch", description="Run JSONL batch jobs.")
+    ap.add_argument("jobs", nargs="?", default="-", help="JSONL job file, or - for stdin (default)")
+    ap.add_argument("-o", "--out", default="-", help="JSONL result file, or - for stdout (default)")
+    ap.add_argument("-w", "--workers", type=int, default=os.cpu_count() or 1,
+                    help="worker processes (0 = run in this process)")
+    ap.add_argument("--chunk-size", type=int, default=8, help="replicates per worker task")
+    ap.add_argument("--content-dir", default="Content", help="default content_dir for jobs that omit it")
+    ap.add_argument("--max-inflight", type=int, default=0,
+                    help="jobs queued or running at once (default: 2 per worker)")
+    args = ap.parse_args(argv)
+
+    src = sys.stdin if args.jobs == "-" else open(args.jobs, "r")
+    out = sys.stdout if args.out == "-" else open(args.out, "a")
+    # workers=0 still goes through an executor so jobs stream the same way; one thread = serial
+    executor = ProcessPoolExecutor(max_workers=args.workers) if args.workers > 0 else ThreadPoolExecutor(max_workers=1)
+    try:
+        with executor:
+            failed = run_jobs(src, out, executor, default_content_dir=args.content_dir, chunk_size=args.chunk_size,
+                              max_inflight=args.max_inflight or 2 * max(1, args.workers))
+    finally:
+        if src is not sys.stdin: src.close()
+        if out is not sys.stdout: out.close()
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
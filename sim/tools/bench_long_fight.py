@@ -0,0 +1,106 @@
+# sim/tools/bench_long_fight.py
+"""
+Long-fight memory check: a dungeon-style fight of repeated 1 -> 8 -> 3 pulls for an
+hour of simulated time, sampling process RSS and the sim's live state as it runs.
+
+    python -m sim.tools.bench_long_fight
+    python -m sim.tools.bench_long_fight --seconds 3600 --rss-budget-mb 4 --no-long-fight
+
+RSS growth is measured from the end of --warmup-s (content loaded, pools and the
+event queue at working size) to the end of the fight. The exit status is 1 when it
+exceeds --rss-budget-mb or when the world kept creating dummies after warm-up, so
+the constant-memory mode (World long_fight) can gate a bench run. --no-long-fight
+shows the default mode for comparison.
+"""
+from __future__ import annotations
+import argparse
+import gc
+import os
+import resource
+import sys
+
+from sim.core.engine import Engine, Bus, s_to_us
+from sim.core.rng import RNG
+from sim.core.world import World, schedule_encounter
+from sim.runners.actor import Actor, ActorConfig
+
+def pulls(seconds: float, period_s: float = 60.0) -> list:
+    """(t_s, count) plan: 1 -> 8 -> 3 enemies every period_s, for the whole fight."""
+    plan = []
+    t = 0.0
+    while t < seconds:
+        plan += [(t, 1), (t + period_s / 4, 8), (t + period_s * 7 / 12, 3)]
+        t += period_s
+    return plan
+
+def rss_bytes() -> int:
+    """Current resident set size (maxrss where /proc is missing, an upper bound)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return kb if sys.platform == "darwin" else kb * 1024
+
+def sample(eng, world, actor) -> dict:
+    gc.collect()
+    return {
+        "t_s": eng.t_us / 1e6,
+        "rss": rss_bytes(),
+        "queue": eng.pending(),
+        "enemies": len(world.enemies),
+        "pooled": len(world.pool),
+        "spawned": world._seq,
+        "active_dots": len(actor.player.active_dots),
+    }
+
+def run(seconds: float = 3600.0, warmup_s: float = 300.0, step_s: float = 300.0, long_fight: bool = True,
+        character: str = "Ardeos", content: str = "Content", seed: int = 1337) -> list:
+    eng, bus = Engine(), Bus()
+    rng = RNG(seed)
+    world = World(eng, bus, rng, long_fight=long_fight)
+    schedule_encounter(world, pulls(seconds))
+    actor = Actor(eng, bus, world, rng, content, ActorConfig(
+        character=character, talents={}, power=1.0, haste=1.1, base_crit=0.4, base_spirit_gain=1.1,
+    ))
+    actor.start(0)
+    eng.run_until(s_to_us(warmup_s))
+    samples = [sample(eng, world, actor)]
+    t = warmup_s
+    while t < seconds:
+        t = min(seconds, t + step_s)
+        eng.run_until(s_to_us(t))
+        samples.append(sample(eng, world, actor))
+    return samples
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m sim.tools.bench_long_fight", description=__doc__.splitlines()[1])
+    ap.add_argument("--seconds", type=float, default=3600.0, help="simulated fight length")
+    ap.add_argument("--warmup-s", type=float, default=300.0, help="simulated seconds before the baseline sample")
+    ap.add_argument("--step-s", type=float, default=300.0, help="simulated seconds between samples")
+    ap.add_argument("--character", default="Ardeos")
+    ap.add_argument("--content", default="Content")
+    ap.add_argument("--no-long-fight", dest="long_fight", action="store_false", help="run the default World instead")
+    ap.add_argument("--rss-budget-mb", type=float, default=1.0, help="allowed RSS growth after warm-up")
+    args = ap.parse_args(argv)
+    samples = run(args.seconds, args.warmup_s, args.step_s, args.long_fight, args.character, args.content)
+
+    print(f"{'t_s':>7} {'rss_mb':>8} {'queue':>6} {'enemies':>8} {'pooled':>7} {'spawned':>8} {'dots':>5}")
+    for s in samples:
+        print(f"{s['t_s']:7.0f} {s['rss'] / 2**20:8.2f} {s['queue']:6d} {s['enemies']:8d} {s['pooled']:7d}"
+              f" {s['spawned']:8d} {s['active_dots']:5d}")
+    first, last = samples[0], samples[-1]
+    growth_mb = (last["rss"] - first["rss"]) / 2**20
+    print(f"rss growth after {args.warmup_s:g}s warm-up: {growth_mb:.2f} MB")
+
+    failures = []
+    if growth_mb > args.rss_budget_mb:
+        failures.append(f"rss grew {growth_mb:.2f} MB > {args.rss_budget_mb} MB")
+    if last["spawned"] > first["spawned"]:
+        failures.append(f"{last['spawned'] - first['spawned']} dummies created after warm-up")
+    for f in failures:
+        print("OVER BUDGET:", f)
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
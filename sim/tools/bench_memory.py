@@ -0,0 +1,94 @@
+# sim/tools/bench_memory.py
+"""
+Memory benchmark for the per-object sim state: 8 targets x 10 DoTs each, plus a
+handful of player buffs and charge states, ticking for a while.
+
+    python -m sim.tools.bench_memory
+    python -m sim.tools.bench_memory --targets 8 --dots 10 --seconds 60
+
+Reports bytes per DotState / Buff / ChargeState (object + instance dict, if any)
+and the tracemalloc footprint of building the scenario and of running it.
+"""
+from __future__ import annotations
+import argparse
+import sys
+import tracemalloc
+
+from sim.core.engine import Engine, Bus, s_to_us
+from sim.core.rng import RNG
+from sim.core.unit import Unit, TargetDummy, Buff
+from sim.core.dot import DotState
+
+def object_bytes(obj) -> int:
+    """Shallow size of one instance, counting its __dict__ when it has one."""
+    n = sys.getsizeof(obj)
+    d = getattr(obj, "__dict__", None)
+    if d is not None:
+        n += sys.getsizeof(d)
+    return n
+
+def build(n_targets: int = 8, n_dots: int = 10, n_buffs: int = 6, n_charges: int = 4):
+    eng, bus = Engine(), Bus()
+    rng = RNG(1)
+    player = Unit("Player", eng, bus, rng, haste=1.1, power=1.0, base_crit=0.3)
+    targets = [TargetDummy(eng, bus, rng, name=f"Target{i}") for i in range(n_targets)]
+    for tgt in targets:
+        for j in range(n_dots):
+            dot = DotState(
+                name=f"Dot{j}", owner=player, target=tgt,
+                anchor_us=0, first_delay_us=s_to_us(1.0),
+                base_duration_us=s_to_us(600), expires_at_us=s_to_us(600),
+                base_tick_us=s_to_us(1.0 + 0.1 * j), coeff_per_tick=10.0,
+                ember_per_tick=0, spirit_per_tick=0, bonus_crit=0.0,
+            )
+            tgt.auras_of(player)[dot.name] = dot
+            player.active_dots.append(dot)
+            dot.schedule_first_tick()
+    for k in range(n_buffs):
+        player.add_buff(Buff(name=f"Buff{k}", expires_at_us=s_to_us(600), props={"damage_bonus": 1.01}))
+    for k in range(n_charges):
+        player.ensure_charges(f"ability{k}", 2, 10.0)
+    return eng, player, targets
+
+def run(n_targets: int = 8, n_dots: int = 10, seconds: float = 60.0) -> dict:
+    tracemalloc.start()
+    eng, player, targets = build(n_targets, n_dots)
+    built, _ = tracemalloc.get_traced_memory()
+    ticks = [0]
+    def count(**_): ticks[0] += 1
+    player.bus.sub("dot_tick", count)
+    tracemalloc.reset_peak()
+    eng.run_until(s_to_us(seconds))
+    after, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    dots = [d for t in targets for d in t.auras_of(player).values()]
+    buffs = list(player.buffs.values())
+    charges = list(player.charges.values())
+    return {
+        "targets": n_targets,
+        "dots": len(dots),
+        "dot_bytes": object_bytes(dots[0]),
+        "buff_bytes": object_bytes(buffs[0]),
+        "charge_bytes": object_bytes(charges[0]),
+        "dots_total_bytes": sum(object_bytes(d) for d in dots),
+        "build_bytes": built,
+        "run_peak_bytes": peak,
+        "run_end_bytes": after,
+        "ticks": ticks[0],
+    }
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m sim.tools.bench_memory", description=__doc__.splitlines()[1])
+    ap.add_argument("--targets", type=int, default=8)
+    ap.add_argument("--dots", type=int, default=10, help="DoTs per target")
+    ap.add_argument("--seconds", type=float, default=60.0, help="simulated seconds of ticking")
+    args = ap.parse_args(argv)
+    r = run(args.targets, args.dots, args.seconds)
+    w = max(len(k) for k in r)
+    for k, v in r.items():
+        print(f"{k:<{w}}  {v}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+# sim/tools/bench_startup.py
+"""
+Startup benchmark with budgets: import cost of the runner (python -X importtime),
+modules that must stay lazy, and wall time of a short `python -m sim` fight.
+
+    python -m sim.tools.bench_startup
+    python -m sim.tools.bench_startup --import-budget-ms 40 --fight-budget-ms 400
+
+Every measurement runs in a fresh interpreter (median of --repeat runs) and the
+exit status is 1 when a budget is blown, so it can gate a bench run.
+"""
+from __future__ import annotations
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+
+RUNNER = "sim.runners.target_dummy"
+# must not be imported just by importing the runner / parsing CLI args (loaded on first use)
+LAZY_FOR_RUNNER = ("yaml", "importlib.util")
+LAZY_FOR_CLI = ("sim.runners", "sim.runtime", "yaml")
+
+def importtime(args: list) -> dict:
+    """{module: cumulative_us} from one `python -X importtime <args>` run."""
+    proc = subprocess.run([sys.executable, "-X", "importtime", *args], capture_output=True, text=True)
+    out = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if cumulative.strip().isdigit():
+            out[name.strip()] = int(cumulative)
+    return out
+
+def wall_ms(args: list) -> float:
+    t0 = time.perf_counter()
+    subprocess.run([sys.executable, *args], capture_output=True, check=True)
+    return (time.perf_counter() - t0) * 1e3
+
+def run(repeat: int = 5, fight_s: float = 10.0, content: str = "Content") -> dict:
+    runs = [importtime(["-c", f"import {RUNNER}"]) for _ in range(repeat)]
+    cli = importtime(["-m", "sim", "--help"])
+    fight = ["-m", "sim", "--content", content, "--duration", str(fight_s)]
+    return {
+        "runner_import_ms": round(statistics.median(r[RUNNER] for r in runs) / 1e3, 2),
+        "runner_eager": sorted(m for m in LAZY_FOR_RUNNER if m in runs[0]),
+        "cli_help_eager": sorted(m for m in cli if m.startswith(LAZY_FOR_CLI)),
+        "cli_help_ms": round(statistics.median(wall_ms(["-m", "sim", "--help"]) for _ in range(repeat)), 1),
+        "fight_ms": round(statistics.median(wall_ms(fight) for _ in range(repeat)), 1),
+        "fight_s": fight_s,
+    }
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m sim.tools.bench_startup", description=__doc__.splitlines()[1])
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--fight-s", type=float, default=10.0, help="simulated seconds for the end-to-end fight")
+    ap.add_argument("--content", default="Content")
+    ap.add_argument("--import-budget-ms", type=float, default=60.0, help=f"cumulative -X importtime of {RUNNER}")
+    ap.add_argument("--fight-budget-ms", type=float, default=1000.0, help="wall time of `python -m sim` for --fight-s")
+    args = ap.parse_args(argv)
+    r = run(args.repeat, args.fight_s, args.content)
+    w = max(len(k) for k in r)
+    for k, v in r.items():
+        print(f"{k:<{w}}  {v}")
+
+    failures = []
+    if r["runner_import_ms"] > args.import_budget_ms:
+        failures.append(f"{RUNNER} import {r['runner_import_ms']}ms > {args.import_budget_ms}ms")
+    if r["runner_eager"]:
+        failures.append(f"{RUNNER} imports {', '.join(r['runner_eager'])} eagerly")
+    if r["cli_help_eager"]:
+        failures.append(f"`python -m sim --help` imports {', '.join(r['cli_help_eager'])}")
+    if r["fight_ms"] > args.fight_budget_ms:
+        failures.append(f"{args.fight_s:g}s fight took {r['fight_ms']}ms > {args.fight_budget_ms}ms")
+    for f in failures:
+        print("OVER BUDGET:", f)
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,203 @@
+# sim/tools/chrome_trace.py
+"""
+Chrome trace-event export of a fight, viewable in Perfetto (ui.perfetto.dev) or
+chrome://tracing.
+
+    python -m sim --character Ardeos --duration 1800 --encounter 0:8 --trace fight.json
+    SimConfig(..., trace="fight.json") / RaidConfig(..., trace="fight.json")
+
+    w = ChromeTraceWriter("fight.json").attach(bus, eng)   # before eng.run_until(...)
+    ...
+    w.close()
+
+Layout: one process per actor with the lanes
+    casts     cast start -> end slices (category "cast" or "channel")
+    off-gcd   off-GCD casts
+    gcd       the GCD each on-GCD cast triggered
+    idle      gaps where the actor could have cast but didn't (GCD and cast both ready)
+    apl       instant markers per APL decision (action, target, reason)
+    buff:<n>  uptime slices of each buff the actor holds
+and one process per enemy with an "alive" lane and a lane per (DoT / debuff, source).
+
+Events are streamed: each one is written to the file as it happens and only the
+slices still open (running casts, live buffs and DoTs) are kept in memory, so
+30-minute many-target fights cost file size, not RAM. Timestamps are whole simulated
+microseconds, which is the unit the format expects.
+"""
+from __future__ import annotations
+from typing import Dict, Tuple
+import json
+
+from sim.core.unit import TargetDummy
+
+_DUMPS = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False).encode
+
+def _us(t: float) -> int:
+    # GCD math leaves fractional microseconds on the clock; whole ones keep back-to-back slices from overlapping
+    return int(round(t))
+
+class ChromeTraceWriter:
+    def __init__(self, path: str):
+        self.path = path
+        self._f = open(path, "w", encoding="utf-8")
+        self._f.write('{"displayTimeUnit":"ms","traceEvents":[\n')
+        self._first = True
+        self._pids: Dict[str, int] = {}                 # actor / enemy name -> pid
+        self._tids: Dict[Tuple[int, str], int] = {}     # (pid, lane) -> tid
+        self._casts: Dict[Tuple[object, str], tuple] = {}   # (caster, ability) -> (t_us, ctx)
+        self._casting = set()                               # casters seen casting at least once
+        self._open: Dict[Tuple[int, int], tuple] = {}       # (pid, tid) -> (t_us, name, cat, obj, args)
+        self._eng = None
+        self.events = 0
+
+    # ---- output ----
+    def _emit(self, evt: dict) -> None:
+        self._f.write(("" if self._first else ",\n") + _DUMPS(evt))
+        self._first = False
+        self.events += 1
+
+    def _pid(self, name: str) -> int:
+        pid = self._pids.get(name)
+        if pid is None:
+            pid = self._pids[name] = len(self._pids) + 1
+            self._emit({"ph": "M", "pid": pid, "tid": 0, "name": "process_name", "args": {"name": name}})
+            self._emit({"ph": "M", "pid": pid, "tid": 0, "name": "process_sort_index", "args": {"sort_index": pid}})
+        return pid
+
+    def _tid(self, pid: int, lane: str) -> int:
+        key = (pid, lane)
+        tid = self._tids.get(key)
+        if tid is None:
+            tid = self._tids[key] = len(self._tids) + 1
+            self._emit({"ph": "M", "pid": pid, "tid": tid, "name": "thread_name", "args": {"name": lane}})
+            self._emit({"ph": "M", "pid": pid, "tid": tid, "name": "thread_sort_index", "args": {"sort_index": tid}})
+        return tid
+
+    def slice(self, pid: int, lane: str, name: str, start_us: float, end_us: float, cat: str = "", args=None) -> None:
+        if end_us < start_us:
+            return
+        evt = {"ph": "X", "pid": pid, "tid": self._tid(pid, lane), "name": name, "cat": cat,
+               "ts": _us(start_us), "dur": _us(end_us) - _us(start_us)}
+        if args:
+            evt["args"] = args
+        self._emit(evt)
+
+    def instant(self, pid: int, lane: str, name: str, t_us: float, args=None) -> None:
+        evt = {"ph": "i", "s": "t", "pid": pid, "tid": self._tid(pid, lane), "name": name, "ts": _us(t_us)}
+        if args:
+            evt["args"] = args
+        self._emit(evt)
+
+    # ---- open slices (buffs, DoTs, enemy lifetimes) ----
+    def _begin(self, pid: int, lane: str, name: str, t_us: float, cat: str, obj=None, args=None) -> None:
+        key = (pid, self._tid(pid, lane))
+        if key in self._open:       # re-applied as a new object: the old one ends here
+            self._end_key(key, t_us)
+        self._open[key] = (t_us, name, cat, obj, args)
+
+    def _end(self, pid: int, lane: str, t_us: float, obj=None) -> None:
+        key = (pid, self._tid(pid, lane))
+        cur = self._open.get(key)
+        if cur is not None and (obj is None or cur[3] is obj):
+            self._end_key(key, t_us)
+
+    def _end_key(self, key, t_us: float) -> None:
+        start, name, cat, _, args = self._open.pop(key)
+        pid, tid = key
+        evt = {"ph": "X", "pid": pid, "tid": tid, "name": name, "cat": cat,
+               "ts": _us(start), "dur": max(0, _us(t_us) - _us(start))}
+        if args:
+            evt["args"] = args
+        self._emit(evt)
+
+    # ---- bus wiring ----
+    def attach(self, bus, eng) -> "ChromeTraceWriter":
+        self._eng = eng
+        casts, casting, pid = self._casts, self._casting, self._pid
+
+        def _name(u): return getattr(u, "name", None) or "?"
+
+        def holder_lane(unit, aura_name: str, source) -> Tuple[int, str]:
+            # player auras on the actor's own track; debuffs per source on the enemy's track
+            if not isinstance(unit, TargetDummy):
+                return pid(_name(unit)), f"buff:{aura_name}"
+            src = f" ({_name(source)})" if source is not None and source is not unit else ""
+            return pid(_name(unit)), f"{aura_name}{src}"
+
+        def on_cast_start(t_us=0, ability_id=None, caster=None, ctx=None, **_):
+            p = pid(_name(caster))
+            ready = max(caster.gcd_ready_us, caster.busy_until_us)   # not yet moved by this cast
+            if t_us > ready and caster in casting:    # before the first cast is the pull, not idle
+                self.slice(p, "idle", "idle", ready, t_us, "idle")
+            casting.add(caster)
+            casts[(caster, ability_id)] = (t_us, ctx)   # a cast that aborts (no spirit) is overwritten
+
+        def on_cast_end(t_us=0, ability_id=None, caster=None, **_):
+            started = casts.pop((caster, ability_id), None)
+            if started is None:
+                return
+            start, ctx = started
+            p = pid(_name(caster))
+            spec = ctx.spec if ctx is not None else None
+            off_gcd = bool(spec is not None and spec.off_gcd)
+            channel = ctx is not None and "channel_evt" in ctx.vars
+            target = _name(ctx.target) if ctx is not None and ctx.target is not None else None
+            self.slice(p, "off-gcd" if off_gcd else "casts", spec.name if spec is not None else ability_id,
+                       start, t_us, "channel" if channel else "cast", {"target": target} if target else None)
+            if not off_gcd and caster.gcd_ready_us > start:
+                self.slice(p, "gcd", "gcd", start, caster.gcd_ready_us, "gcd")
+
+        def on_apl(t_us=0, player=None, action=None, target=None, reason=None, **_):
+            if player is None:
+                return
+            self.instant(pid(_name(player)), "apl", action or "wait", t_us,
+                         {"target": target or "", "reason": reason or ""})
+
+        def on_buff_on(buff=None, target=None, t_us=0, **_):
+            p, lane = holder_lane(target, buff.name, buff.source)
+            self._begin(p, lane, buff.name, t_us, "buff", buff)
+
+        def on_buff_off(buff=None, target=None, t_us=0, **_):
+            p, lane = holder_lane(target, buff.name, buff.source)
+            self._end(p, lane, t_us, buff)
+
+        def on_dot_apply(dot=None, t_us=0, **_):
+            p, lane = holder_lane(dot.target, dot.name, dot.owner)
+            self._begin(p, lane, dot.name, t_us, "dot", dot)
+
+        def on_dot_remove(dot=None, t_us=0, **_):
+            p, lane = holder_lane(dot.target, dot.name, dot.owner)
+            self._end(p, lane, t_us, dot)
+
+        def on_spawn(unit=None, t_us=0, **_):
+            self._begin(pid(_name(unit)), "alive", "alive", t_us, "enemy", unit)
+
+        def on_despawn(unit=None, t_us=0, **_):
+            self._end(pid(_name(unit)), "alive", t_us, unit)
+
+        bus.sub("cast_start", on_cast_start)
+        bus.sub("cast_end", on_cast_end)
+        bus.sub("apl_decision", on_apl)
+        bus.sub("buff_apply", on_buff_on)
+        bus.sub("buff_expire", on_buff_off)
+        bus.sub("buff_remove", on_buff_off)
+        bus.sub("dot_apply", on_dot_apply)
+        bus.sub("dot_remove", on_dot_remove)
+        bus.sub("enemy_spawn", on_spawn)
+        bus.sub("enemy_despawn", on_despawn)
+        return self
+
+    def close(self, end_us: float | None = None) -> None:
+        """End every open slice at end_us (default: the engine clock) and finish the file."""
+        if self._f is None:
+            return
+        if end_us is None:
+            end_us = self._eng.t_us if self._eng is not None else 0
+        for key in list(self._open):
+            self._end_key(key, end_us)
+        self._f.write("\n]}\n")
+        self._f.close()
+        self._f = None
+
+    def __enter__(self): return self
+    def __exit__(self, *exc): self.close()
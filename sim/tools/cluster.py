@@ -0,0 +1,422 @@
+# sim/tools/cluster.py
+"""
+Coordinator / worker protocol for spreading one BatchRequest over several boxes.
+
+    # coordinator: one batch job spec (sim/tools/batch.py format), rows as JSON on stdout
+    python -m sim.tools.cluster job.json --bind 0.0.0.0:7787
+    # on each box, as many as it has cores
+    python -m sim worker --connect coordinator-host:7787
+
+    # everything on this box (the coordinator spawns the workers itself)
+    python -m sim.tools.cluster job.json --local-workers 4
+
+The request is split into one task per replicate (cell, replicate index, seed).
+Workers pull a task, run it and push its DPS back, so fast boxes simply take more;
+once the queue is empty, an idle worker steals a copy of the oldest task still
+running elsewhere and the first result wins. Workers heartbeat while they sim; a
+worker that goes silent for heartbeat_timeout_s or drops its connection has its
+tasks put back at the front of the queue.
+
+Replicate DPS are stored by task index and merged in replicate order, in the same
+chunks run_batch uses, so the rows equal run_batch's for the same request and
+chunk_size whatever the number, speed or failures of the workers.
+
+Wire format: one JSON object per line, each way.
+    worker -> coordinator  {"op": "hello", "worker": name}, {"op": "get"},
+                           {"op": "heartbeat"}, {"op": "result", "task": i, "dps": x, "engine_events": n[, "profile": {...}]},
+                           {"op": "error", "task": i, "error": "..."}
+    coordinator -> worker  {"op": "task", "task": i, "content_dir": ..., "cfg": {SimConfig fields}},
+                           {"op": "wait", "s": seconds}, {"op": "stop"}
+"""
+from __future__ import annotations
+from collections import deque
+from dataclasses import asdict
+from typing import Dict, List, Optional, Tuple
+import argparse
+import contextlib
+import json
+import os
+import socket
+import socketserver
+import subprocess
+import sys
+import threading
+import time
+
+from sim.runners.target_dummy import run_sim, SimConfig
+from sim.tools.harness import (BatchRequest, _cells, _chunked, _extract_dps, _make_cfg, _make_row,
+                               _merge_chunks, _replicate_seeds)
+from sim.tools.stats import DpsSummary
+
+DEFAULT_PORT = 7787
+
+def parse_address(text: str, default_host: str = "127.0.0.1") -> Tuple[str, int]:
+    """'host:port', ':port' or 'host' -> (host, port)."""
+    host, _, port = text.rpartition(":") if ":" in text else (text, "", "")
+    return host or default_host, int(port or DEFAULT_PORT)
+
+def _send(sock: socket.socket, msg: dict) -> None:
+    sock.sendall((json.dumps(msg) + "\n").encode())
+
+def _recv(rfile) -> Optional[dict]:
+    line = rfile.readline()
+    return json.loads(line) if line else None
+
+class _Task:
+    __slots__ = ("cell", "rep", "cfg", "issued", "done")
+
+    def __init__(self, cell: int, rep: int, cfg: SimConfig):
+        self.cell, self.rep, self.cfg = cell, rep, asdict(cfg)
+        self.issued: Dict[str, float] = {}   # worker -> time it was handed out
+        self.done = False
+
+class Coordinator:
+    """
+    Serves the replicates of `req` to workers over TCP until every one has a result.
+
+        coord = Coordinator(req, ("0.0.0.0", 7787)).start()
+        rows = coord.wait()       # blocks; raises if a replicate failed
+        coord.close()
+
+    Port 0 picks a free port (see .address).
+    """
+    def __init__(self, req: BatchRequest, bind: Tuple[str, int] = ("127.0.0.1", 0), *, chunk_size: int = 8,
+                 heartbeat_timeout_s: float = 10.0, steal: bool = True):
+        self.req = req
+        self.chunk_size = chunk_size
+        self.heartbeat_timeout_s = heartbeat_timeout_s
+        self.steal = steal
+        self.cells = _cells(req)
+        self.tasks: List[_Task] = [
+            _Task(c, i, _make_cfg(req, tal, enc, seed))
+            for c, (tal, enc) in enumerate(self.cells)
+            for i, seed in enumerate(_replicate_seeds(req, tal, enc))
+        ]
+        self.dps: List[Optional[float]] = [None] * len(self.tasks)
+        self.events: List[int] = [0] * len(self.tasks)
+        self.profiles: List[Optional[dict]] = [None] * len(self.tasks)
+        self.queue = deque(range(len(self.tasks)))
+        self.left = len(self.tasks)
+        self.error: Optional[str] = None
+        self.workers: Dict[str, dict] = {}     # name -> {"last": t, "tasks": set, "sock": socket}
+        # counters for the log line / tests
+        self.issued = 0
+        self.stolen = 0
+        self.reissued = 0
+        self._cv = threading.Condition()
+        self._server = _Server(bind, _Handler)
+        self._server.coordinator = self
+        self._threads: List[threading.Thread] = []
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        return self._server.server_address[:2]
+
+    def start(self) -> "Coordinator":
+        for fn in (self._server.serve_forever, self._reap):
+            t = threading.Thread(target=fn, daemon=True)
+            t.start()
+            self._threads.append(t)
+        return self
+
+    def close(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        with self._cv:
+            for w in self.workers.values():
+                with contextlib.suppress(OSError):
+                    w["sock"].close()
+
+    def finished(self) -> bool:
+        return self.left == 0 or self.error is not None
+
+    def wait(self, timeout: Optional[float] = None) -> List[dict]:
+        with self._cv:
+            if not self._cv.wait_for(self.finished, timeout):
+                raise TimeoutError(f"{self.left} of {len(self.tasks)} replicates still running")
+        if self.error is not None:
+            raise RuntimeError(self.error)
+        return self.rows()
+
+    # ---- results ----
+    def replicate_dps(self) -> List[List[float]]:
+        out = [[] for _ in self.cells]
+        for task, dps in zip(self.tasks, self.dps):
+            out[task.cell].append(dps)
+        return out
+
+    def rows(self) -> List[dict]:
+        rows = []
+        for cell, ((tal, enc), values) in enumerate(zip(self.cells, self.replicate_dps())):
+            chunks = []
+            for chunk in _chunked(values, self.chunk_size):
+                summ = DpsSummary(self.req.hist_bin_width)
+                for x in chunk:
+                    summ.add(x)
+                chunks.append(summ)
+            prof = self._profile([p for task, p in zip(self.tasks, self.profiles) if task.cell == cell])
+            events = sum(n for task, n in zip(self.tasks, self.events) if task.cell == cell)
+            rows.append(_make_row(tal, enc, _merge_chunks(chunks, self.req.hist_bin_width), dist=self.req.dist,
+                                  events=events, profile=prof.to_dict() if prof is not None else None))
+        return rows
+
+    def profile(self):
+        """Merged Profiler of a BatchRequest(profile=True), in replicate order, else None."""
+        return self._profile(self.profiles)
+
+    @staticmethod
+    def _profile(parts: List[Optional[dict]]):
+        from sim.tools.profiler import Profiler
+        total = None
+        for p in parts:
+            if p is not None:
+                part = Profiler.from_dict(p)
+                total = part if total is None else total.merge(part)
+        return total
+
+    # ---- called from connection threads, under self._cv ----
+    def _hello(self, name: str, sock: socket.socket) -> str:
+        base, k = name, 1
+        while name in self.workers:
+            k += 1
+            name = f"{base}#{k}"
+        self.workers[name] = {"last": time.monotonic(), "tasks": set(), "sock": sock}
+        return name
+
+    def _next(self, name: str) -> dict:
+        if self.finished():
+            return {"op": "stop"}
+        w = self.workers[name]
+        while self.queue:
+            i = self.queue.popleft()
+            if not self.tasks[i].done:
+                return self._issue(i, name, w)
+        if self.steal:
+            running = [t for t in self.tasks if not t.done and t.issued and name not in t.issued]
+            if running:
+                oldest = min(running, key=lambda t: min(t.issued.values()))
+                self.stolen += 1
+                return self._issue(self.tasks.index(oldest), name, w)
+        return {"op": "wait", "s": 0.05}
+
+    def _issue(self, i: int, name: str, w: dict) -> dict:
+        task = self.tasks[i]
+        task.issued[name] = time.monotonic()
+        w["tasks"].add(i)
+        self.issued += 1
+        return {"op": "task", "task": i, "content_dir": self.req.content_dir, "cfg": task.cfg}
+
+    def _result(self, name: str, msg: dict) -> None:
+        i = int(msg["task"])
+        task = self.tasks[i]
+        w = self.workers.get(name)
+        if w is not None:
+            w["tasks"].discard(i)
+        task.issued.pop(name, None)
+        if task.done:
+            return      # a stolen copy finished first
+        if msg["op"] == "error":
+            self.error = f"replicate {task.rep} of cell {task.cell} failed on {name}: {msg.get('error')}"
+        else:
+            task.done = True
+            self.dps[i] = float(msg["dps"])
+            self.events[i] = int(msg.get("engine_events", 0))
+            self.profiles[i] = msg.get("profile")
+            self.left -= 1
+        self._cv.notify_all()
+
+    def _drop(self, name: str) -> None:
+        """Worker gone: put its unfinished tasks back at the front of the queue."""
+        w = self.workers.pop(name, None)
+        if w is None:
+            return
+        for i in sorted(w["tasks"], reverse=True):
+            task = self.tasks[i]
+            task.issued.pop(name, None)
+            if not task.done and not task.issued:
+                self.queue.appendleft(i)
+                self.reissued += 1
+        with contextlib.suppress(OSError):
+            w["sock"].close()
+        self._cv.notify_all()
+
+    def _reap(self) -> None:
+        period = max(0.05, self.heartbeat_timeout_s / 4)
+        while True:
+            time.sleep(period)
+            with self._cv:
+                now = time.monotonic()
+                for name in [n for n, w in self.workers.items() if now - w["last"] > self.heartbeat_timeout_s]:
+                    self._drop(name)
+
+class _Server(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        coord: Coordinator = self.server.coordinator
+        name = None
+        try:
+            while True:
+                msg = _recv(self.rfile)
+                if msg is None:
+                    break
+                with coord._cv:
+                    if msg["op"] == "hello":
+                        name = coord._hello(str(msg.get("worker", "worker")), self.connection)
+                        continue
+                    w = coord.workers.get(name)
+                    if w is None:
+                        break       # reaped: the worker must reconnect
+                    w["last"] = time.monotonic()
+                    op = msg["op"]
+                    reply = None
+                    if op == "get":
+                        reply = coord._next(name)
+                    elif op in ("result", "error"):
+                        coord._result(name, msg)
+                if reply is not None:
+                    _send(self.connection, reply)
+        except (OSError, ValueError):
+            pass
+        finally:
+            if name is not None:
+                with coord._cv:
+                    coord._drop(name)
+
+# ---------- worker ----------
+def run_task(content_dir: str, cfg: dict) -> dict:
+    """One replicate; sim chatter goes to stderr. Returns the result message body."""
+    cfg = SimConfig(**cfg)
+    with contextlib.redirect_stdout(sys.stderr):
+        result = run_sim(content_dir, cfg)
+    out = {"dps": _extract_dps(result, cfg.duration_s), "engine_events": int(result.get("engine_events", 0))}
+    if "profile" in result:
+        out["profile"] = result["profile"]
+    return out
+
+def run_worker(host: str, port: int, *, name: Optional[str] = None, heartbeat_s: float = 1.0,
+               connect_timeout_s: float = 30.0) -> int:
+    """
+    Pull and run tasks from the coordinator at host:port until it says stop or goes
+    away. A background thread heartbeats every heartbeat_s. Returns #tasks run.
+    """
+    deadline = time.monotonic() + connect_timeout_s
+    while True:
+        try:
+            sock = socket.create_connection((host, port))
+            break
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.2)
+    name = name or f"{socket.gethostname()}:{os.getpid()}"
+    lock = threading.Lock()
+    stop = threading.Event()
+
+    def send(msg: dict):
+        with lock:
+            _send(sock, msg)
+
+    def heartbeat():
+        while not stop.wait(heartbeat_s):
+            try:
+                send({"op": "heartbeat"})
+            except OSError:
+                return
+
+    done = 0
+    rfile = sock.makefile("rb")
+    threading.Thread(target=heartbeat, daemon=True).start()
+    try:
+        send({"op": "hello", "worker": name})
+        while True:
+            send({"op": "get"})
+            msg = _recv(rfile)
+            if msg is None or msg["op"] == "stop":
+                break
+            if msg["op"] == "wait":
+                time.sleep(float(msg.get("s", 0.05)))
+                continue
+            try:
+                body = run_task(msg["content_dir"], msg["cfg"])
+                send({"op": "result", "task": msg["task"], **body})
+            except Exception as e:  # a bad cell fails the batch, it must not kill the worker silently
+                send({"op": "error", "task": msg["task"], "error": f"{type(e).__name__}: {e}"})
+            done += 1
+    except (ConnectionError, OSError):
+        pass
+    finally:
+        stop.set()
+        with contextlib.suppress(OSError):
+            sock.close()
+    return done
+
+def worker_main(argv: List[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m sim worker", description="Run sim tasks for a coordinator.")
+    ap.add_argument("--connect", required=True, help="coordinator host:port")
+    ap.add_argument("--name", default=None, help="worker name in the coordinator's log (default host:pid)")
+    ap.add_argument("--heartbeat-s", type=float, default=1.0)
+    args = ap.parse_args(argv)
+    host, port = parse_address(args.connect)
+    n = run_worker(host, port, name=args.name, heartbeat_s=args.heartbeat_s)
+    print(f"worker {args.name or os.getpid()}: {n} tasks", file=sys.stderr)
+    return 0
+
+def spawn_local_workers(address: Tuple[str, int], n: int) -> List[subprocess.Popen]:
+    host, port = address
+    if host in ("0.0.0.0", ""):
+        host = "127.0.0.1"
+    return [subprocess.Popen([sys.executable, "-m", "sim", "worker", "--connect", f"{host}:{port}"])
+            for _ in range(n)]
+
+def run_cluster(req: BatchRequest, bind: Tuple[str, int] = ("127.0.0.1", 0), local_workers: int = 0,
+                chunk_size: int = 8, heartbeat_timeout_s: float = 10.0, timeout: Optional[float] = None) -> List[dict]:
+    """run_batch over TCP workers: serve `req` on `bind` and return its rows."""
+    coord = Coordinator(req, bind, chunk_size=chunk_size, heartbeat_timeout_s=heartbeat_timeout_s).start()
+    procs = spawn_local_workers(coord.address, local_workers)
+    try:
+        rows = coord.wait(timeout)
+        if req.profile:
+            print(coord.profile().report(), file=sys.stderr)
+        return rows
+    finally:
+        coord.close()
+        for p in procs:
+            with contextlib.suppress(subprocess.TimeoutExpired):
+                p.wait(timeout=5)
+            if p.poll() is None:
+                p.kill()
+
+def main(argv: List[str] | None = None) -> int:
+    from sim.tools.batch import parse_job
+    ap = argparse.ArgumentParser(prog="python -m sim.tools.cluster", description="Serve one batch job to TCP workers.")
+    ap.add_argument("job", help="JSON job spec (sim/tools/batch.py format), or - for stdin")
+    ap.add_argument("--bind", default=f"127.0.0.1:{DEFAULT_PORT}", help="host:port to listen on")
+    ap.add_argument("--local-workers", type=int, default=0, help="also start this many workers on this box")
+    ap.add_argument("--chunk-size", type=int, default=8, help="replicates per merge chunk (match run_batch's)")
+    ap.add_argument("--heartbeat-timeout-s", type=float, default=10.0)
+    args = ap.parse_args(argv)
+
+    text = sys.stdin.read() if args.job == "-" else open(args.job, "r").read()
+    req, mode = parse_job(json.loads(text))
+    coord = Coordinator(req, parse_address(args.bind), chunk_size=args.chunk_size,
+                        heartbeat_timeout_s=args.heartbeat_timeout_s).start()
+    print(f"serving {len(coord.tasks)} replicates on {coord.address[0]}:{coord.address[1]}", file=sys.stderr)
+    procs = spawn_local_workers(coord.address, args.local_workers)
+    try:
+        rows = coord.wait()
+    finally:
+        coord.close()
+        for p in procs:
+            p.wait()
+    if mode == "replicates":
+        for row, dps in zip(rows, coord.replicate_dps()):
+            row["replicate_dps"] = dps
+    print(json.dumps({"ok": True, "rows": rows, "issued": coord.issued, "stolen": coord.stolen,
+                      "reissued": coord.reissued}))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
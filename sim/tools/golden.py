@@ -0,0 +1,185 @@
+# sim/tools/golden.py
+"""
+Golden-trace equivalence check for engine and runtime optimizations.
+
+    python -m sim.tools.golden record            # (re)write golden/<scenario>.npz
+    python -m sim.tools.golden check             # exit 1 at the first divergence
+    python -m sim.tools.golden check --only rime_cleave --context 8
+    python -m sim.tools.golden check --threads 4  # 4 copies of each scenario at once, in threads
+
+Each scenario is a fixed SimConfig (character, talents, encounter, seed). Its trace
+is the columnar timeline (sim/tools/timeline.py) of the whole fight: one row per
+damage hit, DoT tick, cast start/end, APL decision and ember gain/spend, with
+timestamp, engine phase, event kind, ability, target, amount and crit. Traces are
+stored as deflated .npz (ids resolved to names on compare, so interning order does
+not matter) and compared row by row; the first differing row is reported with the
+rows around it from both sides.
+
+A change that only makes things faster must pass `check` unchanged. A change that
+is meant to alter results re-records the goldens in the same commit.
+
+--threads N runs N copies of every scenario concurrently on N threads of one process
+(the thread backend of run_batch), so they share parsed content, the frozen ability
+specs and APL modules; every copy must still match its golden row for row.
+"""
+from __future__ import annotations
+from typing import Dict, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+import argparse
+import contextlib
+import math
+import os
+import sys
+import tempfile
+
+from sim.tools.timeline import KIND_NAMES, NO_PHASE, load_npz
+
+GOLDEN_DIR = "golden"
+PHASE_NAMES = ("CAST_END", "CHANNEL_TICK", "DAMAGE", "DOT_TICK", "APL")
+
+_ARDEOS_FULL = {"1C": True, "2C": True, "3B": True, "4B": True, "6A": True, "6C": True}
+_RIME_FULL = {"2A": True, "3B": True, "3C": True, "5B": True}
+_DUNGEON = [(0, 3), (30, 1), (45, 8), (75, 3), (100, 5)]
+_STATS = {"power": 1.0, "haste": 1.1, "base_crit": 0.4, "base_spirit_gain": 1.1, "movement": 0.15}
+
+# name -> SimConfig fields; keep fights short so the goldens stay small
+SCENARIOS: Dict[str, dict] = {
+    "ardeos_st":        dict(character="Ardeos", talents={}, encounter=[(0, 1)], seed=1, duration_s=60.0),
+    "ardeos_full_st":   dict(character="Ardeos", talents=_ARDEOS_FULL, encounter=[(0, 1)], seed=2, duration_s=60.0),
+    "ardeos_dungeon":   dict(character="Ardeos", talents=_ARDEOS_FULL, encounter=_DUNGEON, seed=3, duration_s=120.0),
+    "ardeos_extend":    dict(character="Ardeos", talents={"1A": True, "2A": True, "3A": True, "5C": True},
+                             encounter=[(0, 3), (20, 1)], seed=4, duration_s=60.0),
+    "rime_st":          dict(character="Rime", talents={}, encounter=[(0, 1)], seed=5, duration_s=60.0),
+    "rime_full_st":     dict(character="Rime", talents=_RIME_FULL, encounter=[(0, 1)], seed=6, duration_s=60.0),
+    "rime_cleave":      dict(character="Rime", talents={"1A": True, "2B": True, "3C": True, "5B": True},
+                             encounter=[(0, 3)], seed=7, duration_s=60.0),
+    "rime_dungeon":     dict(character="Rime", talents=_RIME_FULL, encounter=_DUNGEON, seed=8, duration_s=120.0),
+    # pooled dummies and mid-fight queue compaction (World long_fight)
+    "ardeos_long_fight": dict(character="Ardeos", talents=_ARDEOS_FULL, encounter=_DUNGEON, seed=3, duration_s=120.0,
+                              long_fight=True),
+}
+
+FIELDS = ("t_us", "phase", "kind", "ability", "target", "amount", "crit")
+Row = Tuple
+
+def record(name: str, content_dir: str = "Content", path: Optional[str] = None, redirect: bool = True) -> str:
+    """Run scenario `name` with a timeline attached; returns the .npz path written."""
+    from sim.runners.target_dummy import run_sim, SimConfig
+    if path is None:
+        fd, path = tempfile.mkstemp(suffix=".npz")
+        os.close(fd)
+    cfg = SimConfig(**_STATS, **SCENARIOS[name], timeline=path)
+    with (contextlib.redirect_stdout(sys.stderr) if redirect else contextlib.nullcontext()):
+        run_sim(content_dir, cfg)
+    return path
+
+def _record_threaded(names: List[str], content_dir: str, threads: int) -> Dict[str, List[str]]:
+    """name -> trace paths of `threads` copies of it, all recorded concurrently."""
+    jobs = [name for name in names for _ in range(threads)]
+    # sys.stdout is process-wide: redirect it once around the pool, not per thread
+    with contextlib.redirect_stdout(sys.stderr), ThreadPoolExecutor(max_workers=threads) as pool:
+        paths = list(pool.map(lambda name: record(name, content_dir, redirect=False), jobs))
+    out: Dict[str, List[str]] = {name: [] for name in names}
+    for name, path in zip(jobs, paths):
+        out[name].append(path)
+    return out
+
+def rows(path: str) -> List[Row]:
+    """Trace rows with names resolved: (t_us, phase, kind, ability, target, amount, crit)."""
+    cols = load_npz(path)
+    ab, tg = cols["ability_names"], cols["target_names"]
+    phase = cols.get("phase") or [NO_PHASE] * len(cols["t_us"])
+    return list(zip(cols["t_us"], phase, [KIND_NAMES[k] for k in cols["kind"]],
+                    [ab[i] for i in cols["ability"]], [tg[i] for i in cols["target"]],
+                    cols["amount"], cols["crit"]))
+
+def _same(a: Row, b: Row, rtol: float) -> bool:
+    if a[:5] != b[:5] or a[6] != b[6]:
+        return False
+    return a[5] == b[5] or math.isclose(a[5], b[5], rel_tol=rtol, abs_tol=0.0)
+
+def first_divergence(golden: List[Row], new: List[Row], rtol: float = 0.0) -> Optional[int]:
+    """Index of the first differing row (len of the shorter trace if one is a prefix), None if equal."""
+    for i, (a, b) in enumerate(zip(golden, new)):
+        if not _same(a, b, rtol):
+            return i
+    return None if len(golden) == len(new) else min(len(golden), len(new))
+
+def fmt(row: Optional[Row]) -> str:
+    if row is None:
+        return "(end of trace)"
+    t, phase, kind, ability, target, amount, crit = row
+    ph = PHASE_NAMES[phase] if phase < len(PHASE_NAMES) else "-"
+    return (f"{t / 1e6:11.6f}s {ph:<12} {kind:<14} {ability or '-':<22} {target or '-':<10}"
+            f" {amount:12.4f}{' crit' if crit else ''}")
+
+def report(golden: List[Row], new: List[Row], i: int, context: int = 5) -> str:
+    lines = [f"first divergence at row {i} (golden {len(golden)} rows, new {len(new)} rows)"]
+    for j in range(max(0, i - context), min(max(len(golden), len(new)), i + context + 1)):
+        g = golden[j] if j < len(golden) else None
+        n = new[j] if j < len(new) else None
+        mark = ">>" if j == i else "  "
+        if g == n:
+            lines.append(f"{mark} {j:7d}   {fmt(g)}")
+        else:
+            lines.append(f"{mark} {j:7d} - {fmt(g)}")
+            lines.append(f"{mark} {'':7} + {fmt(n)}")
+    return "\n".join(lines)
+
+def check(names: List[str], golden_dir: str = GOLDEN_DIR, content_dir: str = "Content",
+          rtol: float = 0.0, context: int = 5, out=sys.stdout, threads: int = 0) -> int:
+    """
+    Re-run each scenario and diff it with its golden; returns the number that diverge.
+    threads > 0 runs that many copies of each scenario concurrently (see module doc).
+    """
+    failed = 0
+    missing = [name for name in names if not os.path.exists(os.path.join(golden_dir, f"{name}.npz"))]
+    for name in missing:
+        print(f"{name}: no golden at {os.path.join(golden_dir, f'{name}.npz')} (run `record` first)", file=out)
+        failed += 1
+    names = [name for name in names if name not in missing]
+    threaded = _record_threaded(names, content_dir, threads) if threads > 0 else {}
+    for name in names:
+        golden = rows(os.path.join(golden_dir, f"{name}.npz"))
+        paths = threaded.get(name) or [record(name, content_dir)]
+        for k, path in enumerate(paths):
+            try:
+                new = rows(path)
+            finally:
+                os.remove(path)
+            label = f"{name}[thread copy {k}]" if threads > 0 else name
+            i = first_divergence(golden, new, rtol)
+            if i is None:
+                print(f"{label}: ok ({len(new)} rows)", file=out)
+            else:
+                failed += 1
+                print(f"{label}: DIVERGED\n{report(golden, new, i, context)}", file=out)
+    return failed
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m sim.tools.golden", description=__doc__.splitlines()[1])
+    ap.add_argument("action", choices=("record", "check", "list"))
+    ap.add_argument("--only", action="append", choices=sorted(SCENARIOS), help="scenario(s) to use (default: all)")
+    ap.add_argument("--dir", default=GOLDEN_DIR, help=f"golden trace directory (default: {GOLDEN_DIR})")
+    ap.add_argument("--content", default="Content")
+    ap.add_argument("--rtol", type=float, default=0.0, help="relative tolerance on amounts (default: exact)")
+    ap.add_argument("--context", type=int, default=5, help="rows shown around a divergence")
+    ap.add_argument("--threads", type=int, default=0,
+                    help="check: run this many copies of each scenario concurrently in threads (default: serial)")
+    args = ap.parse_args(argv)
+    names = args.only or list(SCENARIOS)
+
+    if args.action == "list":
+        for name in names:
+            print(name, SCENARIOS[name])
+        return 0
+    if args.action == "record":
+        os.makedirs(args.dir, exist_ok=True)
+        for name in names:
+            path = record(name, args.content, os.path.join(args.dir, f"{name}.npz"))
+            print(f"{name}: {len(rows(path))} rows, {os.path.getsize(path)} bytes -> {path}")
+        return 0
+    return 1 if check(names, args.dir, args.content, args.rtol, args.context, threads=args.threads) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
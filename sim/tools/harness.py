@@ -0,0 +1,470 @@
+# sim/tools/harness.py
+from __future__ import annotations
+from dataclasses import dataclass, replace
+from typing import Dict, List, Tuple, Any, Optional
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor, FIRST_COMPLETED, wait
+import contextlib
+from contextlib import nullcontext
+import math
+import json
+import hashlib
+import sys
+
+from sim.runners.target_dummy import run_sim, SimConfig
+from sim.tools.stats import DpsSummary
+
+# ---------- Inputs ----------
+@dataclass
+class Attrs:
+    name: str                 # character/pack id (e.g., "pyro")
+    haste: float              # e.g., 1.15 means +15% haste; or whatever your engine expects
+    base_crit:  float              # base crit as fraction, e.g., 0.15 for 15%
+    base_spirit_gain: float   # e.g., 1.00 (no bonus), 1.20 (+20%)
+    power: float
+
+@dataclass
+class BatchRequest:
+    content_dir: str
+    attrs: Attrs
+    talent_sets: List[Dict[str, Any]]           # e.g., [{"1A": True, "1C": True}, {...}, ...]
+    schedules: List[List[Tuple[float, int]]]    # e.g., [[(0,1),(15,3),(30,1)], [(0,5)], ...]
+    run_count: int = 100
+    duration_s: float = 300.0                   # 5 minutes default
+    base_seed: int = 1337                       # change for a different Monte Carlo repeat
+    movement: float = 0
+    seeds: Optional[List[int]] = None           # explicit replicate seeds; overrides run_count/base_seed
+    hist_bin_width: Optional[float] = None      # DPS histogram bin width per row; None = scale-relative bins
+    dist: bool = False                          # rows carry 'dist', the mergeable DpsSummary state (merge_rows())
+    profile: bool = False                       # profile every replicate, print one merged report (sim/tools/profiler.py)
+    long_fight: bool = False                    # constant-memory enemy handling for long many-pull fights (see World)
+    quiet: bool = False                         # replicates don't echo their talents (run_batch sets it under progress)
+    wall_limit_s: Optional[float] = None        # per replicate; a hung cell fails with SimBudgetExceeded (see Engine)
+
+# ---------- Helpers ----------
+def _format_talents(tal: Dict[str, Any]) -> str:
+    # Compact, stable key for the table
+    # If values have params, keep them (sorted json)
+    keys = sorted(tal.keys())
+    if all(v is True or v == {} for v in tal.values()):
+        return "+".join(keys) if keys else "(none)"
+    # parametric talents: stable JSON by sorting keys
+    return json.dumps({k: tal[k] for k in keys}, sort_keys=True)
+
+def _format_schedule(enc: List[Tuple[float, int]]) -> str:
+    # e.g., "0:1 → 15:3 → 30:1"
+    return " → ".join(f"{t}:{n}" for (t, n) in enc)
+
+def _extract_dps(result: Any, duration_s: float) -> float:
+    # Be flexible about return shape
+    if isinstance(result, dict):
+        if "dps" in result:
+            return float(result["dps"])
+        if "total_damage" in result:
+            return float(result["total_damage"]) / float(duration_s)
+    if hasattr(result, "dps"):
+        return float(result.dps)
+    if hasattr(result, "total_damage"):
+        return float(result.total_damage) / float(duration_s)
+    raise ValueError("run_sim result did not contain dps or total_damage")
+
+def _seed_for(base_seed: int, talents: Dict[str, Any], schedule: List[Tuple[float,int]], i: int) -> int:
+    # Stable per (talents, schedule, replicate index) seed
+    h = hashlib.blake2b(digest_size=8)
+    h.update(str(base_seed).encode())
+    h.update(json.dumps(talents, sort_keys=True).encode())
+    h.update(json.dumps(schedule).encode())
+    h.update(str(i).encode())
+    return int.from_bytes(h.digest(), "big") % (2**31 - 1)
+
+# ---------- Core ----------
+def _cells(req: BatchRequest) -> List[Tuple[Dict[str, Any], List[Tuple[float, int]]]]:
+    # One cell per (talents, schedule), in table order
+    return [(tal, enc) for tal in req.talent_sets for enc in req.schedules]
+
+def _replicate_seeds(req: BatchRequest, tal: Dict[str, Any], enc: List[Tuple[float, int]]) -> List[int]:
+    if req.seeds:
+        return [int(s) for s in req.seeds]
+    return [_seed_for(req.base_seed, tal, enc, i) for i in range(req.run_count)]
+
+def _make_cfg(req: BatchRequest, tal: Dict[str, Any], enc: List[Tuple[float, int]], seed: int) -> SimConfig:
+    # Build SimConfig for this replicate
+    stats = {
+        "haste": req.attrs.haste,
+        "base_crit": req.attrs.base_crit,
+        "base_spirit_gain": req.attrs.base_spirit_gain,
+        "power": req.attrs.power
+    }
+    cfg = SimConfig(
+        duration_s=req.duration_s,
+        seed=seed,
+        talents=tal,
+        character=req.attrs.name,
+        encounter=enc,
+        power=stats["power"],
+        haste=stats["haste"],
+        base_crit=stats["base_crit"],
+        base_spirit_gain=stats["base_spirit_gain"],
+        movement=req.movement,
+        profile="collect" if req.profile else False,
+        long_fight=req.long_fight,
+        quiet=req.quiet,
+        wall_limit_s=req.wall_limit_s,
+    )
+    try:
+        setattr(cfg, "stats", stats)  # harmless if SimConfig already declares it
+    except Exception:
+        pass
+    return cfg
+
+def _make_row(tal: Dict[str, Any], enc: List[Tuple[float, int]], summary: DpsSummary, dist: bool = False,
+              events: Optional[int] = None, profile: Optional[dict] = None) -> dict:
+    row = {
+        "talents": _format_talents(tal),
+        "schedule": _format_schedule(enc),
+        **summary.report(),
+    }
+    if events is not None:
+        row["engine_events"] = events
+    if profile is not None:
+        row["profile"] = profile          # Profiler.to_dict() over the cell's replicates
+    if dist:
+        row["dist"] = summary.to_dict()   # mergeable state, see merge_rows()
+    return row
+
+@dataclass
+class ChunkResult:
+    """What a worker sends back for one chunk of replicates."""
+    summary: DpsSummary
+    values: List[float]                         # raw DPS, in replicate order
+    events: int = 0                             # engine events the replicates ran (progress reporting)
+    profile: Optional[dict] = None              # Profiler.to_dict() of a profiled batch
+
+def _summarize(content_dir: str, cfgs: List[SimConfig], bin_width: Optional[float], first_index: Optional[int] = None,
+               on_replicate=None) -> ChunkResult:
+    # first_index set = serial mode: print "Run: i" progress like we always have,
+    # unless on_replicate(engine_events) takes the progress reporting over
+    out = ChunkResult(DpsSummary(bin_width), [])
+    prof = None
+    for j, cfg in enumerate(cfgs):
+        if first_index is not None and on_replicate is None:
+            print("Run: ", first_index + j)
+        result = run_sim(content_dir, cfg)
+        dps = _extract_dps(result, cfg.duration_s)
+        out.summary.add(dps)
+        out.values.append(dps)
+        events = int(result.get("engine_events", 0)) if isinstance(result, dict) else 0
+        out.events += events
+        if on_replicate is not None:
+            on_replicate(events)
+        if "profile" in result:
+            from sim.tools.profiler import Profiler
+            part = Profiler.from_dict(result["profile"])
+            prof = part if prof is None else prof.merge(part)
+    if prof is not None:
+        out.profile = prof.to_dict()
+    return out
+
+def _merge_profile_dicts(parts: List[Optional[dict]]):
+    from sim.tools.profiler import Profiler
+    total = None
+    for p in parts:
+        if p is not None:
+            part = Profiler.from_dict(p)
+            total = part if total is None else total.merge(part)
+    return total
+
+def merge_profiles(chunks: List[ChunkResult]):
+    """One Profiler over every profiled chunk (None if the batch wasn't profiled)."""
+    return _merge_profile_dicts([c.profile for c in chunks])
+
+def run_replicates(content_dir: str, cfgs: List[SimConfig], bin_width: Optional[float] = None) -> ChunkResult:
+    """
+    Worker entry point: run a chunk of replicates and return their partial summary
+    and raw DPS, in replicate order. The parent merges chunks in order.
+    Sim/talent chatter goes to stderr so stdout stays clean for result streams.
+    """
+    with contextlib.redirect_stdout(sys.stderr):
+        return _summarize(content_dir, cfgs, bin_width)
+
+def _merge_chunks(chunks: List[DpsSummary], bin_width: Optional[float]) -> DpsSummary:
+    total = DpsSummary(bin_width)
+    for c in chunks:
+        total.merge(c)
+    return total
+
+def _chunks_row(req: BatchRequest, tal: Dict[str, Any], enc: List[Tuple[float, int]],
+                chunks: List[ChunkResult]) -> dict:
+    prof = merge_profiles(chunks)
+    return _make_row(tal, enc, _merge_chunks([c.summary for c in chunks], req.hist_bin_width), dist=req.dist,
+                     events=sum(c.events for c in chunks), profile=prof.to_dict() if prof is not None else None)
+
+class BatchHandle:
+    """Futures for one BatchRequest submitted to an executor; rows() blocks until all cells finish."""
+    def __init__(self, req: BatchRequest, cells, futures: List[List[Future]]):
+        self.req = req
+        self.cells = cells
+        self.futures = futures            # per cell: list of chunk futures, in replicate order
+
+    def all_futures(self) -> List[Future]:
+        return [f for fs in self.futures for f in fs]
+
+    def done(self) -> bool:
+        return all(f.done() for f in self.all_futures())
+
+    def replicate_dps(self) -> List[List[float]]:
+        return [[d for f in fs for d in f.result().values] for fs in self.futures]
+
+    def summaries(self) -> List[DpsSummary]:
+        return [_merge_chunks([f.result().summary for f in fs], self.req.hist_bin_width) for fs in self.futures]
+
+    def rows(self) -> List[dict]:
+        return [_chunks_row(self.req, tal, enc, [f.result() for f in fs]) for (tal, enc), fs in zip(self.cells, self.futures)]
+
+    def profile(self):
+        """Merged Profiler of a BatchRequest(profile=True), else None."""
+        return merge_profiles([f.result() for f in self.all_futures()])
+
+    def _chunk_progress(self, cell: int, k: int, f: Future) -> Tuple[int, int]:
+        chunk = f.result()
+        return chunk.summary.n, chunk.events
+
+    def wait(self, progress=None, interval_s: float = 1.0) -> None:
+        """Block until every chunk is done, reporting each one to `progress` (a Progress) as it lands."""
+        where = {f: (cell, k) for cell, fs in enumerate(self.futures) for k, f in enumerate(fs)}
+        pending = set(where)
+        while pending:
+            done, pending = wait(pending, timeout=interval_s, return_when=FIRST_COMPLETED)
+            if progress is None:
+                continue
+            for f in done:
+                if f.exception() is None:       # failures surface from rows()
+                    n, events = self._chunk_progress(*where[f], f)
+                    progress.update(where[f][0], n, events)
+            progress.tick()
+
+class ShmBatchHandle(BatchHandle):
+    """
+    BatchHandle whose workers write replicate rows into a shared ResultBlock
+    (sim/tools/shm_results.py) instead of returning pickled chunk summaries. Rows are
+    rebuilt from the block in the same chunks, so they match the pickled path exactly.
+    close() frees the block; the handle is also a context manager.
+    """
+    def __init__(self, req: BatchRequest, cells, futures: List[List[Future]], block, spans, chunk_size: int):
+        super().__init__(req, cells, futures)
+        self.block = block
+        self.spans = spans                # per cell: (first row, stop row) in the block
+        self.chunk_size = chunk_size
+
+    def _collect(self):
+        for fs in self.futures:
+            for f in fs:
+                extra, _ = f.result()
+                if extra:
+                    self.block.extra.update(extra)
+
+    def replicate_dps(self) -> List[List[float]]:
+        self._collect()
+        return [self.block.column("dps", a, b) for a, b in self.spans]
+
+    def summaries(self) -> List[DpsSummary]:
+        out = []
+        for values in self.replicate_dps():
+            chunks = []
+            for chunk in _chunked(values, self.chunk_size):
+                summ = DpsSummary(self.req.hist_bin_width)
+                for x in chunk:
+                    summ.add(x)
+                chunks.append(summ)
+            out.append(_merge_chunks(chunks, self.req.hist_bin_width))
+        return out
+
+    def rows(self) -> List[dict]:
+        out = []
+        for (tal, enc), summ, (a, b), fs in zip(self.cells, self.summaries(), self.spans, self.futures):
+            prof = _merge_profile_dicts([f.result()[1] for f in fs])
+            out.append(_make_row(tal, enc, summ, dist=self.req.dist,
+                                 events=int(sum(self.block.column("engine_events", a, b))),
+                                 profile=prof.to_dict() if prof is not None else None))
+        return out
+
+    def _chunk_progress(self, cell: int, k: int, f: Future) -> Tuple[int, int]:
+        first = self.spans[cell][0] + k * self.chunk_size
+        rows = self.block.column("engine_events", first, min(first + self.chunk_size, self.spans[cell][1]))
+        return len(rows), int(sum(rows))
+
+    def metric_means(self) -> List[Dict[str, float]]:
+        """Per cell: mean of every reported metric (dps, totals, 'damage:<tag>', 'casts:<name>')."""
+        self._collect()
+        return [self.block.means(a, b) for a, b in self.spans]
+
+    def profile(self):
+        return _merge_profile_dicts([f.result()[1] for f in self.all_futures()])
+
+    def close(self):
+        self.block.close()
+
+    def __enter__(self): return self
+    def __exit__(self, *exc): self.close()
+
+TRANSPORTS = ("pickle", "shm", "direct")
+BACKENDS = ("process", "thread")
+
+def _chunked(cfgs: List[SimConfig], chunk_size: int) -> List[List[SimConfig]]:
+    chunk_size = max(1, int(chunk_size))
+    return [cfgs[i:i + chunk_size] for i in range(0, len(cfgs), chunk_size)]
+
+def submit_batch(req: BatchRequest, executor: Executor, chunk_size: int = 8, transport: str = "pickle") -> BatchHandle:
+    """
+    Queue every replicate of `req` on `executor` in chunks of `chunk_size`.
+    The executor can be shared between many requests (see sim/tools/batch.py).
+
+    transport="shm" returns a ShmBatchHandle: workers write per-replicate metrics into a
+    shared-memory block instead of pickling summaries back; close() it when done.
+    transport="direct" is for thread pools: chunk summaries come back as they are and
+    tasks leave sys.stdout alone (it is process-wide; the caller redirects it once).
+    """
+    cells = _cells(req)
+    if transport == "shm":
+        return _submit_shm(req, executor, cells, chunk_size)
+    if transport not in TRANSPORTS:
+        raise ValueError(f"unknown transport {transport!r} (expected one of {', '.join(TRANSPORTS)})")
+    fn = _summarize if transport == "direct" else run_replicates
+    futures = []
+    for tal, enc in cells:
+        cfgs = [_make_cfg(req, tal, enc, seed) for seed in _replicate_seeds(req, tal, enc)]
+        futures.append([executor.submit(fn, req.content_dir, chunk, req.hist_bin_width)
+                        for chunk in _chunked(cfgs, chunk_size)])
+    return BatchHandle(req, cells, futures)
+
+def _submit_shm(req: BatchRequest, executor: Executor, cells, chunk_size: int) -> ShmBatchHandle:
+    from sim.tools.shm_results import MetricLayout, ResultBlock, run_replicates_shm
+    layout = MetricLayout.for_pack(req.content_dir, req.attrs.name)
+    seeds = [_replicate_seeds(req, tal, enc) for tal, enc in cells]
+    block = ResultBlock(sum(len(s) for s in seeds), layout)
+    futures, spans, row = [], [], 0
+    for (tal, enc), cell_seeds in zip(cells, seeds):
+        cfgs = [_make_cfg(req, tal, enc, seed) for seed in cell_seeds]
+        fs = []
+        for chunk in _chunked(cfgs, chunk_size):
+            fs.append(executor.submit(run_replicates_shm, req.content_dir, chunk, block.name, row, layout.columns))
+            row += len(chunk)
+        futures.append(fs)
+        spans.append((row - len(cfgs), row))
+    return ShmBatchHandle(req, cells, futures, block, spans, chunk_size)
+
+def _progress(req: BatchRequest, progress, interval_s: float):
+    if progress is None or not isinstance(progress, str):
+        return progress
+    from sim.tools.progress import Progress
+    totals = [len(_replicate_seeds(req, tal, enc)) for tal, enc in _cells(req)]
+    return Progress(totals, req.duration_s, mode=progress, interval_s=interval_s)
+
+def run_batch(req: BatchRequest, workers: int = 0, executor: Optional[Executor] = None, chunk_size: int = 8,
+              transport: str = "shm", progress=None, progress_interval_s: float = 1.0, backend: str = "process"):
+    """
+    Returns: list of rows dicts with keys: 'talents', 'schedule', 'average_dps', plus the
+    DPS spread ('n', 'stdev', 'min', 'p5', 'p50', 'p95', 'max') and 'engine_events'.
+    With req.dist, rows also carry 'dist', the mergeable DpsSummary state (histogram +
+    quantile sketch) for combining shards with merge_rows(); with req.profile, 'profile',
+    the cell's Profiler.to_dict(). You can easily convert to pandas.DataFrame if you like.
+
+    workers=0 and no executor runs serially in this process (prints "Run: i");
+    otherwise replicates fan out over `executor` or a fresh pool of `workers` processes.
+    Seeds are per replicate and chunks merge in replicate order, so results do not
+    depend on the execution mode or worker count. With req.profile, one profile
+    report merged over every replicate is printed at the end.
+
+    In parallel mode, transport="shm" (default) has workers write their numbers into
+    shared memory (see ShmBatchHandle); "pickle" returns chunk summaries through the pool.
+
+    backend="thread" (or a ThreadPoolExecutor as executor) runs the replicates on
+    `workers` threads of this process instead: no worker start-up, no pickling, and
+    parsed content, patched ability specs and APL modules are shared by every thread.
+    Threads only run sims in parallel on free-threaded CPython builds; with the GIL
+    they take turns. Sim chatter goes to stderr, as it does from worker processes.
+
+    progress="line" keeps one updating progress/throughput/ETA line on stderr instead
+    of "Run: i", "json" writes a JSON snapshot per progress_interval_s for dashboards;
+    a sim.tools.progress.Progress can also be passed in (see there).
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"unknown backend {backend!r} (expected one of {', '.join(BACKENDS)})")
+    progress = _progress(req, progress, progress_interval_s)
+    if progress is not None and not req.quiet:
+        req = replace(req, quiet=True)
+    if isinstance(executor, ThreadPoolExecutor):
+        backend = "thread"
+    if executor is not None or (workers and workers > 0):
+        threads = backend == "thread"
+        if executor is not None:
+            pool_cm = nullcontext(executor)
+        else:
+            pool_cm = ThreadPoolExecutor(max_workers=workers) if threads else ProcessPoolExecutor(max_workers=workers)
+        with pool_cm as pool:
+            # per-task redirects would race between threads: one for the whole batch instead
+            with (contextlib.redirect_stdout(sys.stderr) if threads else nullcontext()):
+                handle = submit_batch(req, pool, chunk_size, "direct" if threads else transport)
+                try:
+                    handle.wait(progress, progress_interval_s)
+                    if progress is not None:
+                        progress.close()
+                    rows = handle.rows()
+                finally:
+                    if isinstance(handle, ShmBatchHandle):
+                        handle.close()
+            if req.profile:
+                print(handle.profile().report())
+            return rows
+
+    rows, all_chunks = [], []
+    for cell, (tal, enc) in enumerate(_cells(req)):
+        cfgs = [_make_cfg(req, tal, enc, seed) for seed in _replicate_seeds(req, tal, enc)]
+        chunks, done = [], 0
+        on_replicate = (lambda events, cell=cell: progress.update(cell, 1, events)) if progress is not None else None
+        for chunk in _chunked(cfgs, chunk_size):
+            chunks.append(_summarize(req.content_dir, chunk, req.hist_bin_width, first_index=done,
+                                     on_replicate=on_replicate))
+            done += len(chunk)
+        rows.append(_chunks_row(req, tal, enc, chunks))
+        all_chunks.extend(chunks)
+    if progress is not None:
+        progress.close()
+    if req.profile:
+        print(merge_profiles(all_chunks).report())
+
+    return rows
+
+def merge_rows(*row_lists: List[dict]) -> List[dict]:
+    """
+    Combine rows from several shards (e.g. the same cells run with different seeds on
+    different boxes) into one row per (talents, schedule), using each row's 'dist'
+    (run the shards with BatchRequest(dist=True)). Merged rows keep their 'dist'.
+    """
+    merged: Dict[Tuple[str, str], DpsSummary] = {}
+    for rows in row_lists:
+        for r in rows:
+            key = (r["talents"], r["schedule"])
+            if "dist" not in r:
+                raise ValueError(f"row {key} has no 'dist'; run the batch with BatchRequest(dist=True) to merge it")
+            part = DpsSummary.from_dict(r["dist"])
+            if key in merged:
+                merged[key].merge(part)
+            else:
+                merged[key] = part
+    return [{"talents": t, "schedule": s, **summ.report(), "dist": summ.to_dict()}
+            for (t, s), summ in merged.items()]
+
+# ---------- Optional: pretty print ----------
+def print_table(rows: List[dict]):
+    # simple fixed-width display; swap for pandas if you prefer
+    if not rows:
+        print("(no results)")
+        return
+    w1 = max(len(r["talents"]) for r in rows + [{"talents":"talents"}])
+    w2 = max(len(r["schedule"]) for r in rows + [{"schedule":"schedule"}])
+    spread = ("stdev", "p5", "p50", "p95")
+    print(f"{'talents'.ljust(w1)} | {'schedule'.ljust(w2)} | average_dps | " + " | ".join(c.rjust(10) for c in spread))
+    print("-" * (w1 + w2 + 15 + 3 + 13 * len(spread)))
+    for r in rows:
+        extra = " | ".join(f"{r.get(c, float('nan')):10.2f}" for c in spread)
+        print(f"{r['talents'].ljust(w1)} | {r['schedule'].ljust(w2)} | {r['average_dps']:11.4f} | {extra}")
@@ -0,0 +1,177 @@
+# sim/tools/shm_results.py
+"""
+Shared-memory result transport for the parallel harness.
+
+The parent registers every metric a replicate can report (MetricLayout: dps, totals,
+then damage and casts per ability / DoT name of the character pack) and allocates one
+float64 block of replicates x metrics in multiprocessing.shared_memory (ResultBlock).
+Workers run their chunk and write each replicate's row straight into the block;
+the future only carries None, or the rare metric the layout missed and profiles.
+The parent then reduces whole columns at once: numpy when it is installed, plain
+memoryviews otherwise (numpy stays optional, like sim/tools/timeline.py).
+
+    layout = MetricLayout.for_pack("Content", "Ardeos")
+    block = ResultBlock(n_replicates, layout)
+    executor.submit(run_replicates_shm, content_dir, cfgs, block.name, first_row, layout.columns)
+    ...
+    block.column("dps"), block.means(), block.ndarray(), block.close()
+"""
+from __future__ import annotations
+from array import array
+from multiprocessing import shared_memory
+from typing import Dict, Iterable, List, Optional, Tuple
+import contextlib
+import glob
+import math
+import os
+import sys
+
+from sim.runners.target_dummy import run_sim, SimConfig
+
+SCALARS = ("dps", "total_damage", "ember_generated", "ember_spent", "ember_end", "apl_evaluations", "engine_events")
+# damage tags that come from code rather than content (sim/runtime/char_listeners.py)
+CODE_TAGS = ("Swallow",)
+
+def _names(node, out: set):
+    # every `name:` / `*_name:` string in a YAML document (ability names, DoT and buff names)
+    if isinstance(node, dict):
+        for k, v in node.items():
+            if isinstance(v, str) and (k == "name" or str(k).endswith("_name")):
+                out.add(v)
+            else:
+                _names(v, out)
+    elif isinstance(node, list):
+        for v in node:
+            _names(v, out)
+
+class MetricLayout:
+    """Column names of a ResultBlock: SCALARS, then 'damage:<tag>' and 'casts:<ability name>'."""
+    def __init__(self, tags: Iterable[str]):
+        tags = sorted(set(tags))
+        self.columns: List[str] = list(SCALARS) + [f"damage:{t}" for t in tags] + [f"casts:{t}" for t in tags]
+        self.index: Dict[str, int] = {c: i for i, c in enumerate(self.columns)}
+
+    @classmethod
+    def from_columns(cls, columns: List[str]) -> "MetricLayout":
+        layout = cls.__new__(cls)
+        layout.columns = list(columns)
+        layout.index = {c: i for i, c in enumerate(layout.columns)}
+        return layout
+
+    @classmethod
+    def for_pack(cls, content_dir: str, character: str) -> "MetricLayout":
+        """Every name the character's abilities and talents can damage or cast with."""
+        from sim.runtime.pack import load_character_spec, _load_yaml
+        pack = load_character_spec(content_dir, character)
+        tags = set(CODE_TAGS)
+        for d in ("abilities", "talents"):
+            for path in glob.glob(os.path.join(pack.paths[d], "*.yaml")):
+                _names(_load_yaml(path), tags)
+        return cls(tags)
+
+    def __len__(self): return len(self.columns)
+
+    def encode(self, result: dict) -> Tuple[List[float], Optional[Dict[str, float]]]:
+        """One replicate's run_sim result -> (row, metrics the layout has no column for)."""
+        row = [0.0] * len(self.columns)
+        extra = None
+        index = self.index
+        for i, key in enumerate(SCALARS):
+            row[i] = float(result.get(key, 0.0))
+        for prefix, values in (("damage:", {k: v[0] for k, v in result["by_ability"].items()}),
+                               ("casts:", result["casts"])):
+            for name, v in values.items():
+                col = index.get(prefix + name)
+                if col is None:
+                    if extra is None: extra = {}
+                    extra[prefix + name] = float(v)
+                else:
+                    row[col] = float(v)
+        return row, extra
+
+class ResultBlock:
+    """n_rows x len(layout) float64 block in shared memory, owned (and unlinked) by the parent."""
+    def __init__(self, n_rows: int, layout: MetricLayout):
+        self.n_rows = int(n_rows)
+        self.layout = layout
+        self.shm = shared_memory.SharedMemory(create=True, size=max(8, self.n_rows * len(layout) * 8))
+        self.cells = self.shm.buf.cast("d")
+        self.cells[:self.n_rows * len(layout)] = array("d", bytes(8 * self.n_rows * len(layout)))
+        self.extra: Dict[int, Dict[str, float]] = {}      # row -> metrics without a column
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def ndarray(self):
+        """numpy (rows, metrics) view of the block, or None without numpy."""
+        try:
+            import numpy as np
+        except ImportError:
+            return None
+        return np.ndarray((self.n_rows, len(self.layout)), dtype=np.float64, buffer=self.shm.buf)
+
+    def column(self, name: str, start: int = 0, stop: Optional[int] = None) -> List[float]:
+        stop = self.n_rows if stop is None else stop
+        j, w = self.layout.index[name], len(self.layout)
+        return self.cells[start * w + j:stop * w:w].tolist()
+
+    def means(self, start: int = 0, stop: Optional[int] = None) -> Dict[str, float]:
+        """Mean of every metric over rows [start, stop), leaving out all-zero columns."""
+        stop = self.n_rows if stop is None else stop
+        n = stop - start
+        if n <= 0:
+            return {}
+        arr = self.ndarray()
+        if arr is not None:
+            sums = arr[start:stop].sum(axis=0).tolist()
+        else:
+            w = len(self.layout)
+            sums = [math.fsum(self.cells[start * w + j:stop * w:w]) for j in range(w)]
+        out = {c: s / n for c, s in zip(self.layout.columns, sums) if s}
+        for row, extra in self.extra.items():
+            if start <= row < stop:
+                for c, v in extra.items():
+                    out[c] = out.get(c, 0.0) + v / n
+        return out
+
+    def close(self) -> None:
+        if self.shm is None:
+            return
+        self.cells.release()
+        self.shm.close()
+        with contextlib.suppress(FileNotFoundError):
+            self.shm.unlink()
+        self.shm = None
+
+def run_replicates_shm(content_dir: str, cfgs: List[SimConfig], shm_name: str, first_row: int,
+                       columns: List[str]) -> Tuple[Optional[Dict[int, Dict[str, float]]], Optional[dict]]:
+    """
+    Worker entry point: run a chunk of replicates and write row first_row + j of the
+    block for cfgs[j]. Returns (metrics the layout missed by row, merged profile), both
+    usually None, so nothing per replicate is pickled.
+    """
+    layout = MetricLayout.from_columns(columns)
+    w = len(columns)
+    # pool workers share the parent's resource tracker, so attaching doesn't make them owners
+    shm = shared_memory.SharedMemory(name=shm_name)
+    cells = shm.buf.cast("d")
+    extra, prof = None, None
+    try:
+        with contextlib.redirect_stdout(sys.stderr):
+            for j, cfg in enumerate(cfgs):
+                result = run_sim(content_dir, cfg)
+                row, missed = layout.encode(result)
+                r = first_row + j
+                cells[r * w:(r + 1) * w] = array("d", row)
+                if missed:
+                    if extra is None: extra = {}
+                    extra[r] = missed
+                if "profile" in result:
+                    from sim.tools.profiler import Profiler
+                    part = Profiler.from_dict(result["profile"])
+                    prof = part if prof is None else prof.merge(part)
+    finally:
+        cells.release()
+        shm.close()
+    return extra, (prof.to_dict() if prof is not None else None)
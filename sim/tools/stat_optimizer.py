@@ -0,0 +1,224 @@
+# sim/tools/stat_optimizer.py
+"""
+Stat allocation optimizer: spend a budget of stat points over power, haste,
+base_crit and base_spirit_gain to maximise DPS for one build.
+
+    python -m sim.tools.stat_optimizer --character Ardeos --talents 1C,2C,3B,4B,6A,6C \
+        --budget 100 --rates power=0.01,haste=0.004,base_crit=0.004,base_spirit_gain=0.004 --workers 8
+
+Stats are base + rate * points. The search is a noisy coordinate search on the
+budget simplex: each round tries moving `step` points from every stat to every
+other one, all moves simmed in parallel with the same replicate seeds as the
+current point (paired), and takes the best move whose mean paired improvement
+beats z standard errors. With no such move the replicate count doubles (up to
+--max-runs); at --max-runs the step halves; below --min-step the search stops,
+because what is left is below noise.
+
+Every evaluated point keeps its per-replicate DPS, indexed by replicate seed, so
+revisiting a point or growing its replicate count only sims the missing seeds.
+"""
+from __future__ import annotations
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+import argparse
+import math
+import os
+import statistics
+import sys
+
+from sim.tools.harness import Attrs, BatchRequest, submit_batch, _seed_for
+
+STATS = ("power", "haste", "base_crit", "base_spirit_gain")
+Alloc = Tuple[int, ...]         # points per stat, in STATS order
+
+@dataclass
+class StatProblem:
+    character: str
+    talents: Dict[str, bool]
+    budget: int                                  # stat points to spend
+    rates: Dict[str, float]                      # stat -> gain per point
+    base: Dict[str, float] = field(default_factory=lambda: {"power": 1.0, "haste": 1.0, "base_crit": 0.05, "base_spirit_gain": 1.0})
+    schedules: List[List[Tuple[float, int]]] = field(default_factory=lambda: [[(0, 1)]])
+    weights: Optional[List[float]] = None        # per schedule, default equal
+    content_dir: str = "Content"
+    duration_s: float = 300.0
+    movement: float = 0.15
+    base_seed: int = 1337
+
+    def stats(self, alloc: Alloc) -> Dict[str, float]:
+        return {s: self.base.get(s, 0.0) + self.rates.get(s, 0.0) * p for s, p in zip(STATS, alloc)}
+
+    def attrs(self, alloc: Alloc) -> Attrs:
+        return Attrs(name=self.character, **self.stats(alloc))
+
+class Evaluator:
+    """
+    Per-replicate objective values per allocation, filled on demand. Replicate i
+    uses the same seed at every point (common random numbers), so differences
+    between points are paired.
+    """
+    def __init__(self, problem: StatProblem, executor: Executor, chunk_size: int = 8):
+        self.p = problem
+        self.executor = executor
+        self.chunk_size = chunk_size
+        w = problem.weights or [1.0] * len(problem.schedules)
+        self.w = [x / sum(w) for x in w]
+        self.cache: Dict[Alloc, List[float]] = {}
+        self.sims = 0          # replicates run (per schedule)
+        self.reused = 0        # replicates answered from the cache
+
+    def seed(self, i: int) -> int:
+        return _seed_for(self.p.base_seed, self.p.talents, [], i)
+
+    def values(self, allocs: List[Alloc], n: int) -> List[List[float]]:
+        """First n per-replicate objective values of each allocation."""
+        handles = []
+        for a in dict.fromkeys(allocs):
+            have = self.cache.setdefault(a, [])
+            self.reused += min(n, len(have))
+            if len(have) >= n:
+                continue
+            req = BatchRequest(
+                content_dir=self.p.content_dir, attrs=self.p.attrs(a), talent_sets=[self.p.talents],
+                schedules=self.p.schedules, duration_s=self.p.duration_s, movement=self.p.movement,
+                seeds=[self.seed(i) for i in range(len(have), n)],
+            )
+            handles.append((a, submit_batch(req, self.executor, self.chunk_size)))
+            self.sims += n - len(have)
+        for a, h in handles:
+            per_schedule = h.replicate_dps()
+            self.cache[a].extend(sum(w * d[i] for w, d in zip(self.w, per_schedule))
+                                 for i in range(len(per_schedule[0])))
+        return [self.cache[a][:n] for a in allocs]
+
+def _moves(alloc: Alloc, step: int) -> List[Alloc]:
+    out = []
+    for i in range(len(alloc)):
+        if alloc[i] < step:
+            continue
+        for j in range(len(alloc)):
+            if i != j:
+                m = list(alloc)
+                m[i] -= step
+                m[j] += step
+                out.append(tuple(m))
+    return out
+
+def _start(budget: int, step: int, n_stats: int) -> Alloc:
+    # equal split in multiples of step, remainder to the first stats
+    units, rest = divmod(budget, step)
+    alloc = [(units // n_stats) * step] * n_stats
+    for k in range(units % n_stats):
+        alloc[k] += step
+    alloc[0] += rest
+    return tuple(alloc)
+
+def optimize(problem: StatProblem, *, start: Optional[Alloc] = None, step: Optional[int] = None, min_step: int = 1,
+             runs: int = 16, max_runs: int = 256, z: float = 2.0, max_rounds: int = 200,
+             workers: int = 0, executor: Optional[Executor] = None, log=None) -> dict:
+    log = log or (lambda s: print(s, file=sys.stderr))
+    step = step or max(1, problem.budget // 8)
+    cur = tuple(start) if start is not None else _start(problem.budget, step, len(STATS))
+    if sum(cur) != problem.budget or min(cur) < 0:
+        raise ValueError(f"start {cur} does not spend the budget {problem.budget}")
+    own = None
+    if executor is None:
+        executor = own = ProcessPoolExecutor(max_workers=workers) if workers > 0 else ThreadPoolExecutor(max_workers=1)
+    history = []
+    try:
+        ev = Evaluator(problem, executor)
+        n, rounds = runs, 0
+        while rounds < max_rounds:
+            rounds += 1
+            moves = _moves(cur, step)
+            vals = ev.values([cur] + moves, n)
+            base = vals[0]
+            best, best_gain, best_se = None, 0.0, 0.0
+            for m, v in zip(moves, vals[1:]):
+                diff = [a - b for a, b in zip(v, base)]
+                gain = statistics.fmean(diff)
+                se = statistics.stdev(diff) / math.sqrt(n) if n > 1 else math.inf
+                if gain > z * se and gain > best_gain:
+                    best, best_gain, best_se = m, gain, se
+            history.append({"alloc": cur, "dps": statistics.fmean(base), "n": n, "step": step})
+            if best is not None:
+                log(f"round {rounds}: {cur} -> {best}  +{best_gain:.2f} dps (se {best_se:.2f}, n={n}, step={step})")
+                cur = best
+            elif n < max_runs:
+                n = min(max_runs, n * 2)
+                log(f"round {rounds}: no move beats noise at step {step}, replicates -> {n}")
+            elif step > min_step:
+                step = max(min_step, step // 2)
+                log(f"round {rounds}: no move beats noise at {n} replicates, step -> {step}")
+            else:
+                log(f"round {rounds}: converged at {cur}")
+                break
+        final = ev.values([cur], n)[0]
+        mean = statistics.fmean(final)
+        se = statistics.stdev(final) / math.sqrt(len(final)) if len(final) > 1 else 0.0
+        return {
+            "alloc": dict(zip(STATS, cur)),
+            "stats": problem.stats(cur),
+            "dps": round(mean, 4),
+            "ci95": (round(mean - 1.96 * se, 4), round(mean + 1.96 * se, 4)),
+            "replicates": n,
+            "rounds": rounds,
+            "points_evaluated": len(ev.cache),
+            "sims": ev.sims,
+            "cached": ev.reused,
+            "history": history,
+        }
+    finally:
+        if own is not None:
+            own.shutdown()
+
+def _kv(text: str) -> Dict[str, float]:
+    out = {}
+    for part in text.split(","):
+        if part.strip():
+            k, _, v = part.partition("=")
+            k = k.strip()
+            if k not in STATS:
+                raise argparse.ArgumentTypeError(f"unknown stat {k!r} (expected one of {', '.join(STATS)})")
+            out[k] = float(v)
+    return out
+
+def main(argv=None) -> int:
+    from sim.__main__ import parse_encounter, parse_talents
+    ap = argparse.ArgumentParser(prog="python -m sim.tools.stat_optimizer", description=__doc__.splitlines()[1])
+    ap.add_argument("--content", default="Content")
+    ap.add_argument("--character", default="Ardeos")
+    ap.add_argument("--talents", type=parse_talents, default={}, help="comma-separated talent ids")
+    ap.add_argument("--budget", type=int, required=True, help="stat points to spend")
+    ap.add_argument("--rates", type=_kv, required=True, help="gain per point, e.g. power=0.01,haste=0.004")
+    ap.add_argument("--base", type=_kv, default={}, help="stats before allocation (default power=1,haste=1,base_crit=0.05,base_spirit_gain=1)")
+    ap.add_argument("--start", default=None, help="starting points per stat, e.g. 25,25,25,25")
+    ap.add_argument("--schedule", action="append", type=parse_encounter, help="t_s:count,... (repeatable; default 0:1)")
+    ap.add_argument("--duration", type=float, default=300.0)
+    ap.add_argument("--movement", type=float, default=0.15)
+    ap.add_argument("--step", type=int, default=None, help="points moved per try (default budget/8)")
+    ap.add_argument("--min-step", type=int, default=1)
+    ap.add_argument("--runs", type=int, default=16, help="starting replicates per point")
+    ap.add_argument("--max-runs", type=int, default=256)
+    ap.add_argument("--z", type=float, default=2.0, help="standard errors a paired improvement must clear")
+    ap.add_argument("-w", "--workers", type=int, default=os.cpu_count() or 1)
+    args = ap.parse_args(argv)
+
+    problem = StatProblem(
+        character=args.character, talents=args.talents, budget=args.budget, rates=args.rates,
+        schedules=args.schedule or [[(0.0, 1)]], content_dir=args.content,
+        duration_s=args.duration, movement=args.movement,
+    )
+    problem.base.update(args.base)
+    start = tuple(int(x) for x in args.start.split(",")) if args.start else None
+    r = optimize(problem, start=start, step=args.step, min_step=args.min_step, runs=args.runs,
+                 max_runs=args.max_runs, z=args.z, workers=args.workers)
+    print("allocation:", r["alloc"])
+    print("stats:     ", {k: round(v, 4) for k, v in r["stats"].items()})
+    print(f"dps:        {r['dps']:.2f}  [{r['ci95'][0]:.2f}, {r['ci95'][1]:.2f}]  ({r['replicates']} replicates)")
+    print(f"{r['rounds']} rounds, {r['points_evaluated']} points, {r['sims']} sims run, {r['cached']} from cache")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,215 @@
+# sim/tools/stats.py
+"""
+Streaming, mergeable summaries of per-replicate DPS.
+
+DpsSummary = running moments (count/sum/M2/min/max) + a KLL quantile sketch
++ a sparse histogram. None of them keep every value, and all of them merge, so
+partial summaries from pool workers or from separate shards (e.g. two batch runs
+over different seeds) combine into one.
+
+The histogram's bins follow the data's scale by default: each value lands in a bin
+two significant digits wide (56,340 -> [56,000, 57,000), 512.3 -> [510, 520)), so a
+~56k DPS cell and a ~500 DPS cell both get a few dozen bins. A fixed bin_width is
+still available.
+
+Merging is deterministic (the KLL compactors alternate their offset instead of
+flipping a random coin), so the same chunks merged in the same order always
+give the same report.
+"""
+from __future__ import annotations
+from typing import Dict, List, Optional
+import math
+
+class KLLSketch:
+    """KLL quantile sketch. Exact while fewer than ~k values have been added."""
+    def __init__(self, k: int = 200):
+        self.k = int(k)
+        self.n = 0
+        self.levels: List[List[float]] = [[]]
+        self._odd = False
+
+    def _capacity(self, h: int) -> int:
+        depth = len(self.levels) - h - 1
+        return max(2, int(math.ceil(self.k * (2.0 / 3.0) ** depth)))
+
+    def _compress(self):
+        h = 0
+        while h < len(self.levels):
+            if len(self.levels[h]) >= self._capacity(h):
+                if h + 1 == len(self.levels):
+                    self.levels.append([])
+                items = sorted(self.levels[h])
+                keep = [items.pop()] if len(items) % 2 else []
+                self._odd = not self._odd
+                self.levels[h + 1].extend(items[1 if self._odd else 0::2])
+                self.levels[h] = keep
+            h += 1
+
+    def add(self, x: float):
+        self.levels[0].append(float(x))
+        self.n += 1
+        if len(self.levels[0]) >= self._capacity(0):
+            self._compress()
+
+    def merge(self, other: "KLLSketch"):
+        while len(self.levels) < len(other.levels):
+            self.levels.append([])
+        for h, items in enumerate(other.levels):
+            self.levels[h].extend(items)
+        self.n += other.n
+        self._compress()
+
+    def quantile(self, q: float) -> float:
+        weighted = sorted((x, 1 << h) for h, items in enumerate(self.levels) for x in items)
+        if not weighted:
+            return math.nan
+        total = sum(w for _, w in weighted)
+        rank = max(1.0, q * total)
+        acc = 0
+        for x, w in weighted:
+            acc += w
+            if acc >= rank:
+                return x
+        return weighted[-1][0]
+
+    def to_dict(self) -> dict:
+        return {"k": self.k, "n": self.n, "levels": [list(l) for l in self.levels]}
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "KLLSketch":
+        s = cls(d["k"])
+        s.n = int(d["n"])
+        s.levels = [list(map(float, l)) for l in d["levels"]] or [[]]
+        return s
+
+class Histogram:
+    """
+    Sparse histogram. bin_width=None (default): scale-relative bins of `digits`
+    significant digits, stored as {(mantissa, exponent): count} for the bin
+    [m * 10**e, (m + 1) * 10**e); values <= 0 share the bin (0, 0). With a
+    bin_width: fixed bins [i*w, (i+1)*w), stored as {i: count}.
+    """
+    def __init__(self, bin_width: Optional[float] = None, digits: int = 2):
+        self.bin_width = float(bin_width) if bin_width else None
+        self.digits = int(digits)
+        self.counts: Dict = {}
+
+    def _key(self, x: float):
+        if self.bin_width is not None:
+            return int(math.floor(x / self.bin_width))
+        if not x > 0 or math.isinf(x):
+            return (0, 0)
+        e = math.floor(math.log10(x)) - (self.digits - 1)
+        m = int(math.floor(x / 10.0 ** e))
+        if m >= 10 ** self.digits:      # log10 rounding just under a power of ten
+            m, e = m // 10, e + 1
+        return (m, e)
+
+    def add(self, x: float):
+        key = self._key(x)
+        self.counts[key] = self.counts.get(key, 0) + 1
+
+    def merge(self, other: "Histogram"):
+        if (other.bin_width, other.digits) != (self.bin_width, self.digits):
+            raise ValueError(f"cannot merge histograms with bins {self._bins()} and {other._bins()}")
+        for i, c in other.counts.items():
+            self.counts[i] = self.counts.get(i, 0) + c
+
+    def _bins(self) -> str:
+        return f"width {self.bin_width:g}" if self.bin_width is not None else f"{self.digits} significant digits"
+
+    def to_dict(self) -> dict:
+        # keyed by bin lower edge, ascending; scale-relative bins as "<mantissa>e<exponent>"
+        if self.bin_width is not None:
+            counts = {repr(i * self.bin_width): self.counts[i] for i in sorted(self.counts)}
+        else:
+            counts = {f"{m}e{e}": c for (m, e), c in
+                      sorted(self.counts.items(), key=lambda kv: kv[0][0] * 10.0 ** kv[0][1])}
+        return {"bin_width": self.bin_width, "digits": self.digits, "counts": counts}
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "Histogram":
+        h = cls(d.get("bin_width"), d.get("digits", 2))
+        if h.bin_width is not None:
+            h.counts = {int(round(float(lo) / h.bin_width)): int(c) for lo, c in d["counts"].items()}
+        else:
+            h.counts = {(int(k.split("e")[0]), int(k.split("e")[1])): int(c) for k, c in d["counts"].items()}
+        return h
+
+class DpsSummary:
+    """Moments + quantiles + histogram for one (talents, schedule) cell."""
+    def __init__(self, bin_width: Optional[float] = None, k: int = 200):
+        self.n = 0
+        self.total = 0.0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.sketch = KLLSketch(k)
+        self.hist = Histogram(bin_width)
+
+    def add(self, x: float):
+        x = float(x)
+        self.n += 1
+        self.total += x
+        d = x - self.mean
+        self.mean += d / self.n
+        self.m2 += d * (x - self.mean)
+        self.min = min(self.min, x)
+        self.max = max(self.max, x)
+        self.sketch.add(x)
+        self.hist.add(x)
+
+    def merge(self, other: "DpsSummary") -> "DpsSummary":
+        if other.n == 0:
+            return self
+        n = self.n + other.n
+        d = other.mean - self.mean
+        self.m2 += other.m2 + d * d * self.n * other.n / n
+        self.mean += d * other.n / n
+        self.n = n
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.sketch.merge(other.sketch)
+        self.hist.merge(other.hist)
+        return self
+
+    @property
+    def stdev(self) -> float:
+        return math.sqrt(self.m2 / (self.n - 1)) if self.n > 1 else 0.0
+
+    def quantile(self, q: float) -> float:
+        return self.sketch.quantile(q)
+
+    def report(self, digits: int = 4) -> dict:
+        """Flat stats for a result row (average is total/n, matching the serial sum)."""
+        if self.n == 0:
+            return {"n": 0}
+        r = lambda v: round(v, digits)
+        return {
+            "n": self.n,
+            "average_dps": r(self.total / self.n),
+            "stdev": r(self.stdev),
+            "min": r(self.min),
+            "p5": r(self.quantile(0.05)),
+            "p50": r(self.quantile(0.50)),
+            "p95": r(self.quantile(0.95)),
+            "max": r(self.max),
+        }
+
+    def to_dict(self) -> dict:
+        # min/max are None while empty: +-inf is not valid JSON
+        return {"n": self.n, "total": self.total, "mean": self.mean, "m2": self.m2,
+                "min": self.min if self.n else None, "max": self.max if self.n else None,
+                "sketch": self.sketch.to_dict(), "hist": self.hist.to_dict()}
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "DpsSummary":
+        s = cls()
+        s.n, s.total, s.mean, s.m2 = int(d["n"]), float(d["total"]), float(d["mean"]), float(d["m2"])
+        s.min = float(d["min"]) if d["min"] is not None else math.inf
+        s.max = float(d["max"]) if d["max"] is not None else -math.inf
+        s.sketch = KLLSketch.from_dict(d["sketch"])
+        s.hist = Histogram.from_dict(d["hist"])
+        return s
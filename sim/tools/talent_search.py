@@ -0,0 +1,379 @@
+# sim/tools/talent_search.py
+"""
+Surrogate-assisted talent search: find the best builds for a point budget without
+simming every legal combination.
+
+    python -m sim.tools.talent_search --character Ardeos --budget 13 --schedule 0:1 --schedule 0:3 --workers 8
+
+Legal builds spend exactly --budget talent points (the YAML `points`), or between
+--min-points and --budget; "5A-2"-style ranks need the rank below them. Each round:
+
+  1. sim a batch of builds with run_batch (run_count replicates per schedule),
+  2. fit one ridge-regression surrogate per schedule on every build simmed so far,
+     with a term per talent and per talent pair (Bayesian linear model, so it also
+     gives a predictive standard deviation),
+  3. score the unsimmed builds by the schedule-weighted objective and pick the next
+     batch by upper confidence bound (mean + kappa * sd): promising or uncertain.
+
+The search stops when no unsimmed build's optimistic bound beats the best simmed
+build's lower bound, or after --rounds. The top-k simmed builds are then re-simmed
+with fresh seeds and --final-runs replicates, and reported with 95% intervals and
+the number of replicates saved versus exhaustive search at run_count.
+
+The linear algebra is plain Python (the design is sparse: a build with k talents
+has k + k(k-1)/2 active terms), so numpy is not needed.
+"""
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+import argparse
+import contextlib
+import glob
+import math
+import os
+import random
+import sys
+
+from sim.tools.harness import Attrs, BatchRequest, run_batch
+
+Build = Tuple[str, ...]     # sorted talent ids
+
+@dataclass
+class SearchConfig:
+    attrs: Attrs
+    schedules: List[List[Tuple[float, int]]]
+    content_dir: str = "Content"
+    weights: Optional[List[float]] = None   # per schedule, default equal
+    budget: int = 13
+    min_points: Optional[int] = None        # default: budget (only full builds)
+    require: List[str] = field(default_factory=list)
+    forbid: List[str] = field(default_factory=list)
+    run_count: int = 25                     # replicates per build and schedule while searching
+    duration_s: float = 300.0
+    movement: float = 0.15
+    base_seed: int = 1337
+    n_init: int = 40                        # random builds in the first round
+    batch: int = 16                         # builds per later round
+    rounds: int = 12
+    kappa: float = 2.0                      # UCB width, in predictive sds
+    pool: int = 2000                        # unsimmed builds scored with an sd per round (best by mean, plus random)
+    ridge: float = 1.0
+    top_k: int = 10
+    final_runs: int = 100
+    seed: int = 0                           # search RNG (initial design, pool sampling)
+
+# ---------- legal builds ----------
+def talent_points(content_dir: str, character: str) -> Dict[str, int]:
+    """talent id -> points, from the pack's talent YAML."""
+    from sim.runtime.pack import load_character_spec, _load_yaml
+    pack = load_character_spec(content_dir, character)
+    out = {}
+    for path in sorted(glob.glob(os.path.join(pack.paths["talents"], "*.yaml"))):
+        d = _load_yaml(path)
+        out[str(d["id"])] = int(d.get("points", 1))
+    return out
+
+def _rank_parent(tid: str) -> Optional[str]:
+    # "5A-2" needs "5A-1"
+    base, _, rank = tid.rpartition("-")
+    if base and rank.isdigit() and int(rank) > 1:
+        return f"{base}-{int(rank) - 1}"
+    return None
+
+def legal_builds(points: Dict[str, int], budget: int, min_points: Optional[int] = None,
+                 require: Sequence[str] = (), forbid: Sequence[str] = ()) -> List[Build]:
+    """Every talent subset with min_points <= points <= budget, honouring ranks, require and forbid."""
+    lo = budget if min_points is None else min_points
+    ids = sorted(t for t in points if t not in set(forbid))
+    required = set(require)
+    out: List[Build] = []
+
+    def walk(i: int, chosen: List[str], spent: int):
+        if i == len(ids):
+            if spent >= lo and required.issubset(chosen):
+                out.append(tuple(chosen))
+            return
+        tid = ids[i]
+        if tid not in required:
+            walk(i + 1, chosen, spent)
+        cost = points[tid]
+        parent = _rank_parent(tid)
+        if spent + cost <= budget and (parent is None or parent in chosen):
+            chosen.append(tid)
+            walk(i + 1, chosen, spent + cost)
+            chosen.pop()
+
+    walk(0, [], 0)
+    return out
+
+# ---------- surrogate ----------
+def _cholesky(a: List[List[float]]) -> List[List[float]]:
+    n = len(a)
+    L = [[0.0] * n for _ in range(n)]
+    for i in range(n):
+        Li = L[i]
+        for j in range(i + 1):
+            Lj = L[j]
+            s = a[i][j] - math.fsum(Li[k] * Lj[k] for k in range(j))
+            if i == j:
+                Li[i] = math.sqrt(max(s, 1e-12))
+            else:
+                Li[j] = s / Lj[j]
+    return L
+
+def _chol_inverse(L: List[List[float]]) -> List[List[float]]:
+    """(L L^T)^-1 from its Cholesky factor."""
+    n = len(L)
+    # inverse of the lower-triangular factor, column by column
+    Linv = [[0.0] * n for _ in range(n)]
+    for c in range(n):
+        Linv[c][c] = 1.0 / L[c][c]
+        for i in range(c + 1, n):
+            Li = L[i]
+            Linv[i][c] = -math.fsum(Li[k] * Linv[k][c] for k in range(c, i)) / Li[i]
+    # A^-1 = Linv^T Linv
+    inv = [[0.0] * n for _ in range(n)]
+    for i in range(n):
+        for j in range(i + 1):
+            v = math.fsum(Linv[k][i] * Linv[k][j] for k in range(max(i, j), n))
+            inv[i][j] = inv[j][i] = v
+    return inv
+
+class Surrogate:
+    """
+    y ~ intercept + sum(main[t]) + sum(pair[t, u]) over a build's talents, ridge
+    penalised (intercept free: y is centred). One design, several targets (schedules).
+    """
+    def __init__(self, talents: Sequence[str], ridge: float = 1.0):
+        self.talents = sorted(talents)
+        tid = {t: i for i, t in enumerate(self.talents)}
+        self.feature: Dict[Tuple[int, ...], int] = {(i,): i for i in tid.values()}
+        n = len(self.talents)
+        for i in range(n):
+            for j in range(i + 1, n):
+                self.feature[(i, j)] = len(self.feature)
+        self.tid = tid
+        self.ridge = ridge
+        self.coef: List[List[float]] = []
+        self.mean: List[float] = []
+        self.noise: List[float] = []
+        self.inv: List[List[float]] = []
+
+    def active(self, build: Build) -> List[int]:
+        ids = sorted(self.tid[t] for t in build if t in self.tid)
+        out = [self.feature[(i,)] for i in ids]
+        for a in range(len(ids)):
+            for b in range(a + 1, len(ids)):
+                out.append(self.feature[(ids[a], ids[b])])
+        return out
+
+    def fit(self, builds: List[Build], ys: List[List[float]]) -> "Surrogate":
+        """ys[s][n]: observed mean DPS of builds[n] on schedule s."""
+        p = len(self.feature)
+        A = [[0.0] * p for _ in range(p)]
+        for i in range(p):
+            A[i][i] = self.ridge
+        rows = [self.active(b) for b in builds]
+        for act in rows:
+            for i in act:
+                Ai = A[i]
+                for j in act:
+                    Ai[j] += 1.0
+        self.inv = _chol_inverse(_cholesky(A))
+        self.coef, self.mean, self.noise = [], [], []
+        for y in ys:
+            mu = sum(y) / len(y)
+            xty = [0.0] * p
+            for act, v in zip(rows, y):
+                for i in act:
+                    xty[i] += v - mu
+            coef = [math.fsum(self.inv[i][j] * xty[j] for j in range(p) if xty[j]) for i in range(p)]
+            resid = [v - mu - sum(coef[i] for i in act) for act, v in zip(rows, y)]
+            self.coef.append(coef)
+            self.mean.append(mu)
+            self.noise.append(max(1e-9, sum(r * r for r in resid) / max(1, len(y))))
+        return self
+
+    def predict(self, build: Build) -> Tuple[List[float], List[float]]:
+        """Per schedule (mean, predictive sd)."""
+        act = self.active(build)
+        quad = sum(self.inv[i][j] for i in act for j in act)
+        means = [mu + sum(coef[i] for i in act) for mu, coef in zip(self.mean, self.coef)]
+        sds = [math.sqrt(noise * (1.0 + quad)) for noise in self.noise]
+        return means, sds
+
+    def predict_mean(self, build: Build) -> List[float]:
+        act = self.active(build)
+        return [mu + sum(coef[i] for i in act) for mu, coef in zip(self.mean, self.coef)]
+
+# ---------- sims ----------
+@dataclass
+class Observed:
+    means: List[float]          # per schedule
+    sds: List[float]
+    n: int
+
+def _weights(cfg: SearchConfig) -> List[float]:
+    w = cfg.weights or [1.0] * len(cfg.schedules)
+    total = sum(w)
+    return [x / total for x in w]
+
+def objective(w: List[float], means: List[float]) -> float:
+    return sum(a * b for a, b in zip(w, means))
+
+def objective_se(w: List[float], obs: Observed) -> float:
+    return math.sqrt(sum((a * sd) ** 2 for a, sd in zip(w, obs.sds)) / max(1, obs.n))
+
+def sim_builds(cfg: SearchConfig, builds: List[Build], run_count: int, base_seed: int,
+               workers: int = 0, executor=None) -> List[Observed]:
+    req = BatchRequest(
+        content_dir=cfg.content_dir, attrs=cfg.attrs,
+        talent_sets=[{t: True for t in b} for b in builds], schedules=cfg.schedules,
+        run_count=run_count, duration_s=cfg.duration_s, base_seed=base_seed, movement=cfg.movement,
+    )
+    with contextlib.redirect_stdout(sys.stderr):
+        rows = run_batch(req, workers=workers, executor=executor)
+    S = len(cfg.schedules)
+    out = []
+    for k in range(len(builds)):
+        cell = rows[k * S:(k + 1) * S]      # run_batch rows: talents outer, schedules inner
+        out.append(Observed([r["average_dps"] for r in cell], [r["stdev"] for r in cell], run_count))
+    return out
+
+# ---------- search ----------
+def search(cfg: SearchConfig, workers: int = 0, executor=None, log=None) -> dict:
+    log = log or (lambda s: print(s, file=sys.stderr))
+    rnd = random.Random(cfg.seed)
+    w = _weights(cfg)
+    S = len(cfg.schedules)
+    points = talent_points(cfg.content_dir, cfg.attrs.name)
+    legal = legal_builds(points, cfg.budget, cfg.min_points, cfg.require, cfg.forbid)
+    if not legal:
+        raise ValueError(f"no legal builds for budget {cfg.budget} (min {cfg.min_points})")
+    talents = sorted({t for b in legal for t in b})
+    model = Surrogate(talents, cfg.ridge)
+    seen: Dict[Build, Observed] = {}
+    replicates = 0
+
+    def run(builds: List[Build]):
+        nonlocal replicates
+        for b, obs in zip(builds, sim_builds(cfg, builds, cfg.run_count, cfg.base_seed, workers, executor)):
+            seen[b] = obs
+        replicates += len(builds) * S * cfg.run_count
+
+    batch = rnd.sample(legal, min(cfg.n_init, len(legal)))
+    rounds = 0
+    while batch:
+        run(batch)
+        rounds += 1
+        simmed = list(seen)
+        model.fit(simmed, [[seen[b].means[s] for b in simmed] for s in range(S)])
+        best = max(simmed, key=lambda b: objective(w, seen[b].means))
+        best_lo = objective(w, seen[best].means) - 1.96 * objective_se(w, seen[best])
+
+        rest = [b for b in legal if b not in seen]
+        if not rest or rounds >= cfg.rounds:
+            break
+        # every unsimmed build gets a mean; the best by mean plus a random sample get an sd
+        by_mean = sorted(rest, key=lambda b: objective(w, model.predict_mean(b)), reverse=True)
+        pool = by_mean[:cfg.pool // 2]
+        tail = by_mean[cfg.pool // 2:]
+        pool += rnd.sample(tail, min(len(tail), cfg.pool - len(pool)))
+        scored = []
+        for b in pool:
+            means, sds = model.predict(b)
+            mu = objective(w, means)
+            sd = math.sqrt(sum((a * x) ** 2 for a, x in zip(w, sds)))
+            scored.append((mu + cfg.kappa * sd, mu, b))
+        scored.sort(reverse=True)
+        log(f"round {rounds}: {len(seen)} builds simmed, best {objective(w, seen[best].means):.1f}"
+            f" ({'+'.join(best) or '(none)'}), top UCB {scored[0][0]:.1f}, best lower bound {best_lo:.1f}")
+        if scored[0][0] < best_lo:
+            break
+        batch = [b for _, _, b in scored[:cfg.batch]]
+
+    # re-sim the top-k with fresh seeds, so the reported numbers aren't the ones we selected on
+    top = sorted(seen, key=lambda b: objective(w, seen[b].means), reverse=True)[:cfg.top_k]
+    final = sim_builds(cfg, top, cfg.final_runs, cfg.base_seed + 1, workers, executor)
+    replicates_final = len(top) * S * cfg.final_runs
+    ranked = []
+    for b, obs in zip(top, final):
+        mu, se = objective(w, obs.means), objective_se(w, obs)
+        ranked.append({
+            "talents": "+".join(b) or "(none)",
+            "points": sum(points[t] for t in b),
+            "dps": round(mu, 4),
+            "ci95": (round(mu - 1.96 * se, 4), round(mu + 1.96 * se, 4)),
+            "by_schedule": [round(m, 4) for m in obs.means],
+            "search_dps": round(objective(w, seen[b].means), 4),
+            "predicted_dps": round(objective(w, model.predict_mean(b)), 4),
+        })
+    ranked.sort(key=lambda r: r["dps"], reverse=True)
+    exhaustive = len(legal) * S * cfg.run_count
+    return {
+        "legal_builds": len(legal),
+        "builds_simmed": len(seen),
+        "rounds": rounds,
+        "replicates_search": replicates,
+        "replicates_final": replicates_final,
+        "replicates_exhaustive": exhaustive,
+        "replicates_saved": exhaustive - replicates - replicates_final,
+        "top": ranked,
+    }
+
+def main(argv=None) -> int:
+    from sim.__main__ import parse_encounter
+    ap = argparse.ArgumentParser(prog="python -m sim.tools.talent_search", description=__doc__.splitlines()[1])
+    ap.add_argument("--content", default="Content")
+    ap.add_argument("--character", default="Ardeos")
+    ap.add_argument("--budget", type=int, default=13, help="talent points to spend")
+    ap.add_argument("--min-points", type=int, default=None, help="allow builds spending at least this many (default: budget)")
+    ap.add_argument("--require", default="", help="comma-separated talent ids every build must have")
+    ap.add_argument("--forbid", default="", help="comma-separated talent ids to leave out")
+    ap.add_argument("--schedule", action="append", type=parse_encounter, help="t_s:count,... (repeatable; default 0:1)")
+    ap.add_argument("--weights", default=None, help="comma-separated weight per --schedule")
+    ap.add_argument("--duration", type=float, default=300.0)
+    ap.add_argument("--power", type=float, default=1.0)
+    ap.add_argument("--haste", type=float, default=1.1)
+    ap.add_argument("--crit", type=float, default=0.4)
+    ap.add_argument("--spirit-gain", type=float, default=1.1)
+    ap.add_argument("--movement", type=float, default=0.15)
+    ap.add_argument("--run-count", type=int, default=25, help="replicates per build and schedule while searching")
+    ap.add_argument("--n-init", type=int, default=40)
+    ap.add_argument("--batch", type=int, default=16)
+    ap.add_argument("--rounds", type=int, default=12)
+    ap.add_argument("--kappa", type=float, default=2.0)
+    ap.add_argument("--top", type=int, default=10)
+    ap.add_argument("--final-runs", type=int, default=100)
+    ap.add_argument("--seed", type=int, default=0, help="search RNG seed")
+    ap.add_argument("-w", "--workers", type=int, default=os.cpu_count() or 1)
+    ap.add_argument("--json", action="store_true")
+    args = ap.parse_args(argv)
+
+    split = lambda s: [t.strip() for t in s.split(",") if t.strip()]
+    cfg = SearchConfig(
+        attrs=Attrs(name=args.character, power=args.power, haste=args.haste, base_crit=args.crit,
+                    base_spirit_gain=args.spirit_gain),
+        schedules=args.schedule or [[(0.0, 1)]], content_dir=args.content,
+        weights=[float(x) for x in split(args.weights)] if args.weights else None,
+        budget=args.budget, min_points=args.min_points, require=split(args.require), forbid=split(args.forbid),
+        run_count=args.run_count, duration_s=args.duration, movement=args.movement,
+        n_init=args.n_init, batch=args.batch, rounds=args.rounds, kappa=args.kappa,
+        top_k=args.top, final_runs=args.final_runs, seed=args.seed,
+    )
+    r = search(cfg, workers=args.workers)
+    if args.json:
+        import json
+        print(json.dumps(r, indent=2))
+        return 0
+    print(f"legal builds: {r['legal_builds']}, simmed: {r['builds_simmed']} in {r['rounds']} rounds")
+    print(f"replicates: {r['replicates_search']} search + {r['replicates_final']} final"
+          f" vs {r['replicates_exhaustive']} exhaustive ({r['replicates_saved']} saved)")
+    w = max(len(t["talents"]) for t in r["top"])
+    for t in r["top"]:
+        lo, hi = t["ci95"]
+        print(f"{t['talents'].ljust(w)}  {t['dps']:9.2f}  [{lo:9.2f}, {hi:9.2f}]  predicted {t['predicted_dps']:9.2f}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,183 @@
+# sim/tools/timeline.py
+"""
+Columnar combat timeline recorder.
+
+Subscribes to the bus and appends one row per event into typed arrays:
+    t_us (int64) | phase (uint8) | kind (uint8) | ability (uint16) | target (uint16) | amount (float64) | crit (uint8)
+= 23 bytes/event. phase is the engine phase (CAST_END .. APL) of the event that
+published it, 255 when the recorder was attached without an engine. Ability/aura/action names and target names are interned into
+string tables; id 0 is always "" (no ability / no target).
+
+Nothing is subscribed unless a recorder is attached, so a normal sim pays nothing.
+
+    rec = TimelineRecorder()
+    rec.attach(bus, eng)      # before eng.run_until(...)
+    ...
+    rec.save_npz("fight.npz") # numpy.load("fight.npz") works, numpy is not needed to write it
+    cols = load_npz("fight.npz")
+"""
+from __future__ import annotations
+from array import array
+from typing import Dict, List, Tuple
+import struct
+import sys
+import zipfile
+
+# event kinds (the uint8 'kind' column); KIND_NAMES[kind] is the bus event it came from
+DAMAGE, DOT_TICK, CAST_START, CAST_END, APL_DECISION, EMBER_GAIN, EMBER_SPEND = range(7)
+KIND_NAMES = ("damage_done", "dot_tick", "cast_start", "cast_end", "apl_decision", "generate_ember", "spend_ember")
+NO_PHASE = 255
+
+# column name -> (array typecode, npy descr)
+COLUMNS: Dict[str, Tuple[str, str]] = {
+    "t_us":    ("q", "<i8"),
+    "phase":   ("B", "|u1"),
+    "kind":    ("B", "|u1"),
+    "ability": ("H", "<u2"),
+    "target":  ("H", "<u2"),
+    "amount":  ("d", "<f8"),
+    "crit":    ("B", "|u1"),
+}
+
+class StringTable:
+    """Interns strings to small ints; index 0 is the empty string."""
+    def __init__(self, names: List[str] | None = None):
+        self.names: List[str] = list(names) if names else [""]
+        self._ids: Dict[str, int] = {n: i for i, n in enumerate(self.names)}
+
+    def intern(self, name) -> int:
+        if name is None:
+            return 0
+        i = self._ids.get(name)
+        if i is None:
+            name = str(name)
+            i = self._ids.get(name)
+            if i is None:
+                i = self._ids[name] = len(self.names)
+                self.names.append(name)
+        return i
+
+    def __len__(self): return len(self.names)
+
+class TimelineRecorder:
+    def __init__(self, capacity: int = 1 << 14):
+        self.n = 0
+        self._cap = max(16, int(capacity))
+        self.cols: Dict[str, array] = {name: array(tc, bytes(array(tc).itemsize * self._cap))
+                                       for name, (tc, _) in COLUMNS.items()}
+        self.abilities = StringTable()
+        self.targets = StringTable()
+        self._eng = None
+
+    # ---- storage ----
+    def _grow(self):
+        for name, col in self.cols.items():
+            col.frombytes(bytes(col.itemsize * self._cap))
+        self._cap *= 2
+
+    def record(self, t_us: int, kind: int, ability: int, target: int, amount: float = 0.0, crit: bool = False):
+        n = self.n
+        if n == self._cap:
+            self._grow()
+        c = self.cols
+        c["t_us"][n] = int(round(t_us))   # GCD math can leave fractional microseconds on the clock
+        c["phase"][n] = self._eng.phase if self._eng is not None else NO_PHASE
+        c["kind"][n] = kind
+        c["ability"][n] = ability
+        c["target"][n] = target
+        c["amount"][n] = amount
+        c["crit"][n] = 1 if crit else 0
+        self.n = n + 1
+
+    def __len__(self): return self.n
+
+    def nbytes(self) -> int:
+        """Bytes held by the columns (allocated capacity, not just used rows)."""
+        return sum(col.itemsize * len(col) for col in self.cols.values())
+
+    def column(self, name: str) -> array:
+        """Used rows of one column (a copy)."""
+        return self.cols[name][:self.n]
+
+    # ---- bus wiring ----
+    def attach(self, bus, eng=None) -> "TimelineRecorder":
+        """Subscribe to bus; with eng, each row also records the phase of the running event."""
+        self._eng = eng
+        ab, tg, rec = self.abilities.intern, self.targets.intern, self.record
+
+        def _name(u): return getattr(u, "name", None) if u is not None else None
+
+        def on_damage(t_us=0, ability_id=None, target=None, amount=0.0, crit=False, **_):
+            rec(t_us, DAMAGE, ab(ability_id), tg(_name(target)), amount, crit)
+        def on_dot_tick(dot=None, t_us=0, crit=False, amount=0.0, **_):
+            rec(t_us, DOT_TICK, ab(dot.name), tg(_name(dot.target)), amount or 0.0, crit)
+        def on_cast_start(t_us=0, ability_id=None, ctx=None, **_):
+            rec(t_us, CAST_START, ab(ability_id), tg(_name(ctx.target) if ctx is not None else None))
+        def on_cast_end(t_us=0, ability_id=None, **_):
+            rec(t_us, CAST_END, ab(ability_id), 0)
+        def on_apl(t_us=0, action=None, target=None, **_):
+            rec(t_us, APL_DECISION, ab(action), tg(target or None))
+        def on_gain(t_us=0, amount=0, **_):
+            rec(t_us, EMBER_GAIN, 0, 0, amount)
+        def on_spend(t_us=0, amount=0, **_):
+            rec(t_us, EMBER_SPEND, 0, 0, amount)
+
+        bus.sub("damage_done", on_damage)
+        bus.sub("dot_tick", on_dot_tick)
+        bus.sub("cast_start", on_cast_start)
+        bus.sub("cast_end", on_cast_end)
+        bus.sub("apl_decision", on_apl)
+        bus.sub("generate_ember", on_gain)
+        bus.sub("spend_ember", on_spend)
+        return self
+
+    # ---- export ----
+    def arrays(self) -> Dict[str, array]:
+        return {name: self.column(name) for name in COLUMNS}
+
+    def save_npz(self, path: str) -> None:
+        entries = {name: _npy(descr, self.column(name)) for name, (_, descr) in COLUMNS.items()}
+        entries["kind_names"] = _npy_str(list(KIND_NAMES))
+        entries["ability_names"] = _npy_str(self.abilities.names)
+        entries["target_names"] = _npy_str(self.targets.names)
+        with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+            for name, payload in entries.items():
+                zf.writestr(name + ".npy", payload)
+
+# ---------- .npy encoding (format 1.0), so numpy stays optional ----------
+def _npy_header(descr: str, n: int) -> bytes:
+    head = "{'descr': '%s', 'fortran_order': False, 'shape': (%d,), }" % (descr, n)
+    pad = 64 - (10 + len(head) + 1) % 64
+    head = head + " " * pad + "\n"
+    return b"\x93NUMPY\x01\x00" + struct.pack("<H", len(head)) + head.encode("latin1")
+
+def _npy(descr: str, col: array) -> bytes:
+    if sys.byteorder == "big" and col.itemsize > 1:
+        col = array(col.typecode, col); col.byteswap()
+    return _npy_header(descr, len(col)) + col.tobytes()
+
+def _npy_str(names: List[str]) -> bytes:
+    width = max(1, max((len(s) for s in names), default=1))
+    body = b"".join(s.ljust(width, "\0").encode("utf-32-le") for s in names)
+    return _npy_header(f"<U{width}", len(names)) + body
+
+def _parse_npy(raw: bytes):
+    hlen = struct.unpack("<H", raw[8:10])[0]
+    header = raw[10:10 + hlen].decode("latin1")
+    descr = header.split("'descr': '")[1].split("'")[0]
+    body = raw[10 + hlen:]
+    if descr.startswith("<U"):
+        width = int(descr[2:])
+        step = 4 * width
+        return [body[i:i + step].decode("utf-32-le").rstrip("\0") for i in range(0, len(body), step)]
+    typecode = {descr: tc for tc, descr in COLUMNS.values()}[descr]
+    col = array(typecode)
+    col.frombytes(body)
+    if sys.byteorder == "big" and col.itemsize > 1:
+        col.byteswap()
+    return col
+
+def load_npz(path: str) -> Dict[str, object]:
+    """Inverse of save_npz without numpy: columns as arrays, *_names as lists of str."""
+    with zipfile.ZipFile(path, "r") as zf:
+        return {name[:-4]: _parse_npy(zf.read(name)) for name in zf.namelist()}
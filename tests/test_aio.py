@@ -0,0 +1,60 @@
+# tests/test_aio.py
+import asyncio
+import contextlib
+import time
+
+import pytest
+
+from sim.runners.target_dummy import SimConfig
+from sim.tools.aio import SimService
+from sim.tools.harness import Attrs, BatchRequest
+
+def _cfg(duration_s: float) -> SimConfig:
+    return SimConfig(character="Ardeos", talents={}, encounter=[(0, 1)], seed=5, duration_s=duration_s, quiet=True)
+
+def test_cancelled_run_sim_stops_and_frees_its_slot():
+    async def main():
+        async with SimService(workers=1, max_inflight=1) as svc:
+            task = asyncio.ensure_future(svc.run_sim(_cfg(36_000.0)))
+            await asyncio.sleep(0.5)      # running in the worker by now
+            t = time.perf_counter()
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            assert svc.stats == {"submitted": 1, "completed": 0, "cancelled": 1}
+            # the only slot comes back once the fight has stopped, well before its hour would be up
+            await svc.run_sim(_cfg(1.0))
+            assert time.perf_counter() - t < 10
+            assert svc.stats == {"submitted": 2, "completed": 1, "cancelled": 1}
+    asyncio.run(main())
+
+def test_leaving_the_stream_early_submits_nothing_more():
+    req = BatchRequest(content_dir="Content", attrs=Attrs("Ardeos", 1.1, 0.3, 1.1, 1.0), talent_sets=[{}],
+                       schedules=[[(0, n)] for n in range(1, 7)], seeds=[3], duration_s=600.0, quiet=True)
+
+    async def main():
+        async with SimService(workers=2) as svc:
+            async with contextlib.aclosing(svc.run_batch_stream(req, window=1)) as rows:
+                async for row in rows:
+                    break
+            # the cell queued behind the first one is cancelled before it reaches the pool
+            assert svc.stats == {"submitted": 1, "completed": 1, "cancelled": 0}
+            await asyncio.sleep(0.3)
+            assert svc.stats["submitted"] == 1
+    asyncio.run(main())
+
+def test_max_inflight_bounds_the_pool():
+    async def main():
+        async with SimService(workers=3, max_inflight=2) as svc:
+            svc._start()
+            pending, overlap = [], []
+            submit = svc._pool.submit
+            def spy(*args, **kw):
+                overlap.append(sum(not f.done() for f in pending))
+                fut = submit(*args, **kw)
+                pending.append(fut)
+                return fut
+            svc._pool.submit = spy
+            await asyncio.gather(*(svc.run_sim(_cfg(20.0)) for _ in range(6)))
+            assert len(overlap) == 6 and max(overlap) == 1    # never a third job next to two running
+    asyncio.run(main())
@@ -0,0 +1,52 @@
+# tests/test_apl.py
+import contextlib
+import io
+
+from sim.core.apl import SimpleAPL, Wait
+from sim.runners.target_dummy import run_sim, SimConfig
+
+def _run(character: str = "Ardeos", duration_s: float = 60.0) -> dict:
+    cfg = SimConfig(character=character, talents={}, encounter=[(0, 1)], seed=3, duration_s=duration_s, quiet=True)
+    with contextlib.redirect_stdout(io.StringIO()):
+        return run_sim("Content", cfg)
+
+def _only_fire_frogs(self, now_us):
+    return ("fire_frogs", self.world.primary())
+
+def test_apl_waits_for_cooldown_instead_of_spinning(monkeypatch):
+    # a rotation that only wants an ability with a cooldown: the APL must sleep until it is back
+    waits = []
+    choose = SimpleAPL.choose
+    def spy(self, now_us):
+        pick = choose(self, now_us)
+        if isinstance(pick, Wait):
+            assert pick.until_us > now_us
+            waits.append(pick)
+        return pick
+    monkeypatch.setattr(SimpleAPL, "_choose", _only_fire_frogs)
+    monkeypatch.setattr(SimpleAPL, "choose", spy)
+    r = _run()
+    casts = r["casts"].get("Fire Frogs", 0)
+    assert casts >= 2 and waits
+    # one evaluation per cast, per cooldown wait, plus cast-end wakes
+    assert r["apl_evaluations"] <= 3 * casts + len(waits) + 5
+
+def test_actor_wakes_when_the_pick_is_ready(monkeypatch):
+    # an APL that never returns Wait: the actor itself must not re-wake at `now` while blocked
+    monkeypatch.setattr(SimpleAPL, "choose", _only_fire_frogs)
+    r = _run()
+    casts = r["casts"].get("Fire Frogs", 0)
+    assert casts >= 2
+    assert r["apl_evaluations"] <= 4 * casts + 5
+
+def test_wait_candidates_come_from_the_ability_book(monkeypatch):
+    seen = set()
+    next_ready = SimpleAPL.next_ready_us
+    def spy(self, now_us):
+        seen.update(self.cooldown_abilities())
+        return next_ready(self, now_us)
+    monkeypatch.setattr(SimpleAPL, "_choose", _only_fire_frogs)
+    monkeypatch.setattr(SimpleAPL, "next_ready_us", spy)
+    _run()
+    assert {"fire_frogs", "fireball"} <= seen
+    assert not seen & {"searing_blaze", "incinerate", "detonate"}   # no cooldown, nothing to wait for
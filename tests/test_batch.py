@@ -0,0 +1,48 @@
+# tests/test_batch.py
+import io
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from sim.tools.batch import run_jobs
+
+_JOB = {"character": "Rime", "talent_sets": [{}], "schedules": [[[0, 1]]], "run_count": 2, "duration_s": 10}
+
+class _Out(io.StringIO):
+    def __init__(self):
+        super().__init__()
+        self.first = threading.Event()
+
+    def write(self, s):
+        n = super().write(s)
+        self.first.set()
+        return n
+
+def test_results_stream_while_input_is_open():
+    # a feed that only sends its second job once the first one's result is out
+    out = _Out()
+    seen = []
+
+    def feed():
+        yield json.dumps({**_JOB, "id": "a"})
+        seen.append(out.first.wait(timeout=60))
+        yield json.dumps({**_JOB, "id": "b"})
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        assert run_jobs(feed(), out, pool, max_inflight=4) == 0
+    assert seen == [True]
+    assert [json.loads(l)["id"] for l in out.getvalue().splitlines()] == ["a", "b"]
+
+def test_window_bounds_jobs_in_flight():
+    out = _Out()
+    read = []
+
+    def feed():
+        for i in range(4):
+            read.append((i, out.getvalue().count("\n")))
+            yield json.dumps({**_JOB, "id": str(i)})
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        assert run_jobs(feed(), out, pool, max_inflight=1) == 0
+    # with one slot, line i is only read after i results are written
+    assert read == [(i, i) for i in range(4)]
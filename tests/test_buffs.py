@@ -0,0 +1,44 @@
+# tests/test_buffs.py
+from sim.core.engine import Engine, Bus
+from sim.core.rng import RNG
+from sim.core.unit import Unit, Buff
+
+def _setup():
+    eng, bus = Engine(), Bus()
+    u = Unit("p", eng, bus, RNG(1))
+    expired = []
+    bus.sub("buff_expire", lambda **kw: expired.append((kw["buff"].name, kw["t_us"])))
+    return eng, u, expired
+
+def _queued(eng) -> int:
+    return sum(1 for e in eng._q if not e.cancelled)
+
+def _at(eng, t_us: int, fn) -> None:
+    eng.schedule_at(t_us, fn)
+
+def test_refresh_keeps_one_expiry():
+    eng, u, expired = _setup()
+    for k in range(10):
+        _at(eng, k * 100_000, lambda k=k: u.add_buff(Buff("rush", expires_at_us=k * 100_000 + 2_000_000)))
+    eng.run_until(950_000)
+    assert u.buff_mgr.live_events() == 1 and _queued(eng) == 1
+    eng.run_until(10_000_000)
+    assert expired == [("rush", 2_900_000)]
+    assert u.buff_mgr.live_events() == 0 and not u.has_buff("rush")
+
+def test_extend_and_remove_keep_one_expiry():
+    eng, u, expired = _setup()
+    u.add_buff(Buff("rush", expires_at_us=1_000_000))
+    for _ in range(3):
+        u.extend_buff("rush", 500_000)
+        assert u.buff_mgr.live_events() == 1 and _queued(eng) == 1
+    eng.run_until(10_000_000)
+    assert expired == [("rush", 2_500_000)]
+
+    u.add_buff(Buff("ward", expires_at_us=11_000_000))
+    u.remove_buff_by_name("ward")
+    assert u.buff_mgr.live_events() == 0 and _queued(eng) == 0
+    u.add_buff(Buff("ward", expires_at_us=12_000_000))
+    assert u.buff_mgr.live_events() == 1 and _queued(eng) == 1
+    eng.run_until(20_000_000)
+    assert expired == [("rush", 2_500_000), ("ward", 12_000_000)]
@@ -0,0 +1,44 @@
+# tests/test_channel.py
+from sim.core.engine import Engine, Bus
+from sim.core.rng import RNG
+from sim.core.unit import Unit, Buff
+from sim.runtime.components import COMPONENTS, AbilitySpec, Ctx, comp_channel
+
+def _setup():
+    eng, bus = Engine(), Bus()
+    hits = []
+    bus.components = {**COMPONENTS, "probe": lambda ctx, step: hits.append((ctx.spec.id, ctx.eng.t_us))}
+    caster = Unit("p", eng, bus, RNG(1), haste=1.0)
+    return eng, caster, hits
+
+def _channel(eng, caster, aid: str, **step):
+    spec = AbilitySpec(id=aid, name=aid, cast={"cast_time_s": 2.0}, cost={}, cooldown_s=0, pipeline=[], tags=[])
+    ctx = Ctx(eng, caster.bus, {}, caster, caster, spec, None)
+    ctx.vars.update(cast_us=2_000_000, cast_start_us=eng.t_us)
+    comp_channel(ctx, {**step, "on_tick": [{"type": "probe"}]})
+    return ctx
+
+def test_new_channel_replaces_old_ticks():
+    eng, caster, hits = _setup()
+    first = _channel(eng, caster, "a", ticks=5)
+    eng.schedule_at(900_000, lambda: _channel(eng, caster, "b", ticks=5))
+    eng.run_until(5_000_000)
+    assert first.vars["channel_evt"].cancelled
+    assert [t for a, t in hits if a == "a"] == [400_000, 800_000]
+    assert [t for a, t in hits if a == "b"] == [1_300_000, 1_700_000, 2_100_000, 2_500_000]
+    assert caster.channel_evt is None
+
+def test_interrupt_channel_stops_ticks():
+    eng, caster, hits = _setup()
+    _channel(eng, caster, "a", ticks=5)
+    eng.schedule_at(500_000, caster.interrupt_channel)
+    eng.run_until(5_000_000)
+    assert hits == [("a", 400_000)]
+
+def test_tick_spacing_follows_haste():
+    eng, caster, hits = _setup()
+    _channel(eng, caster, "a", tick_dur=0.4)
+    # +100% haste after the second tick: the third is already armed, the fourth comes twice as fast
+    eng.schedule_at(850_000, lambda: caster.add_buff(Buff("rush", props={"haste_bonus": 1.0})))
+    eng.run_until(5_000_000)
+    assert [t for _, t in hits] == [400_000, 800_000, 1_200_000, 1_400_000]
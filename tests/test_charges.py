@@ -0,0 +1,54 @@
+# tests/test_charges.py
+from sim.core.engine import Engine, Bus
+from sim.core.rng import RNG
+from sim.core.unit import Unit, grant_charge, reduce_cooldown_us
+
+def _unit(max_charges: int = 2, recharge_s: float = 10.0):
+    eng = Engine()
+    u = Unit("p", eng, Bus(), RNG(1))
+    u.ensure_charges("blink", max_charges, recharge_s)
+    return eng, u
+
+def _advance(eng, t_us: int) -> None:
+    eng.schedule_at(t_us, lambda: None)
+    eng.run_until(t_us)
+
+def test_consume_then_ready_in():
+    eng, u = _unit()
+    assert u.consume_charge("blink") and u.ready_in_us("blink") == 0    # one left
+    _advance(eng, 3_000_000)
+    assert u.consume_charge("blink") and not u.consume_charge("blink")
+    assert u.ready_in_us("blink") == 7_000_000     # the first recharge lands at 10 s
+    _advance(eng, 9_999_999)
+    assert u.ready_in_us("blink") == 1
+    _advance(eng, 10_000_000)
+    assert u.is_ready("blink") and u.charges["blink"].cur == 1
+    assert u.time_until_next_charge_us("blink") == 3_000_000
+    _advance(eng, 13_000_000)
+    assert u.charges["blink"].cur == 2 and u.time_until_next_charge_us("blink") == 0
+
+def test_reduce_cooldown_across_a_recharge_boundary():
+    eng, u = _unit()
+    u.consume_charge("blink")
+    _advance(eng, 3_000_000)
+    u.consume_charge("blink")           # recharges land at 10 s and 13 s
+    _advance(eng, 5_000_000)
+    reduce_cooldown_us(u, eng, "blink", 8_000_000)    # more than the 5 s left: lands now, not in the past
+    assert u.charges["blink"].recharge_at[0][0] == 5_000_000
+    _advance(eng, 5_000_001)
+    assert u.charges["blink"].cur == 1 and u.ready_in_us("blink") == 0
+    assert u.time_until_next_charge_us("blink") == 13_000_000 - 5_000_001    # the later one is untouched
+    reduce_cooldown_us(u, eng, "blink", 2_000_000)
+    _advance(eng, 11_000_000)
+    assert u.charges["blink"].cur == 2
+
+def test_grant_charge_at_max():
+    eng, u = _unit()
+    assert grant_charge(u, eng, "blink") == 0
+    assert u.charges["blink"].cur == 2 and not u.charges["blink"].recharge_at
+    u.consume_charge("blink")
+    _advance(eng, 2_000_000)
+    assert grant_charge(u, eng, "blink", 3) == 1      # fills up, and the running recharge is dropped
+    assert not u.charges["blink"].recharge_at
+    _advance(eng, 10_000_000)
+    assert u.charges["blink"].cur == 2 and grant_charge(u, eng, "blink") == 0
@@ -0,0 +1,75 @@
+# tests/test_cluster.py
+import contextlib
+import io
+import socket
+import threading
+
+import pytest
+
+from sim.tools.cluster import Coordinator, _recv, _send, run_worker
+from sim.tools.harness import Attrs, BatchRequest, run_batch
+
+_REQ = BatchRequest(content_dir="Content", attrs=Attrs("Ardeos", 1.1, 0.3, 1.1, 1.0),
+                    talent_sets=[{}, {"1C": True, "2C": True, "3B": True}], schedules=[[(0, 1)]],
+                    seeds=[3, 17, 29, 41, 58], duration_s=10.0, quiet=True)
+
+def _workers(coord, n: int) -> list:
+    host, port = coord.address
+    threads = [threading.Thread(target=run_worker, args=(host, port), kwargs={"name": f"w{i}", "heartbeat_s": 0.1},
+                                daemon=True) for i in range(n)]
+    for t in threads:
+        t.start()
+    return threads
+
+def _fake_worker(coord, name: str):
+    # a hand-driven worker: says hello and takes one task
+    sock = socket.create_connection(coord.address)
+    rfile = sock.makefile("rb")
+    _send(sock, {"op": "hello", "worker": name})
+    _send(sock, {"op": "get"})
+    msg = _recv(rfile)
+    assert msg["op"] == "task"
+    return sock, msg
+
+@contextlib.contextmanager
+def _serving(**kw):
+    coord = Coordinator(_REQ, **kw).start()
+    try:
+        yield coord
+    finally:
+        coord.close()
+
+def _expected():
+    with contextlib.redirect_stdout(io.StringIO()):
+        return run_batch(_REQ)
+
+def test_rows_equal_run_batch():
+    with _serving() as coord:
+        _workers(coord, 3)
+        assert coord.wait(timeout=60) == _expected()
+
+def test_silent_worker_is_covered_by_stealing():
+    # holds a task without ever answering (nor heartbeating, but the reaper is far off)
+    with _serving(heartbeat_timeout_s=600.0) as coord:
+        sock, _ = _fake_worker(coord, "silent")
+        _workers(coord, 1)
+        assert coord.wait(timeout=60) == _expected()
+        assert coord.stolen >= 1 and coord.reissued == 0
+        sock.close()
+
+def test_dropped_connection_reissues_its_task():
+    # without stealing the batch can only finish if the dropped task goes back on the queue
+    with _serving(steal=False) as coord:
+        sock, _ = _fake_worker(coord, "flaky")
+        sock.close()
+        _workers(coord, 1)
+        assert coord.wait(timeout=60) == _expected()
+        assert coord.reissued == 1 and coord.stolen == 0
+
+def test_error_fails_the_batch():
+    with _serving() as coord:
+        sock, msg = _fake_worker(coord, "broken")
+        _send(sock, {"op": "error", "task": msg["task"], "error": "ValueError: boom"})
+        with pytest.raises(RuntimeError, match="boom"):
+            coord.wait(timeout=60)
+        sock.close()
@@ -0,0 +1,61 @@
+# tests/test_engine.py
+import contextlib
+import io
+import time
+
+import pytest
+
+from sim.core.engine import Engine, SimBudgetExceeded
+from sim.runners.target_dummy import run_sim, SimConfig
+
+def test_compact_mid_run_keeps_scheduling():
+    # compact() from inside an event must not strand events scheduled after it
+    eng = Engine()
+    ran = []
+    dead = [eng.schedule_at(50, lambda: ran.append("cancelled")) for _ in range(3)]
+
+    def compact_then_schedule():
+        for e in dead:
+            eng.cancel(e)
+        assert eng.compact() == 3
+        eng.schedule_at(20, lambda: ran.append("after"))
+
+    eng.schedule_at(10, compact_then_schedule)
+    eng.schedule_at(30, lambda: ran.append("before"))
+    eng.run_until(100)
+    assert ran == ["after", "before"]
+    assert eng.pending() == 0
+
+def _dps(long_fight: bool, character: str) -> float:
+    cfg = SimConfig(character=character, talents={}, encounter=[(0, 1), (30, 8), (60, 3), (120, 2), (200, 5)],
+                    seed=11, duration_s=300.0, long_fight=long_fight, quiet=True)
+    with contextlib.redirect_stdout(io.StringIO()):
+        return run_sim("Content", cfg)["dps"]
+
+def test_long_fight_matches_default_mode(monkeypatch):
+    compacts = []
+    real = Engine.compact
+    monkeypatch.setattr(Engine, "compact", lambda self: compacts.append(1) or real(self))
+    for character in ("Ardeos", "Rime"):
+        assert _dps(True, character) == _dps(False, character)
+    assert compacts, "long_fight never compacted the queue mid-run"
+
+def _busy_engine(**budgets) -> Engine:
+    # one slow event per 10 ms of simulated time, 100 per simulated second
+    eng = Engine(**budgets)
+    eng.schedule_every(0, lambda: time.sleep(0.0005), lambda: 10_000, 0)
+    return eng
+
+def test_wall_limit_spans_should_stop_slices():
+    eng = _busy_engine(wall_limit_s=0.05)
+    with pytest.raises(SimBudgetExceeded) as e:
+        eng.run_until(20_000_000, should_stop=lambda: False)
+    assert e.value.budget == "wall_clock"
+    assert eng.t_us < 10_000_000
+
+def test_sim_second_window_spans_should_stop_slices():
+    # 100 events per simulated second against a budget of 60, polled every 250 ms
+    eng = _busy_engine(max_events_per_sim_s=60)
+    with pytest.raises(SimBudgetExceeded) as e:
+        eng.run_until(5_000_000, should_stop=lambda: False, poll_us=250_000)
+    assert e.value.budget == "per_sim_second"
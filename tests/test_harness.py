@@ -0,0 +1,31 @@
+# tests/test_harness.py
+import contextlib
+import io
+from dataclasses import replace
+
+from sim.tools.harness import Attrs, BatchRequest, run_batch
+
+_REQ = BatchRequest(content_dir="Content", attrs=Attrs("Ardeos", 1.1, 0.3, 1.1, 1.0),
+                    talent_sets=[{}, {"1C": True, "2C": True, "3B": True}], schedules=[[(0, 1)], [(0, 3), (10, 2)]],
+                    seeds=[3, 17, 29, 41, 58], duration_s=20.0, quiet=True)
+
+def _calls(profile: dict) -> dict:
+    # call counts are deterministic, timings are not
+    return {(kind, key): calls for kind, key, calls, _, _ in profile["stats"]}
+
+def _run(req, **kw):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return run_batch(req, **kw)
+
+def test_thread_backend_matches_serial():
+    for req in (_REQ, replace(_REQ, dist=True)):
+        assert _run(req, backend="thread", workers=3) == _run(req)
+
+def test_thread_backend_matches_serial_profiled():
+    req = replace(_REQ, profile=True, dist=True)
+    serial, threaded = _run(req), _run(req, backend="thread", workers=3)
+    for a, b in zip(serial, threaded, strict=True):
+        pa, pb = a.pop("profile"), b.pop("profile")
+        assert a == b
+        assert pa["runs"] == pb["runs"] == len(_REQ.seeds)
+        assert _calls(pa) == _calls(pb)
@@ -0,0 +1,33 @@
+# tests/test_ids.py
+from sim.core.engine import Engine, Bus
+from sim.core.ids import NAMES, SlotTable
+from sim.core.rng import RNG
+from sim.core.unit import Unit
+
+def test_slot_table_reads_like_a_dict():
+    t, d = SlotTable(), {}
+    for k, v in (("zeta", 1), ("alpha", 2), ("zeta", 3), ("mid", 4)):
+        t[k] = v
+        d[k] = v
+    del t["alpha"], d["alpha"]
+    t.put(NAMES.id("omega"), 5)
+    d["omega"] = 5
+    assert list(t.items()) == list(d.items())
+    assert t.get("alpha") is None and "alpha" not in t and "mid" in t
+    assert t.pop("mid") == 4 and len(t) == 2
+    t.clear()
+    assert not t and dict(t) == {}
+
+def test_unit_ability_state_by_name_or_id():
+    eng = Engine()
+    u = Unit("p", eng, Bus(), RNG(1))
+    u.cooldown_ready_us["nova"] = 500
+    u.ensure_charges("blink", 1, 2.0)
+    u.consume_charge("blink")
+    for key in ("nova", NAMES.id("nova")):
+        assert not u.is_ready(key) and u.ready_in_us(key) == 500
+    for key in ("blink", NAMES.id("blink")):
+        assert not u.is_ready(key) and u.ready_in_us(key) == 2_000_000
+    u.add_damage(3.0, "nova")
+    u.add_damage(4.0, NAMES.id("nova"))
+    assert dict(u.damage_by_ability) == {"nova": 7.0}
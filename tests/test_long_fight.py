@@ -0,0 +1,38 @@
+# tests/test_long_fight.py
+import contextlib
+import io
+
+from sim.core.engine import Engine, Bus
+from sim.core.rng import RNG
+from sim.core.unit import TargetDummy
+from sim.tools import bench_long_fight
+
+SECONDS = 3600.0        # one hour of simulated fight; about a second of wall time
+RSS_BUDGET_MB = 0.25    # the default mode (new dummy per spawn) grows ~0.5 MB in the hour
+
+def _samples():
+    with contextlib.redirect_stdout(io.StringIO()):
+        return bench_long_fight.run(seconds=SECONDS, warmup_s=300.0, step_s=60.0)
+
+def test_long_fight_rss_stays_flat():
+    samples = _samples()
+    growth_mb = (samples[-1]["rss"] - samples[0]["rss"]) / 2**20
+    assert growth_mb <= RSS_BUDGET_MB, f"rss grew {growth_mb:.2f} MB after warm-up"
+
+def test_long_fight_pool_and_queue_stay_bounded():
+    samples = _samples()
+    plan = bench_long_fight.pulls(SECONDS)
+    first = samples[0]
+    for s in samples:
+        assert s["spawned"] == first["spawned"], "dummies created after warm-up"
+        assert s["enemies"] + s["pooled"] <= first["spawned"]
+        # the encounter's pulls are queued up front; what's left besides them is the live fight
+        live = s["queue"] - sum(1 for t, _ in plan if t > s["t_s"])
+        assert live <= 64, f"{live} live events queued at {s['t_s']:.0f}s"
+
+def test_dummy_is_alive_fresh_and_after_reset():
+    u = TargetDummy(Engine(), Bus(), RNG(1))
+    assert u.is_dead is False
+    u.is_dead = True
+    u.reset()
+    assert u.is_dead is False
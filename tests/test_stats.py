@@ -0,0 +1,25 @@
+# tests/test_stats.py
+import json
+
+from sim.tools.stats import DpsSummary, Histogram
+
+def test_histogram_bins_follow_scale():
+    h = Histogram()
+    for x in (56_340.0, 56_999.0, 57_000.0, 512.3, 0.0):
+        h.add(x)
+    assert h.to_dict()["counts"] == {"0e0": 1, "51e1": 1, "56e3": 2, "57e3": 1}
+    back = Histogram.from_dict(json.loads(json.dumps(h.to_dict())))
+    assert back.counts == h.counts
+
+def test_fixed_width_histogram_still_available():
+    h = Histogram(bin_width=10.0)
+    h.add(56_345.0)
+    assert h.to_dict()["counts"] == {"56340.0": 1}
+
+def test_empty_summary_is_valid_json():
+    d = DpsSummary().to_dict()
+    assert d["min"] is None and d["max"] is None
+    json.dumps(d, allow_nan=False)
+    s = DpsSummary.from_dict(d)
+    s.add(3.0)
+    assert (s.min, s.max) == (3.0, 3.0)
@@ -0,0 +1,104 @@
+# tests/test_targeting.py
+import itertools
+from types import SimpleNamespace
+
+from sim.runtime.targeting import TargetSelector
+
+CASTER, OTHER = object(), object()
+
+class _Enemy:
+    def __init__(self, name: str, **auras):
+        self.name = name
+        self.auras = {n: SimpleNamespace(owner=o) for n, o in auras.items()}   # aura name -> its (one) applier
+
+    def aura(self, name, owner=None):
+        a = self.auras.get(name)
+        return a if a is not None and (owner is None or a.owner is owner) else None
+
+    def __repr__(self):
+        return self.name
+
+def _old_select(pool, caster, step):
+    # comp_fanout's selection before TargetSelector, verbatim apart from world.primary() -> pool[0]
+    want = int(step.get("count", 1))
+    include_primary = bool(step.get("include_primary", True))
+    exclude_primary = bool(step.get("exclude_primary", False))
+    prefer_aura = step.get("prefer_missing_aura")
+    require_aura = step.get("require_aura")
+    owner_only_for_aura = bool(step.get("owner_only_for_aura", True))
+    distinct = bool(step.get("distinct", True))
+    if not pool:
+        return []
+    primary = pool[0] if include_primary else None
+    chosen = []
+    def add(u):
+        if not u: return
+        if distinct and u in chosen: return
+        chosen.append(u)
+    if primary:
+        add(primary)
+    if prefer_aura:
+        missing, haveit = [], []
+        for u in pool:
+            dot = u.auras.get(prefer_aura)
+            if not dot:
+                ok = True
+            elif not owner_only_for_aura:
+                ok = False
+            else:
+                ok = (dot.owner is not caster)
+            (missing if ok else haveit).append(u)
+        for u in missing: add(u)
+        for u in haveit: add(u)
+    if require_aura:
+        haveit = []
+        for u in pool:
+            dot = u.auras.get(require_aura)
+            if dot and (dot.owner or not owner_only_for_aura):
+                haveit.append(u)
+        for u in haveit: add(u)
+    else:
+        for u in pool: add(u)
+    primary = pool[0] if exclude_primary else None
+    if exclude_primary:
+        for u in chosen:
+            if u == primary:
+                chosen.remove(u)
+    return chosen[:want] if distinct else (chosen * want)[:want]
+
+_E = [_Enemy("mine", Dot=CASTER), _Enemy("bare"), _Enemy("theirs", Dot=OTHER), _Enemy("mine2", Dot=CASTER),
+      _Enemy("unowned", Dot=None)]
+POOLS = [_E, _E[1:], _E[:1], [_E[2], _E[4], _E[1]]]
+
+def test_matches_old_fanout_selection():
+    keys = ("include_primary", "exclude_primary", "owner_only_for_aura", "distinct")
+    for flags, prefer, require, count, pool in itertools.product(
+            itertools.product((True, False), repeat=4), (None, "Dot"), (None, "Dot"), (0, 1, 2, 3, 7), POOLS):
+        step = dict(zip(keys, flags), count=count)
+        if prefer: step["prefer_missing_aura"] = prefer
+        if require: step["require_aura"] = require
+        assert TargetSelector.from_step(step).select(pool, CASTER) == _old_select(pool, CASTER, step), step
+
+def test_table():
+    mine, bare, theirs, mine2, unowned = _E
+    cases = [
+        # (step, expected)
+        ({"count": 3}, [mine, bare, theirs]),
+        ({"count": 3, "exclude_primary": True}, [bare, theirs, mine2]),
+        ({"count": 2, "include_primary": False, "prefer_missing_aura": "Dot"}, [bare, theirs]),
+        ({"count": 3, "prefer_missing_aura": "Dot", "owner_only_for_aura": False}, [mine, bare, theirs]),
+        ({"count": 5, "include_primary": False, "prefer_missing_aura": "Dot", "owner_only_for_aura": False},
+         [bare, mine, theirs, mine2, unowned]),
+        ({"count": 9, "require_aura": "Dot", "include_primary": False}, [mine, theirs, mine2]),
+        ({"count": 9, "require_aura": "Dot", "include_primary": False, "owner_only_for_aura": False},
+         [mine, theirs, mine2, unowned]),
+        ({"count": 4, "distinct": False}, [mine, mine, bare, theirs]),
+        # repeating + exclude_primary: only the first of the two primaries goes, and the rest is cycled
+        ({"count": 8, "distinct": False, "exclude_primary": True},
+         [mine, bare, theirs, mine2, unowned, mine, bare, theirs]),
+        ({"count": 3, "distinct": False, "exclude_primary": True, "include_primary": False},
+         [bare, theirs, mine2]),
+    ]
+    for step, expected in cases:
+        assert TargetSelector.from_step(step).select(_E, CASTER) == expected, step
+        assert _old_select(_E, CASTER, step) == expected, step
@@ -0,0 +1,16 @@
+# tests/test_trace.py
+import json
+
+import pytest
+
+from sim.core.engine import SimCancelled
+from sim.runners.target_dummy import run_sim, SimConfig
+
+def test_cancelled_run_still_finishes_its_trace(tmp_path):
+    path = tmp_path / "trace.json"
+    cfg = SimConfig(character="Ardeos", talents={}, encounter=[(0, 1)], seed=2, duration_s=60.0, quiet=True,
+                    trace=str(path), should_stop=lambda: True)
+    with pytest.raises(SimCancelled):
+        run_sim("Content", cfg)
+    events = json.loads(path.read_text())["traceEvents"]
+    assert events and max(e.get("ts", 0) for e in events) <= 1_000_000